@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""End-to-end verification benchmark on a synthetic certificate corpus.
+
+Drives either CertificateProcessor in this process (threads) or the HTTP
+endpoint (a server it launches, or --url) at each requested concurrency, and
+reports throughput, p50/p95/p99 latency, peak memory (PSS of the process and
+its OCR workers) and field-level extraction accuracy, overall and per scan
+condition. Results are written as JSON; pass a previous run as --baseline to
+flag throughput, latency or accuracy regressions (exit status 1).
+
+Each concurrency level renders its own corpus (seed plus level index) and
+every request uses a distinct certificate, so the server's result cache only
+helps when --requests exceeds --documents.
+
+Every level runs with tiered verification off and on (--tiered). The first
+--registered share of each corpus is loaded into the certificate registry,
+so those certificates can be settled by the quick tier while the rest are
+escalated to the full pipeline; latency is also reported per deciding tier.
+With --url, --tiered only labels the results of the running server.
+
+Usage (from python_backend/):
+    python -m benchmarks.end_to_end --driver in-process --concurrency 1 4 --output results.json
+    python -m benchmarks.end_to_end --driver http --concurrency 4 --noise 0 12 --skew 0 1.5 --baseline results.json
+    python -m benchmarks.end_to_end --driver http --tiered off on --registered 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.startup import child_pids, get_status, launch_server, memory_kb, post_file, wait_for
+from benchmarks.synthetic import Sample, add_corpus_arguments, corpus_from_args, field_accuracy
+
+DRIVERS = ("in-process", "http")
+
+TIERED_SETTINGS = ("off", "on")
+
+
+class PeakMemory:
+    """Samples the summed PSS of a process and its children in the background"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> int:
+        total = 0
+        for pid in [self.pid] + child_pids(self.pid):
+            try:
+                total += memory_kb(pid)["pss"]
+            except (FileNotFoundError, ProcessLookupError):
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if self.pid is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.pid is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak_kb = max(self.peak_kb, self._sample())
+
+
+def in_process_processor(ocr_mode: str, profile: str, registered: List[Dict]):
+    """A CertificateProcessor over the built-in registry plus ``registered``, warmed up"""
+    from main import VERIFIED_CERTIFICATES, CertificateProcessor
+    from readiness import Readiness
+    from registry import InMemoryRegistry
+
+    processor = CertificateProcessor(registry=InMemoryRegistry(VERIFIED_CERTIFICATES + registered),
+                                     profile=profile, ocr_mode=ocr_mode)
+    # Load the OCR engine here on the main thread, like the server's warm-up,
+    # and keep that cost out of the measurements
+    processor.warm_up(Readiness())
+    return processor
+
+
+def in_process_verifier(processor, tiered: bool) -> Callable[[Sample], Dict]:
+    """Run the same pipeline as /verify-certificate, minus HTTP, the worker pool and the caches"""
+    from main import FULL_TIER, QUICK_TIER
+
+    def verify(sample: Sample) -> Dict:
+        if tiered:
+            text, _ = processor.read_certificate_image(sample.image_bytes, quick=True)
+            result = processor.verify_against_database(processor.extract_certificate_data(text), fuzzy=False)
+            if processor.settles_quick_tier(result):
+                result.decided_by_tier = QUICK_TIER
+                return result.model_dump()
+        text = processor.extract_text_with_ocr(sample.image_bytes)
+        result = processor.verify_against_database(processor.extract_certificate_data(text))
+        result.decided_by_tier = FULL_TIER
+        return result.model_dump()
+    return verify
+
+
+def http_verifier(base_url: str) -> Callable[[Sample], Dict]:
+    def verify(sample: Sample) -> Dict:
+        status, body = post_file(f"{base_url}/verify-certificate", sample.name, sample.image_bytes, "image/png")
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {body[:200]!r}")
+        return json.loads(body)
+    return verify
+
+
+def registry_database(directory: str, registered: List[Dict]) -> str:
+    """Write ``registered`` to a SQLite registry in ``directory`` for a launched server"""
+    from registry import SQLiteRegistry
+
+    path = os.path.join(directory, "registry.db")
+    SQLiteRegistry(path, fuzzy=False).add_many(registered)
+    return path
+
+
+def latency_percentiles(latencies: List[float]) -> Dict[str, float]:
+    return {
+        name: round(float(np.percentile(latencies, q)) * 1000, 1)
+        for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+    }
+
+
+def run_load(verify: Callable[[Sample], Dict], samples: List[Sample], requests: int, concurrency: int,
+             memory_pid: Optional[int]) -> Dict:
+    """Send ``requests`` certificates through ``verify`` with ``concurrency`` in flight"""
+    def timed(i: int) -> Tuple[Sample, float, Optional[Dict]]:
+        sample = samples[i % len(samples)]
+        start = time.perf_counter()
+        try:
+            result = verify(sample)
+        except Exception as e:
+            print(f"  {sample.name}: {e}", file=sys.stderr)
+            result = None
+        return sample, time.perf_counter() - start, result
+
+    with PeakMemory(memory_pid) as memory:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            outcomes = list(executor.map(timed, range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for _, latency, _ in outcomes]
+    by_tier: Dict[str, List[float]] = {}
+    by_field: Dict[str, List[bool]] = {}
+    by_condition: Dict[str, List[bool]] = {}
+    for sample, latency, result in outcomes:
+        if result is None:
+            continue
+        by_tier.setdefault(str(result.get("decided_by_tier")), []).append(latency)
+        for field, ok in field_accuracy(sample.record, result["extracted_data"]).items():
+            by_field.setdefault(field, []).append(ok)
+            by_condition.setdefault(sample.condition.label, []).append(ok)
+    checks = [ok for values in by_field.values() for ok in values]
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(result is None for _, _, result in outcomes),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(requests / elapsed, 3),
+        "latency_ms": latency_percentiles(latencies),
+        "decided_by_tier": {
+            tier: {"requests": len(values), "latency_ms": latency_percentiles(values)}
+            for tier, values in sorted(by_tier.items())
+        },
+        "peak_memory_mb": round(memory.peak_kb / 1024, 1) if memory_pid is not None else None,
+        "accuracy": round(sum(checks) / len(checks), 4) if checks else 0.0,
+        "field_accuracy": {field: round(sum(v) / len(v), 4) for field, v in by_field.items()},
+        "accuracy_by_condition": {label: round(sum(v) / len(v), 4) for label, v in sorted(by_condition.items())},
+    }
+
+
+def environment() -> Dict:
+    """What the numbers were measured on, so runs can be compared"""
+    import config
+    from main import PIPELINE_VERSION
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "pipeline_version": PIPELINE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ocr_backend": config.OCR_BACKEND,
+    }
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float, accuracy_tolerance: float) -> List[str]:
+    """Regressions of ``results`` against a previous run with the same driver, tiering and concurrency"""
+    previous = {(r["driver"], r.get("tiered", "off"), r["concurrency"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["driver"], result["tiered"], result["concurrency"]))
+        if old is None:
+            continue
+        label = f"{result['driver']} tiered {result['tiered']} x{result['concurrency']}"
+        if result["throughput_per_second"] < old["throughput_per_second"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {old['throughput_per_second']} -> {result['throughput_per_second']}/s")
+        if result["latency_ms"]["p95"] > old["latency_ms"]["p95"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {old['latency_ms']['p95']} -> {result['latency_ms']['p95']}ms")
+        if result["accuracy"] < old["accuracy"] - accuracy_tolerance:
+            regressions.append(f"{label}: accuracy {old['accuracy']} -> {result['accuracy']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--driver", choices=DRIVERS, default="in-process")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--requests", type=int, help="Requests per concurrency level (default: one per document)")
+    parser.add_argument("--url", help="Benchmark a running server instead of launching one (http driver)")
+    parser.add_argument("--server-pid", type=int, help="Pid of the --url server, to measure its memory")
+    parser.add_argument("--workers", type=int, default=4, help="OCR_WORKERS for a launched server")
+    parser.add_argument("--ocr-mode", default="regions", help="OCR mode for the in-process driver")
+    parser.add_argument("--profile", default="balanced", help="Preprocessing profile for the in-process driver")
+    parser.add_argument("--tiered", nargs="+", choices=TIERED_SETTINGS, default=list(TIERED_SETTINGS),
+                        help="Tiered verification settings to run each concurrency level with")
+    parser.add_argument("--registered", type=float, default=0.8,
+                        help="Share of each corpus loaded into the certificate registry")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative drop in throughput or rise in p95 latency")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.01, help="Allowed absolute drop in accuracy")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    requests = args.requests or args.documents
+    corpora = [corpus_from_args(args, seed_offset=level) for level in range(len(args.concurrency))]
+    registered = [sample.record for samples in corpora for sample in samples[:round(len(samples) * args.registered)]]
+
+    processor = None
+    registry_path = None
+    workdir = tempfile.mkdtemp(prefix="end_to_end_")
+    results = []
+    try:
+        for tiered in args.tiered:
+            server = None
+            if args.driver == "in-process":
+                if processor is None:
+                    processor = in_process_processor(args.ocr_mode, args.profile, registered)
+                verify = in_process_verifier(processor, tiered == "on")
+                memory_pid = os.getpid()
+            elif args.url:
+                verify = http_verifier(args.url.rstrip("/"))
+                memory_pid = args.server_pid
+            else:
+                if registry_path is None:
+                    registry_path = registry_database(workdir, registered)
+                server, base_url = launch_server(
+                    OCR_WORKERS=str(args.workers), TIERED_VERIFICATION="1" if tiered == "on" else "0",
+                    REGISTRY_BACKEND="sqlite", REGISTRY_DB_PATH=registry_path,
+                    JOBS_DB_PATH=os.path.join(workdir, "jobs.db"), JOBS_SPOOL_DIR=os.path.join(workdir, "job_uploads"),
+                )
+                wait_for(lambda: get_status(f"{base_url}/ready") == 200, 300)
+                verify = http_verifier(base_url)
+                memory_pid = server.pid
+
+            try:
+                for samples, concurrency in zip(corpora, args.concurrency):
+                    result = dict(driver=args.driver, tiered=tiered,
+                                  **run_load(verify, samples, requests, concurrency, memory_pid))
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    tiers = "  ".join(f"tier {tier}: {values['requests']} p50 {values['latency_ms']['p50']}ms"
+                                      for tier, values in result["decided_by_tier"].items())
+                    print(f"{args.driver:>10} tiered {tiered:<3} x{concurrency:<3} {result['throughput_per_second']:>7}/s  "
+                          f"p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms  "
+                          f"peak {result['peak_memory_mb']}MB  accuracy {result['accuracy']}  errors {result['errors']}  "
+                          f"({tiers})")
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait(timeout=30)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "environment": environment(),
+        "corpus": {"documents": args.documents, "dpi": args.dpi, "noise": args.noise, "skew": args.skew,
+                   "fonts": args.fonts, "seed": args.seed, "registered": args.registered},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance, args.accuracy_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
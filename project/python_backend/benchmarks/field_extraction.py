@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Measure field extraction time as OCR text grows.
+
+Builds OCR dumps of increasing size from certificate text interleaved with
+noisy garbage lines, plus an adversarial dump of unterminated anchor phrases,
+and reports extraction time per kilobyte. Roughly constant time per kilobyte
+means extraction scales linearly.
+
+Usage (from python_backend/):
+    python -m benchmarks.field_extraction --sizes-kb 1 10 100 1000
+"""
+import argparse
+import json
+import random
+import statistics
+import string
+import time
+
+from field_extraction import FieldExtractor
+from benchmarks.synthetic import make_records
+
+NOISE_CHARS = string.ascii_letters + string.digits + "  .,:/-|"
+
+
+def certificate_text(record: dict) -> str:
+    degree, _, subject = record["course"].partition(" in ")
+    return "\n".join([
+        record["institution"].upper(),
+        "CERTIFICATE OF GRADUATION",
+        f"This is to certify that {record['student_name'].upper()}",
+        f"Roll Number: {record['roll_number']}",
+        f"has successfully completed {degree.title()}",
+        f"in {subject.title()}",
+        f"Certificate Number: {record['certificate_number']}",
+        f"Grade: {record['grade'].title()}",
+        f"Year of Graduation: {record['graduation_year']}",
+    ])
+
+
+def ocr_dump(size_kb: int, seed: int = 0) -> str:
+    """Certificate text buried in garbage lines, about ``size_kb`` kilobytes long"""
+    rng = random.Random(seed)
+    records = make_records(8, seed=seed)
+    parts = []
+    length = 0
+    while length < size_kb * 1024:
+        if rng.random() < 0.1:
+            part = certificate_text(rng.choice(records))
+        else:
+            part = "".join(rng.choice(NOISE_CHARS) for _ in range(rng.randrange(20, 120)))
+        parts.append(part)
+        length += len(part) + 1
+    return "\n".join(parts)
+
+
+def adversarial_dump(size_kb: int) -> str:
+    """Anchor phrases whose captures never terminate, which backtracking patterns choke on"""
+    unit = "this is to certify that " + "a " * 40 + "bachelor of " + "x " * 40
+    return unit * (size_kb * 1024 // len(unit) + 1)
+
+
+def time_extraction(extractor: FieldExtractor, text: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        extractor.extract(text)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    # No budget, so every size is measured to completion
+    extractor = FieldExtractor(time_budget_ms=10 ** 9)
+    results = []
+    for size_kb in args.sizes_kb:
+        for kind, text in (("ocr", ocr_dump(size_kb)), ("adversarial", adversarial_dump(size_kb))):
+            seconds = time_extraction(extractor, text, args.repeats)
+            result = {
+                "kind": kind,
+                "size_kb": size_kb,
+                "p50_ms": round(seconds * 1000, 3),
+                "us_per_kb": round(seconds * 1e6 / (len(text) / 1024), 1),
+            }
+            results.append(result)
+            print(f"{kind:>11} {size_kb:>6}KB: p50 {result['p50_ms']}ms  {result['us_per_kb']}us/KB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Measure image fingerprint matching latency and recall as the index grows, and tamper detection.
+
+The index is filled with synthetic fingerprints clustered around shared
+template hashes, as uploads of one institution's certificates are. Each
+lookup is a stored fingerprint with up to --max-distance page bits and a
+few bits per region flipped and one field changed, i.e. an edited copy;
+recall is the share of those found, and the brute-force scan over all page
+hashes is timed for comparison.
+
+The tamper check renders synthetic certificates: edited copies (same scan,
+other name and number, re-saved as JPEG) should be flagged, separate scans
+of the same template with other details should not.
+
+Usage (from python_backend/):
+    python -m benchmarks.fingerprint_lookup --sizes 1000 100000 1000000
+"""
+import argparse
+import io
+import json
+import random
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+from fingerprint import REGIONS, FingerprintIndex, ImageFingerprint, fingerprint
+from benchmarks.synthetic import make_records, render_certificate
+
+# Stored fingerprints per template hash, on average
+TEMPLATE_SIZE = 200
+
+
+def flip_bits(value: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def random_fields(rng: random.Random) -> Dict:
+    return {"student_name": f"student {rng.getrandbits(32)}", "certificate_number": f"CERT/{rng.getrandbits(32)}"}
+
+
+def percentile_us(latencies: List[float], fraction: float) -> float:
+    return round(sorted(latencies)[int(len(latencies) * fraction) - 1] * 1e6, 1)
+
+
+def benchmark_size(size: int, lookups: int, max_distance: int) -> Dict:
+    rng = random.Random(7)
+    templates = [rng.getrandbits(64) for _ in range(max(1, size // TEMPLATE_SIZE))]
+    index = FingerprintIndex(max_distance=max_distance)
+    stored = []
+    start = time.perf_counter()
+    for i in range(size):
+        page = flip_bits(rng.choice(templates), rng.randint(0, 6), rng)
+        image = ImageFingerprint(page, tuple(rng.getrandbits(64) for _ in range(REGIONS)))
+        index.add(f"{i:064x}", image, random_fields(rng))
+        stored.append(image)
+    build_seconds = time.perf_counter() - start
+    pages = np.array([image.page for image in stored], dtype=np.uint64)
+
+    latencies, scan_latencies = [], []
+    hits = 0
+    for i in range(lookups):
+        original = stored[rng.randrange(size)]
+        edited = ImageFingerprint(
+            flip_bits(original.page, rng.randint(0, max_distance), rng),
+            tuple(flip_bits(region, rng.randint(0, 4), rng) for region in original.regions)
+        )
+        start = time.perf_counter()
+        match = index.observe(f"{size + i:064x}", edited, random_fields(rng))
+        latencies.append(time.perf_counter() - start)
+        hits += match is not None
+
+        start = time.perf_counter()
+        distances = np.unpackbits((pages ^ np.uint64(edited.page)).view(np.uint8)).reshape(-1, 64).sum(axis=1)
+        np.flatnonzero(distances <= max_distance)
+        scan_latencies.append(time.perf_counter() - start)
+
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 2),
+        "p50_us": round(statistics.median(latencies) * 1e6, 1),
+        "p95_us": percentile_us(latencies, 0.95),
+        "scan_p50_us": round(statistics.median(scan_latencies) * 1e6, 1),
+        "recall": round(hits / lookups, 4),
+    }
+
+
+def jpeg_copy(page: np.ndarray, quality: int = 80) -> np.ndarray:
+    buffer = io.BytesIO()
+    Image.fromarray(page).save(buffer, format="JPEG", quality=quality)
+    return np.array(Image.open(io.BytesIO(buffer.getvalue())).convert("L"))
+
+
+def benchmark_tampering(renders: int, dpi: int, noise: float, font_path: str = None) -> Dict:
+    """Index scans of `renders` certificates, then look up edited copies and separate scans"""
+    records = make_records(renders * 2, seed=5)
+    index = FingerprintIndex()
+    fingerprint_seconds = []
+
+    def observe(name: str, page: np.ndarray, record: Dict):
+        start = time.perf_counter()
+        image = fingerprint(page)
+        fingerprint_seconds.append(time.perf_counter() - start)
+        return index.observe(name, image, record)
+
+    scans = []
+    for i, record in enumerate(records[:renders]):
+        page = render_certificate(record, dpi=dpi, noise_sigma=noise, seed=i, font_path=font_path)
+        observe(f"{i:064x}", page, record)
+        scans.append(page)
+
+    false_positives = 0
+    for i, record in enumerate(records[renders:]):
+        page = render_certificate(record, dpi=dpi, noise_sigma=noise, seed=1000 + i,
+                                  skew_degrees=0.2 * (i % 3), font_path=font_path)
+        false_positives += observe(f"{renders + i:064x}", page, record) is not None
+
+    detected = 0
+    for i, record in enumerate(records[:renders]):
+        other = records[renders + i]
+        edited = dict(record, student_name=other["student_name"], certificate_number=other["certificate_number"])
+        page = jpeg_copy(render_certificate(edited, dpi=dpi, noise_sigma=noise, seed=i, font_path=font_path))
+        match = observe(f"{2 * renders + i:064x}", page, edited)
+        detected += match is not None and match.digest == f"{i:064x}"
+
+    return {
+        "renders": renders,
+        "dpi": dpi,
+        "noise": noise,
+        "tampered_detected": round(detected / renders, 4),
+        "other_scans_flagged": round(false_positives / renders, 4),
+        "fingerprint_ms": round(statistics.median(fingerprint_seconds) * 1e3, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--max-distance", type=int, default=10)
+    parser.add_argument("--renders", type=int, default=10, help="Certificates rendered for the tamper check")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=6.0)
+    parser.add_argument("--font", help="TrueType font to render with (default: Pillow's built-in font)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = benchmark_size(size, args.lookups, args.max_distance)
+        results.append(result)
+        print(f"{size:>10} images  build {result['build_seconds']:7.2f}s  p50 {result['p50_us']}us  "
+              f"p95 {result['p95_us']}us  (scan p50 {result['scan_p50_us']}us)  recall {result['recall']}")
+
+    tampering = benchmark_tampering(args.renders, args.dpi, args.noise, args.font)
+    print(f"{tampering['renders']} renders at {tampering['dpi']}dpi, noise {tampering['noise']:g}: "
+          f"edited copies flagged {tampering['tampered_detected']}, "
+          f"other scans flagged {tampering['other_scans_flagged']}, "
+          f"fingerprint {tampering['fingerprint_ms']}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"lookups": results, "tampering": tampering}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Measure OCR-tolerant fuzzy lookup latency and recall as the index grows.
+
+Usage (from python_backend/):
+    python -m benchmarks.fuzzy_lookup --sizes 1000 100000 1000000
+    python -m benchmarks.fuzzy_lookup --backend sqlite --sizes 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from fuzzy_index import FuzzyIndex, SQLiteFuzzyIndex
+from benchmarks.registry_lookup import synthetic_records
+
+CONFUSIONS = {"0": "O", "1": "l", "5": "S", "8": "B", "2": "Z"}
+
+
+def garble(value: str, rng: random.Random) -> str:
+    """Simulate Tesseract misreads: confusable swaps plus one dropped character"""
+    chars = [CONFUSIONS.get(ch, ch) if rng.random() < 0.3 else ch for ch in value]
+    del chars[rng.randrange(len(chars))]
+    return "".join(chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            if args.backend == "sqlite":
+                db = sqlite3.connect(os.path.join(tmp, f"fuzzy_{size}.db"), check_same_thread=False)
+                index = SQLiteFuzzyIndex(db, threading.Lock(), "certificate_number")
+            else:
+                index = FuzzyIndex()
+            numbers = [record["certificate_number"] for record in synthetic_records(size)]
+            start = time.perf_counter()
+            for i in range(0, size, 10000):
+                index.add_many(numbers[i:i + 10000])
+            build_seconds = time.perf_counter() - start
+
+            rng = random.Random(3)
+            latencies = []
+            hits = 0
+            for _ in range(args.lookups):
+                truth = numbers[rng.randrange(size)]
+                query = garble(truth, rng)
+                start = time.perf_counter()
+                found = index.search(query, k=5)
+                latencies.append(time.perf_counter() - start)
+                hits += any(original == truth for original, _ in found)
+
+            result = {
+                "backend": args.backend,
+                "size": size,
+                "build_seconds": round(build_seconds, 2),
+                "p50_us": round(statistics.median(latencies) * 1e6, 1),
+                "p95_us": round(sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1e6, 1),
+                "recall_at_5": round(hits / args.lookups, 4),
+            }
+            results.append(result)
+            print(f"{size:>10} keys  build {result['build_seconds']:7.2f}s  "
+                  f"p50 {result['p50_us']}us  p95 {result['p95_us']}us  recall@5 {result['recall_at_5']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
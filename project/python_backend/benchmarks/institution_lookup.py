@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Measure institution name resolution as the institution registry grows.
+
+Compares the Aho-Corasick registry against the previous substring scan over
+every institution name.
+
+Usage (from python_backend/):
+    python -m benchmarks.institution_lookup --sizes 100 1000 10000
+"""
+import argparse
+import json
+import random
+import statistics
+import string
+import time
+
+from institutions import InstitutionRegistry, make_institution
+
+KINDS = ["university", "college", "institute of technology", "college of engineering"]
+
+
+def synthetic_institutions(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randrange(4, 10)))
+                 for _ in range(rng.randrange(1, 3))]
+        names.add(f"{' '.join(words)} {rng.choice(KINDS)}")
+    return [
+        make_institution(name, {"aliases": [name.replace("university", "univ")],
+                                "certificate_format": r"[A-Z]{2,4}/[A-Z]{2,4}/\d{4}/\d{3,4}"})
+        for name in sorted(names)
+    ]
+
+
+def substring_resolve(names, text: str):
+    """The original lookup: first known name contained in the text or containing it"""
+    key = text.lower()
+    for name in names:
+        if name in key or key in name:
+            return name
+    return None
+
+
+def time_calls(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        institutions = synthetic_institutions(size)
+        start = time.perf_counter()
+        registry = InstitutionRegistry(institutions)
+        build_seconds = time.perf_counter() - start
+
+        rng = random.Random(9)
+        queries = [f"{rng.choice(institutions).name.upper()}, ESTD 19{rng.randrange(10, 99)}"
+                   for _ in range(args.lookups)]
+        names = [institution.name for institution in institutions]
+        hits = sum(registry.resolve(query) is not None for query in queries)
+
+        result = {
+            "size": size,
+            "build_seconds": round(build_seconds, 3),
+            "automaton_p50_us": round(time_calls(registry.resolve, queries) * 1e6, 1),
+            "substring_p50_us": round(time_calls(lambda q: substring_resolve(names, q), queries) * 1e6, 1),
+            "resolved": round(hits / len(queries), 4),
+        }
+        results.append(result)
+        print(f"{size:>7} institutions: build {result['build_seconds']}s  "
+              f"automaton p50 {result['automaton_p50_us']}us  substring p50 {result['substring_p50_us']}us  "
+              f"resolved {result['resolved']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
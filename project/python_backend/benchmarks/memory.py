@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Peak memory of one verification by image size, format and upload path.
+
+Renders a synthetic certificate at each --megapixels size as a color image in
+each --formats, then OCRs it in a fresh process the way a pool worker does:
+from bytes, as small uploads arrive, or from the spooled file path that large
+uploads are handed over as. After warm-up the process resets its RSS
+high-water mark (/proc/self/clear_refs) and reports the peak reached during
+the request minus the RSS it started with, i.e. what one request adds to a
+worker. Linux only.
+
+Usage (from python_backend/):
+    python -m benchmarks.memory --megapixels 8 16 40 --formats jpeg png
+    python -m benchmarks.memory --megapixels 40 --decode-max-pixels 100000000
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict
+
+from PIL import Image
+
+from benchmarks.synthetic import A4_WIDTH_300DPI, field_accuracy, make_records, render_certificate
+
+FORMATS = {"jpeg": "JPEG", "png": "PNG"}
+SOURCES = ("bytes", "file")
+
+
+def status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def measure_request(path: str, source: str, decode_max_pixels: int, ocr_mode: str, profile: str) -> Dict:
+    """Verify one image in this process and return its peak memory; runs in a fresh process"""
+    from main import CertificateProcessor
+    from readiness import Readiness
+
+    processor = CertificateProcessor(profile=profile, ocr_mode=ocr_mode, decode_max_pixels=decode_max_pixels)
+    processor.warm_up(Readiness())
+
+    start_kb = status_kb("VmRSS")
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    start = time.perf_counter()
+    if source == "bytes":
+        with open(path, "rb") as f:
+            upload = f.read()
+    else:
+        upload = path
+    text = processor.extract_text_with_ocr(upload)
+    seconds = time.perf_counter() - start
+    peak_kb = status_kb("VmHWM")
+    return {
+        "peak_mb": round((peak_kb - start_kb) / 1024, 1),
+        "seconds": round(seconds, 3),
+        "extracted": processor.extract_certificate_data(text).model_dump(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[8, 16, 40])
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS), default=["jpeg", "png"])
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=list(SOURCES))
+    parser.add_argument("--decode-max-pixels", type=int, help="DECODE_MAX_PIXELS to decode with (default: config)")
+    parser.add_argument("--ocr-mode", default="regions")
+    parser.add_argument("--profile", default="balanced")
+    parser.add_argument("--font", help="TrueType font to render with (default: Pillow's built-in font)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    import config
+    decode_max_pixels = args.decode_max_pixels or config.DECODE_MAX_PIXELS
+    record = make_records(1)[0]
+    a4_pixels_300dpi = A4_WIDTH_300DPI * int(A4_WIDTH_300DPI * 1.414)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for megapixels in args.megapixels:
+            dpi = int(300 * (megapixels * 1e6 / a4_pixels_300dpi) ** 0.5)
+            page = Image.fromarray(render_certificate(record, dpi=dpi, font_path=args.font)).convert("RGB")
+            for name in args.formats:
+                path = os.path.join(directory, f"certificate-{megapixels:g}mp.{name}")
+                buffer = io.BytesIO()
+                page.save(buffer, format=FORMATS[name], quality=90)
+                with open(path, "wb") as f:
+                    f.write(buffer.getvalue())
+                for source in args.sources:
+                    # A fresh process per request, so earlier requests don't hide its peak
+                    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+                        measured = executor.submit(measure_request, path, source, decode_max_pixels,
+                                                   args.ocr_mode, args.profile).result()
+                    checks = field_accuracy(record, measured.pop("extracted"))
+                    result = {
+                        "megapixels": round(page.width * page.height / 1e6, 1),
+                        "format": name,
+                        "file_mb": round(len(buffer.getvalue()) / 1024 / 1024, 2),
+                        "source": source,
+                        "accuracy": round(sum(checks.values()) / len(checks), 4),
+                        **measured,
+                    }
+                    results.append(result)
+                    print(f"{result['megapixels']:>6}MP {name:>5} {result['file_mb']:>6}MB from {source:<5}  "
+                          f"peak +{result['peak_mb']}MB  {result['seconds']}s  accuracy {result['accuracy']}")
+            page.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"decode_max_pixels": decode_max_pixels, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
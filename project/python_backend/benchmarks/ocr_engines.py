@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Measure per-call overhead of the OCR backends.
+
+Runs each backend repeatedly on a single text-line crop, where process spawn
+and model load dominate, and on a full certificate page. Requires Tesseract
+and, for the in-process backend, tesserocr.
+
+Usage (from python_backend/):
+    python -m benchmarks.ocr_engines --calls 20
+"""
+import argparse
+import json
+import statistics
+import time
+
+import cv2
+
+from layout import FIELD_OCR_CONFIGS, crop, detect_text_lines
+from main import TESSERACT_CONFIG
+from ocr_engine import create_engine
+from preprocessing import get_profile, preprocess
+from benchmarks.synthetic import make_records, render_certificate
+
+
+def build_inputs():
+    """A preprocessed certificate page and the crop of one of its text lines"""
+    page = preprocess(render_certificate(make_records(1)[0]), get_profile("balanced"))
+    regions, _ = detect_text_lines(page)
+    line = crop(page, max(regions, key=lambda region: region.y))
+    return page, line
+
+
+def time_calls(engine, image, config: str, calls: int) -> dict:
+    engine.image_to_string(image, config)  # warm-up, initializes in-process handles
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        engine.image_to_string(image, config)
+        timings.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(statistics.median(timings) * 1000, 1),
+        "mean_ms": round(statistics.mean(timings) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20, help="Timed calls per backend and input")
+    parser.add_argument("--backends", nargs="+", default=["pytesseract", "tesserocr"])
+    parser.add_argument("--tessdata", help="Tesseract language data directory for tesserocr")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    page, line = build_inputs()
+    results = []
+    for backend in args.backends:
+        engine = create_engine(backend, args.tessdata)
+        result = {
+            "backend": backend,
+            "line": time_calls(engine, line, FIELD_OCR_CONFIGS["certificate_number"], args.calls),
+            "page": time_calls(engine, page, TESSERACT_CONFIG, args.calls),
+        }
+        results.append(result)
+        print(f"{backend:>12}: line p50 {result['line']['p50_ms']}ms  page p50 {result['page']['p50_ms']}ms")
+
+    if len(results) > 1:
+        baseline = results[0]["line"]["p50_ms"]
+        for result in results[1:]:
+            print(f"{result['backend']} saves {baseline - result['line']['p50_ms']:.1f}ms per call "
+                  f"against {results[0]['backend']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Measure registry candidate lookup latency as the registry grows.
+
+Usage (from python_backend/):
+    python -m benchmarks.registry_lookup --sizes 100 10000 1000000 10000000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from registry import SQLiteRegistry
+
+INSTITUTIONS = ["ranchi university", "nit jamshedpur", "jharkhand university"]
+DEPARTMENTS = ["CSE", "ECE", "MEC", "CIV", "PHY", "CHE"]
+
+
+def synthetic_records(count: int, seed: int = 7):
+    """Generate registry rows with unique certificate and roll numbers"""
+    rng = random.Random(seed)
+    for i in range(count):
+        institution = INSTITUTIONS[i % len(INSTITUTIONS)]
+        dept = DEPARTMENTS[i % len(DEPARTMENTS)]
+        year = 1980 + (i // 7) % 45
+        yield {
+            "certificate_number": f"X{i % 97:02d}/{dept}/{year}/{i:08d}",
+            "student_name": f"student {rng.randrange(10 ** 6)} {i}",
+            "roll_number": f"{dept}{year}{i:08d}",
+            "course": "bachelor of technology",
+            "institution": institution,
+            "graduation_year": year,
+            "grade": "first class",
+        }
+
+
+def time_lookups(registry: SQLiteRegistry, size: int, lookups: int, seed: int = 11) -> dict:
+    rng = random.Random(seed)
+    samples = {"certificate_number": [], "roll_number": [], "block": []}
+    for _ in range(lookups):
+        i = rng.randrange(size)
+        dept = DEPARTMENTS[i % len(DEPARTMENTS)]
+        year = 1980 + (i // 7) % 45
+
+        start = time.perf_counter()
+        registry.candidates(certificate_number=f"X{i % 97:02d}/{dept}/{year}/{i:08d}")
+        samples["certificate_number"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        registry.candidates(roll_number=f"{dept}{year}{i:08d}")
+        samples["roll_number"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        registry.candidates(institution=INSTITUTIONS[i % len(INSTITUTIONS)], graduation_year=year)
+        samples["block"].append(time.perf_counter() - start)
+
+    return {
+        kind: {
+            "p50_us": round(statistics.median(values) * 1e6, 1),
+            "p95_us": round(sorted(values)[int(len(values) * 0.95) - 1] * 1e6, 1),
+        }
+        for kind, values in samples.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 1000000, 10000000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            registry = SQLiteRegistry(os.path.join(tmp, f"registry_{size}.db"), fuzzy=False)
+            start = time.perf_counter()
+            registry.add_many(synthetic_records(size))
+            load_seconds = time.perf_counter() - start
+            latency = time_lookups(registry, size, args.lookups)
+            results.append({"size": size, "load_seconds": round(load_seconds, 2), "latency": latency})
+            print(f"{size:>10} rows  load {load_seconds:7.2f}s  " + "  ".join(
+                f"{kind} p50 {stats['p50_us']}us p95 {stats['p95_us']}us" for kind, stats in latency.items()
+            ))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
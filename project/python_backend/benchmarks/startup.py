@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Measure server cold start per STARTUP_MODE: time to first request and memory per process.
+
+Launches the API with uvicorn for each mode, sends one certificate as soon
+as /health answers, and reports when /health, /ready and that first
+verification completed, measured from launch. It then sends one certificate
+per worker at once, so every worker handles its first job, and reports the
+slowest of those. Memory is read from /proc/<pid>/smaps_rollup for the server
+and each OCR worker after that burst; PSS splits shared copy-on-write pages
+between processes, so it shows what preforking saves. Linux only.
+
+Usage (from python_backend/):
+    python -m benchmarks.startup --modes lazy preload --workers 4
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+from benchmarks.synthetic import encode_png, make_records, render_certificate
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def post_file(url: str, filename: str, content: bytes, content_type: str) -> Tuple[int, bytes]:
+    """POST one file as multipart form data; returns the status and response body"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(url, data=body, method="POST",
+                                     headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def memory_kb(pid: int) -> dict:
+    """Rss and Pss of one process, in kB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name.lower()] = int(rest.split()[0])
+    return values
+
+
+def child_pids(pid: int):
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def wait_for(predicate, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if predicate():
+            return time.perf_counter()
+        time.sleep(0.01)
+    raise TimeoutError("Server did not come up in time")
+
+
+def timed_post(url: str, content: bytes) -> float:
+    start = time.perf_counter()
+    post_file(url, "certificate.png", content, "image/png")
+    return time.perf_counter() - start
+
+
+def launch_server(**env: str) -> Tuple[subprocess.Popen, str]:
+    """Start the API with uvicorn on a free local port; returns the process and its base URL"""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return server, f"http://127.0.0.1:{port}"
+
+
+def measure(mode: str, workers: int, uploads) -> dict:
+    launched = time.perf_counter()
+    server, base = launch_server(STARTUP_MODE=mode, OCR_WORKERS=str(workers))
+    try:
+        health_at = wait_for(lambda: get_status(f"{base}/health") == 200, 120)
+        status, _ = post_file(f"{base}/verify-certificate", "certificate.png", uploads[0], "image/png")
+        first_request_at = time.perf_counter()
+        ready_at = wait_for(lambda: get_status(f"{base}/ready") == 200, 120)
+        with ThreadPoolExecutor(workers) as executor:
+            burst = list(executor.map(lambda upload: timed_post(f"{base}/verify-certificate", upload), uploads[1:]))
+
+        server_memory = memory_kb(server.pid)
+        worker_memory = [memory_kb(pid) for pid in child_pids(server.pid)]
+        return {
+            "mode": mode,
+            "health_seconds": round(health_at - launched, 3),
+            "ready_seconds": round(ready_at - launched, 3),
+            "first_request_seconds": round(first_request_at - launched, 3),
+            "first_request_status": status,
+            "burst_max_seconds": round(max(burst), 3),
+            "server_rss_mb": round(server_memory["rss"] / 1024, 1),
+            "workers": len(worker_memory),
+            "worker_rss_mb": round(sum(m["rss"] for m in worker_memory) / 1024 / max(1, len(worker_memory)), 1),
+            "worker_pss_mb": round(sum(m["pss"] for m in worker_memory) / 1024 / max(1, len(worker_memory)), 1),
+            "total_pss_mb": round((server_memory["pss"] + sum(m["pss"] for m in worker_memory)) / 1024, 1),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["lazy", "preload"], choices=["lazy", "preload"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    # Distinct certificates so none is answered from the result cache
+    uploads = [encode_png(render_certificate(record, dpi=200)) for record in make_records(args.workers + 1)]
+    results = []
+    for mode in args.modes:
+        result = measure(mode, args.workers, uploads)
+        results.append(result)
+        print(f"{mode:>8}: /health {result['health_seconds']}s  /ready {result['ready_seconds']}s  "
+              f"first request {result['first_request_seconds']}s ({result['first_request_status']})  "
+              f"burst max {result['burst_max_seconds']}s  "
+              f"server RSS {result['server_rss_mb']}MB  worker RSS {result['worker_rss_mb']}MB  "
+              f"worker PSS {result['worker_pss_mb']}MB  total PSS {result['total_pss_mb']}MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Synthetic certificate images with ground truth, for benchmarks.
+
+Writes a reproducible corpus to disk when run directly; the benchmarks build
+the same corpus in memory from the same parameters.
+
+Usage (from python_backend/):
+    python -m benchmarks.synthetic corpus/ --documents 24 --dpi 200 300 --noise 0 12 --skew 0 1.5
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+FIRST_NAMES = ["rajesh", "priya", "amit", "sunita", "vikram", "anjali", "rohit", "kavita", "sanjay", "neha"]
+LAST_NAMES = ["kumar", "sharma", "singh", "verma", "gupta", "mishra", "das", "mahato", "oraon", "prasad"]
+COURSES = [
+    ("bachelor of technology", "computer science"),
+    ("bachelor of science", "physics"),
+    ("bachelor of arts", "economics"),
+    ("master of science", "chemistry"),
+]
+GRADES = ["first class with distinction", "first class", "second class"]
+
+# Certificate number layout per institution, matching VERIFIED_INSTITUTIONS formats
+NUMBER_FORMATS = {
+    "ranchi university": ("RU", 3, 3),
+    "nit jamshedpur": ("NIT", 3, 4),
+    "jharkhand university": ("JU", 3, 3),
+}
+DEPARTMENTS = ["CSE", "PHY", "ECO", "CHE"]
+
+# A4 width in pixels at 300 DPI
+A4_WIDTH_300DPI = 2480
+
+
+def make_records(count: int, seed: int = 1) -> List[Dict]:
+    """Generate ground-truth certificate records"""
+    rng = random.Random(seed)
+    institutions = list(NUMBER_FORMATS)
+    records = []
+    for i in range(count):
+        institution = institutions[i % len(institutions)]
+        prefix, dept_len, serial_len = NUMBER_FORMATS[institution]
+        dept = DEPARTMENTS[rng.randrange(len(DEPARTMENTS))][:dept_len]
+        year = rng.randrange(2005, 2025)
+        degree, subject = COURSES[rng.randrange(len(COURSES))]
+        records.append({
+            "certificate_number": f"{prefix}/{dept}/{year}/{rng.randrange(1, 10 ** serial_len):0{serial_len}d}",
+            "student_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "roll_number": f"{dept}{year - 4}{rng.randrange(1, 1000):03d}",
+            "course": f"{degree} in {subject}",
+            "institution": institution,
+            "graduation_year": year,
+            "grade": rng.choice(GRADES),
+        })
+    return records
+
+
+def render_certificate(record: Dict, dpi: int = 300, noise_sigma: float = 0.0, skew_degrees: float = 0.0,
+                       font_scale: float = 1.0, seed: int = 0, font_path: Optional[str] = None) -> np.ndarray:
+    """Render a grayscale certificate page for ``record``.
+
+    ``font_path`` is a TrueType font file; Pillow's built-in font is used when it is None.
+    """
+    scale = dpi / 300.0
+    width = int(A4_WIDTH_300DPI * scale)
+    height = int(width * 1.414)
+    image = Image.new("L", (width, height), 245)
+    draw = ImageDraw.Draw(image)
+
+    def font(size: int):
+        size = max(8, int(size * scale * font_scale))
+        return ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default(size=size)
+
+    # Decorative double border
+    for inset, stroke in ((int(60 * scale), int(12 * scale)), (int(100 * scale), int(3 * scale))):
+        draw.rectangle([inset, inset, width - inset, height - inset], outline=40, width=max(1, stroke))
+
+    degree, _, subject = record["course"].partition(" in ")
+    lines = [
+        (record["institution"].upper(), 110),
+        ("CERTIFICATE OF GRADUATION", 80),
+        ("", 40),
+        (f"This is to certify that {record['student_name'].upper()}", 56),
+        (f"Roll Number: {record['roll_number']}", 56),
+        (f"has successfully completed {degree.title()}", 56),
+        (f"in {subject.title()}", 56),
+        ("", 40),
+        (f"Certificate Number: {record['certificate_number']}", 56),
+        (f"Grade: {record['grade'].title()}", 56),
+        (f"Year of Graduation: {record['graduation_year']}", 56),
+        ("", 40),
+        (f"Issued on: 15th June {record['graduation_year']}", 48),
+    ]
+    y = int(420 * scale)
+    for text, size in lines:
+        if text:
+            f = font(size)
+            text_width = draw.textlength(text, font=f)
+            draw.text(((width - text_width) / 2, y), text, fill=20, font=f)
+        y += int(size * 1.9 * scale * font_scale)
+
+    page = np.array(image)
+    if skew_degrees:
+        page = np.array(image.rotate(skew_degrees, resample=Image.BICUBIC, fillcolor=245))
+    if noise_sigma:
+        rng = np.random.default_rng(seed)
+        noisy = page.astype(np.float32) + rng.normal(0, noise_sigma, page.shape)
+        page = np.clip(noisy, 0, 255).astype(np.uint8)
+    return page
+
+
+class Condition(NamedTuple):
+    """Scan conditions a certificate is rendered under"""
+    dpi: int = 300
+    noise_sigma: float = 0.0
+    skew_degrees: float = 0.0
+    font: str = "default"
+
+    @property
+    def label(self) -> str:
+        font = os.path.splitext(os.path.basename(self.font))[0]
+        return f"{self.dpi}dpi-noise{self.noise_sigma:g}-skew{self.skew_degrees:g}-{font}"
+
+
+class Sample(NamedTuple):
+    """One rendered certificate with its ground truth"""
+    name: str
+    condition: Condition
+    record: Dict
+    image_bytes: bytes
+
+
+def condition_grid(dpis: Iterable[int] = (300,), noise_sigmas: Iterable[float] = (0.0,),
+                   skews: Iterable[float] = (0.0,), fonts: Iterable[str] = ("default",)) -> List[Condition]:
+    """Every combination of the given scan parameters"""
+    return [Condition(*values) for values in itertools.product(dpis, noise_sigmas, skews, fonts)]
+
+
+def build_corpus(documents: int, conditions: List[Condition], seed: int = 1) -> List[Sample]:
+    """Render ``documents`` certificates, cycling through ``conditions``.
+
+    The same arguments always produce the same images.
+    """
+    samples = []
+    for i, record in enumerate(make_records(documents, seed=seed)):
+        condition = conditions[i % len(conditions)]
+        page = render_certificate(
+            record, dpi=condition.dpi, noise_sigma=condition.noise_sigma, skew_degrees=condition.skew_degrees,
+            seed=seed + i, font_path=None if condition.font == "default" else condition.font,
+        )
+        samples.append(Sample(f"{i:05d}.png", condition, record, encode_png(page)))
+    return samples
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser):
+    """Command-line options describing a synthetic corpus, shared by the benchmarks"""
+    parser.add_argument("--documents", type=int, default=24, help="Certificates to render")
+    parser.add_argument("--dpi", type=int, nargs="+", default=[300], help="Scan resolutions")
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.0], help="Gaussian noise sigmas")
+    parser.add_argument("--skew", type=float, nargs="+", default=[0.0], help="Rotations in degrees")
+    parser.add_argument("--fonts", nargs="+", default=["default"],
+                        help="TrueType font files, or 'default' for Pillow's built-in font")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def corpus_from_args(args: argparse.Namespace, seed_offset: int = 0) -> List[Sample]:
+    conditions = condition_grid(args.dpi, args.noise, args.skew, args.fonts)
+    return build_corpus(args.documents, conditions, args.seed + seed_offset)
+
+
+def write_corpus(directory: str, samples: List[Sample]):
+    """Write images plus a ground_truth.jsonl line per image"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "ground_truth.jsonl"), "w") as f:
+        for sample in samples:
+            with open(os.path.join(directory, sample.name), "wb") as image_file:
+                image_file.write(sample.image_bytes)
+            f.write(json.dumps({
+                "file": sample.name,
+                "condition": sample.condition._asdict(),
+                "expected": sample.record,
+            }) + "\n")
+
+
+def encode_png(page: np.ndarray) -> bytes:
+    """Encode a grayscale page as PNG bytes, as an upload would arrive"""
+    buffer = io.BytesIO()
+    Image.fromarray(page).convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def field_accuracy(expected: Dict, extracted: Dict) -> Dict[str, bool]:
+    """Compare extracted CertificateData fields against the ground truth"""
+    def same(a, b):
+        return a is not None and b is not None and str(a).strip().lower() == str(b).strip().lower()
+
+    return {
+        "certificate_number": same(extracted.get("certificate_number"), expected["certificate_number"]),
+        "roll_number": same(extracted.get("roll_number"), expected["roll_number"]),
+        "student_name": same(extracted.get("student_name"), expected["student_name"]),
+        "graduation_year": same(extracted.get("graduation_year"), expected["graduation_year"]),
+        "institution": same(extracted.get("institution"), expected["institution"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Output directory for the images and ground_truth.jsonl")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    samples = corpus_from_args(args)
+    write_corpus(args.directory, samples)
+    print(f"Wrote {len(samples)} certificates to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+
+# Runtime configuration, read from environment variables so each deployment
+# can be tuned without code changes.
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+def _env_str(name: str, default: str) -> str:
+    """Read a string setting from the environment"""
+    return os.getenv(name, default).strip()
+
+# OCR worker pool
+OCR_WORKERS = _env_int("OCR_WORKERS", os.cpu_count() or 1)
+OCR_QUEUE_SIZE = _env_int("OCR_QUEUE_SIZE", OCR_WORKERS * 2)
+OCR_RETRY_AFTER_SECONDS = _env_int("OCR_RETRY_AFTER_SECONDS", 5)
+
+# Startup: "preload" warms up OCR and matcher state before forking OCR workers;
+# "lazy" starts serving at once and loads everything on first use
+STARTUP_MODE = _env_str("STARTUP_MODE", "preload")
+
+# Image preprocessing profile: fast, balanced or max-quality
+PREPROCESS_PROFILE = _env_str("PREPROCESS_PROFILE", "balanced")
+
+# OCR mode: "regions" reads detected text lines only, "page" the whole page
+OCR_MODE = _env_str("OCR_MODE", "regions")
+
+# Tiered verification: images are first read by a quick pass and looked up by
+# exact registry keys; the full pipeline only runs when that is inconclusive
+TIERED_VERIFICATION = _env_int("TIERED_VERIFICATION", 0) == 1
+
+# OCR backend: auto, tesserocr (in-process) or pytesseract (tesseract subprocess)
+OCR_BACKEND = _env_str("OCR_BACKEND", "auto")
+# Tesseract language data directory for the tesserocr backend; empty uses its default
+TESSDATA_PATH = _env_str("TESSDATA_PATH", "")
+
+# Time allowed for regex field extraction per document, in milliseconds
+EXTRACTION_TIME_BUDGET_MS = _env_int("EXTRACTION_TIME_BUDGET_MS", 50)
+
+# Upload limits: larger uploads are rejected with 413, and uploads past
+# UPLOAD_SPOOL_BYTES are written to a temporary file in UPLOAD_SPOOL_DIR
+# (empty uses the system default) instead of being held in memory
+MAX_UPLOAD_BYTES = _env_int("MAX_UPLOAD_BYTES", 50 * 1024 * 1024)
+UPLOAD_SPOOL_BYTES = _env_int("UPLOAD_SPOOL_BYTES", 4 * 1024 * 1024)
+UPLOAD_SPOOL_DIR = _env_str("UPLOAD_SPOOL_DIR", "")
+
+# Images over MAX_IMAGE_PIXELS are rejected with 413 before decoding; images
+# over DECODE_MAX_PIXELS are downscaled by 2, 4 or 8 while decoding
+MAX_IMAGE_PIXELS = _env_int("MAX_IMAGE_PIXELS", 100_000_000)
+DECODE_MAX_PIXELS = _env_int("DECODE_MAX_PIXELS", 16_000_000)
+
+# Batch verification
+BATCH_MAX_FILES = _env_int("BATCH_MAX_FILES", 500)
+BATCH_MAX_ARCHIVE_BYTES = _env_int("BATCH_MAX_ARCHIVE_BYTES", 500 * 1024 * 1024)
+
+# OCR result cache
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL_SECONDS = _env_int("CACHE_TTL_SECONDS", 7 * 24 * 3600)
+CACHE_DB_PATH = _env_str("CACHE_DB_PATH", "")
+CACHE_DB_MAX_ENTRIES = _env_int("CACHE_DB_MAX_ENTRIES", 100000)
+
+# Certificate registry
+REGISTRY_BACKEND = _env_str("REGISTRY_BACKEND", "memory")
+REGISTRY_DB_PATH = _env_str("REGISTRY_DB_PATH", "registry.db")
+REGISTRY_BLOCK_LIMIT = _env_int("REGISTRY_BLOCK_LIMIT", 50)
+# On by default only for the in-memory registry: a SQLite registry's index
+# is built offline with `python registry.py --fuzzy-index`
+REGISTRY_FUZZY_INDEX = _env_int("REGISTRY_FUZZY_INDEX", 1 if REGISTRY_BACKEND == "memory" else 0) == 1
+
+# Image fingerprint index for near-duplicate and template-tamper detection;
+# FINGERPRINT_DB_PATH keeps fingerprints across restarts (empty: memory only)
+FINGERPRINT_INDEX = _env_int("FINGERPRINT_INDEX", 1) == 1
+FINGERPRINT_DB_PATH = _env_str("FINGERPRINT_DB_PATH", "")
+FINGERPRINT_MAX_DISTANCE = _env_int("FINGERPRINT_MAX_DISTANCE", 10)
+
+# Institution registry: JSON file or SQLite database; empty uses the built-in list
+INSTITUTIONS_PATH = _env_str("INSTITUTIONS_PATH", "")
+INSTITUTIONS_RELOAD_SECONDS = _env_int("INSTITUTIONS_RELOAD_SECONDS", 10)
+
+# PDF ingestion
+PDF_DPI = _env_int("PDF_DPI", 300)
+PDF_MAX_PAGES = _env_int("PDF_MAX_PAGES", 20)
+PDF_MIN_TEXT_CHARS = _env_int("PDF_MIN_TEXT_CHARS", 20)
+
+# Asynchronous jobs (POST /jobs): SQLite queue, spooled uploads and retries
+JOBS_DB_PATH = _env_str("JOBS_DB_PATH", "jobs.db")
+JOBS_SPOOL_DIR = _env_str("JOBS_SPOOL_DIR", "job_uploads")
+JOB_WORKERS = _env_int("JOB_WORKERS", OCR_WORKERS)
+JOB_MAX_ATTEMPTS = _env_int("JOB_MAX_ATTEMPTS", 3)
+JOB_RETRY_BACKOFF_SECONDS = _env_int("JOB_RETRY_BACKOFF_SECONDS", 5)
+JOB_RETENTION_SECONDS = _env_int("JOB_RETENTION_SECONDS", 7 * 24 * 3600)
@@ -0,0 +1,193 @@
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Characters searched before and after each anchor keyword
+SPAN_BEFORE = 80
+SPAN_AFTER = 160
+
+DEFAULT_TIME_BUDGET_MS = 50
+
+
+class FieldRule(NamedTuple):
+    """How to extract one CertificateData field from lowercased OCR text"""
+    field: str
+    # Keyword alternatives marking where the field may appear
+    anchors: Tuple[str, ...]
+    # Tried in order within the spans around the field's anchors
+    patterns: Tuple[Pattern, ...]
+    # Searched over the whole text when no anchored pattern matched
+    fallback: Optional[Pattern] = None
+    # Turns the first capture group into the field value
+    convert: Callable[[str], Any] = str.title
+    # Rejects otherwise matching values
+    accept: Optional[Callable[[str], bool]] = None
+    # Fallback takes the largest value instead of the first
+    fallback_max: bool = False
+
+
+def _course_title(value: str) -> str:
+    value = " ".join(value.split()).title()
+    return re.sub(r'\b(Of|In)\b', lambda m: m.group(1).lower(), value)
+
+
+def _compile(*patterns: str) -> Tuple[Pattern, ...]:
+    return tuple(re.compile(p, re.MULTILINE) for p in patterns)
+
+
+# Title before a name, left out of the captured name so it matches the registry
+HONORIFIC = r'(?:(?:mr|ms|mrs|dr)\.?\s+)?'
+
+
+# Rules in extraction order. Captures use bounded quantifiers and stop at line
+# ends, so a pattern can never scan past its span.
+FIELD_RULES = (
+    FieldRule(
+        "certificate_number",
+        anchors=("certificate", r"cert\b", "serial", "ref"),
+        patterns=_compile(
+            r'(?:certificate|cert)[:\s]*(?:no|number)[:\s]*([a-z0-9/\-]{1,40})',
+            r'(?:serial|ref)[:\s]*(?:no|number)[:\s]*([a-z0-9/\-]{1,40})',
+        ),
+        fallback=re.compile(r'\b([a-z]{2,4}/[a-z]{2,4}/\d{4}/\d{3,4})\b'),
+        convert=str.upper,
+    ),
+    FieldRule(
+        "roll_number",
+        anchors=("roll", "reg"),
+        patterns=_compile(
+            r'(?:roll|reg|registration)[:\s]*(?:no|number)[:\s]*([a-z0-9]{1,20})',
+            r'(?:roll|reg)[:\s]*([a-z0-9]{1,20})',
+        ),
+        fallback=re.compile(r'\b([a-z]{2,4}\d{4,8})\b'),
+        convert=str.upper,
+    ),
+    FieldRule(
+        "student_name",
+        anchors=("certify", "name", "student", r"m[rs]\b"),
+        patterns=_compile(
+            r'(?:name|student)[:\s]+' + HONORIFIC + r'([a-z][a-z. ]{0,60}?)[ \t]*(?:$|roll|reg)',
+            r'certify that\s+' + HONORIFIC + r'([a-z][a-z. ]{0,60}?)(?:\s+has\b|,|[ \t]*$)',
+            r'mr\.?\s+([a-z][a-z. ]{0,60}?)(?:\s+has\b|\s+son\b|[ \t]*$)',
+            r'ms\.?\s+([a-z][a-z. ]{0,60}?)(?:\s+has\b|\s+daughter\b|[ \t]*$)',
+        ),
+    ),
+    FieldRule(
+        "institution",
+        anchors=("university", "college", "institute", r"nit\b", r"iit\b"),
+        patterns=_compile(r'^[ \t]*([^\n]{0,80}\b(?:university|college|institute|nit|iit)\b[^\n]{0,80}?)[ \t]*$'),
+        accept=lambda value: len(value.split()) <= 6,
+    ),
+    FieldRule(
+        "graduation_year",
+        anchors=("year", "session", "batch"),
+        patterns=_compile(r'(?:year|session|batch)[:\s]*(\d{4})'),
+        fallback=re.compile(r'\b(19[5-9]\d|20[0-3]\d)\b'),
+        convert=int,
+        fallback_max=True,
+    ),
+    FieldRule(
+        "course",
+        anchors=("degree", "course", "program", "bachelor", "master", r"b\.?tech", r"b\.?sc"),
+        patterns=_compile(
+            r'(?:degree|course|program)[: \t]+([a-z][a-z ]{0,60}?)[ \t]*(?:$|\bin\b|\bfrom\b)',
+            r'((?:bachelor|master) of [a-z ]{1,60}?(?:\s+in [a-z ]{1,60})?)[ \t]*$',
+            r'((?:bachelor|master) of [a-z ]{1,60})',
+            r'b\.?tech\.?\s+in\s+([a-z ]{1,60})',
+            r'b\.?sc\.?\s+in\s+([a-z ]{1,60})',
+        ),
+        convert=_course_title,
+    ),
+    FieldRule(
+        "grade",
+        anchors=("grade", "class", "division", "first", "second", "third"),
+        patterns=_compile(
+            r'(?:grade|class|division)[ \t]*:[ \t]*([a-z][a-z ]{0,40}?)[ \t]*(?:$|\bwith\b)',
+            r'(first class with distinction)',
+            r'((?:first|second|third) class)',
+            r'\b([a-z]\+?)\s*grade',
+        ),
+    ),
+)
+
+
+class FieldExtractor:
+    """Single-pass extraction of certificate fields from OCR text.
+
+    One combined regex finds every anchor keyword in a single scan; each
+    field's patterns then run only within short spans around its own anchors.
+    Extraction stops once the per-document time budget is spent, returning
+    the fields found so far.
+    """
+
+    def __init__(self, rules: Tuple[FieldRule, ...] = FIELD_RULES, time_budget_ms: int = DEFAULT_TIME_BUDGET_MS):
+        self.rules = rules
+        self.time_budget = time_budget_ms / 1000.0
+        self.anchor_regex = re.compile(
+            r'\b(?:' + "|".join(f"(?P<{rule.field}>{'|'.join(rule.anchors)})" for rule in rules) + ")"
+        )
+
+    def find_spans(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Candidate (start, end) spans per field from one anchor scan"""
+        spans: Dict[str, List[Tuple[int, int]]] = {rule.field: [] for rule in self.rules}
+        for match in self.anchor_regex.finditer(text):
+            start = max(0, match.start() - SPAN_BEFORE)
+            end = min(len(text), match.end() + SPAN_AFTER)
+            # Finish the line the span ends in, so line-anchored patterns see all of it
+            line_end = text.find("\n", end, end + SPAN_AFTER)
+            if line_end != -1:
+                end = line_end
+            field_spans = spans[match.lastgroup]
+            # Merge overlapping spans so repeated keywords are searched once
+            if field_spans and start <= field_spans[-1][1]:
+                field_spans[-1] = (field_spans[-1][0], end)
+            else:
+                field_spans.append((start, end))
+        return spans
+
+    def _search(self, rule: FieldRule, pattern: Pattern, text: str, start: int, end: int) -> Optional[str]:
+        for match in pattern.finditer(text, start, end):
+            value = match.group(1).strip()
+            if value and (rule.accept is None or rule.accept(value)):
+                return value
+        return None
+
+    def extract_field(self, rule: FieldRule, text: str, spans: List[Tuple[int, int]],
+                      deadline: Optional[float] = None) -> Any:
+        """Value of one field, or None if it is not found before ``deadline``"""
+        for pattern in rule.patterns:
+            for start, end in spans:
+                if deadline is not None and time.perf_counter() > deadline:
+                    return None
+                value = self._search(rule, pattern, text, start, end)
+                if value is not None:
+                    return rule.convert(value)
+
+        if rule.fallback is not None:
+            if rule.fallback_max:
+                values = [rule.convert(match.group(1)) for match in rule.fallback.finditer(text)]
+                return max(values) if values else None
+            value = self._search(rule, rule.fallback, text, 0, len(text))
+            if value is not None:
+                return rule.convert(value)
+        return None
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Extract field values from OCR text; fields not found are omitted"""
+        deadline = time.perf_counter() + self.time_budget
+        text = text.lower().strip()
+        spans = self.find_spans(text)
+
+        values = {}
+        for rule in self.rules:
+            value = self.extract_field(rule, text, spans[rule.field], deadline)
+            if value is not None:
+                values[rule.field] = value
+            if time.perf_counter() > deadline:
+                logger.warning(f"Field extraction exceeded its {self.time_budget * 1000:.0f}ms budget "
+                               f"on {len(text)} characters; returning {len(values)} fields")
+                break
+        return values
@@ -0,0 +1,279 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Side of the square working copy every hash is computed from. Downsampling
+# averages out scan noise, so hashes follow the layout and ink, not the grain.
+PAGE_SIZE = 256
+
+# Layout regions: the page is split into a REGION_GRID x REGION_GRID grid
+REGION_GRID = 4
+REGIONS = REGION_GRID * REGION_GRID
+
+# Regions flatter than this (gray level standard deviation) carry no layout
+# information; their hash is stored as 0 and ignored when comparing
+MIN_REGION_CONTRAST = 3.0
+
+# A region matches when its dHash differs in at most this many of 64 bits
+REGION_MATCH_DISTANCE = 8
+
+# Share of regions, among those with content on both pages, that must match
+# for two pages to count as the same image
+MIN_MATCHING_REGIONS = 0.75
+
+# Pages with fewer regions with content than this are never matched
+MIN_CONTENT_REGIONS = 4
+
+# The 64-bit page hash is split into this many 16-bit substrings, each with
+# its own hash table (multi-index hashing)
+SUBSTRINGS = 4
+SUBSTRING_BITS = 64 // SUBSTRINGS
+
+# Extracted fields whose values are compared between matching images
+DETAIL_FIELDS = ("student_name", "roll_number", "certificate_number", "graduation_year", "grade", "course")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    digest TEXT PRIMARY KEY,
+    hashes BLOB NOT NULL,
+    fields BLOB NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+_M1, _M2, _M4, _H01 = (np.uint64(m) for m in (0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F,
+                                               0x0101010101010101))
+_S1, _S2, _S4, _S56 = (np.uint64(s) for s in (1, 2, 4, 56))
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Set bits in each element of a uint64 array (SWAR bit counting, no per-byte table lookups)"""
+    values = values - ((values >> _S1) & _M1)
+    values = (values & _M2) + ((values >> _S2) & _M2)
+    values = (values + (values >> _S4)) & _M4
+    return (values * _H01) >> _S56
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def phash(gray: np.ndarray) -> int:
+    """64-bit perceptual hash: signs of the lowest 8x8 DCT frequencies against their median"""
+    import cv2
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    return _bits_to_int(low > np.median(low[1:]))
+
+
+def dhash(gray: np.ndarray) -> int:
+    """64-bit difference hash: whether each of 8x8 cells is brighter than its left neighbour"""
+    import cv2
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+class ImageFingerprint(NamedTuple):
+    """pHash of the whole page plus a dHash per layout region, row by row (0 for blank regions)"""
+    page: int
+    regions: Tuple[int, ...]
+
+
+def fingerprint(gray: np.ndarray) -> ImageFingerprint:
+    """Fingerprint a decoded grayscale page; a few milliseconds for any page size"""
+    import cv2
+    page = cv2.resize(gray, (PAGE_SIZE, PAGE_SIZE), interpolation=cv2.INTER_AREA)
+    size = PAGE_SIZE // REGION_GRID
+    regions = []
+    for row in range(REGION_GRID):
+        for col in range(REGION_GRID):
+            cell = page[row * size:(row + 1) * size, col * size:(col + 1) * size]
+            regions.append(dhash(cell) if cell.std() >= MIN_REGION_CONTRAST else 0)
+    return ImageFingerprint(phash(page), tuple(regions))
+
+
+def field_hashes(fields: Dict) -> Tuple[int, ...]:
+    """32-bit hash per DETAIL_FIELDS value, 0 when the field is missing"""
+    hashes = []
+    for field in DETAIL_FIELDS:
+        value = fields.get(field)
+        if value is None or str(value).strip() == "":
+            hashes.append(0)
+        else:
+            hashes.append(zlib.crc32(str(value).strip().lower().encode()) or 1)
+    return tuple(hashes)
+
+
+class ImageMatch(NamedTuple):
+    """A previously seen upload whose image matches, and the fields that differ"""
+    digest: str
+    page_distance: int
+    matching_regions: int
+    compared_regions: int
+    differing_fields: Tuple[str, ...]
+
+
+class FingerprintIndex:
+    """Near-duplicate search over the fingerprints of every upload seen so far.
+
+    Candidates come from multi-index hashing on the page pHash: it is split
+    into ``SUBSTRINGS`` substrings with a hash table each, and by the
+    pigeonhole principle any hash within ``max_distance`` bits has some
+    substring within ``max_distance // SUBSTRINGS`` bits of the query's, so
+    probing that small neighbourhood in every table finds all of them without
+    a scan. Candidates are then checked against the region hashes in one
+    vectorized pass: re-saving or editing a few lines of a scan leaves most
+    regions intact, while a separate scan of the same template differs
+    throughout. Born-digital certificates made from one template are the
+    exception, since all their unedited regions are pixel-identical.
+
+    About 200 bytes per fingerprint are kept in memory. With ``db_path``,
+    fingerprints are also stored in SQLite and reloaded by ``load``, which
+    the first lookup calls if nothing did earlier.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_distance: int = 10):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        substring_radius = max_distance // SUBSTRINGS
+        self._probe_masks = [
+            sum(1 << bit for bit in bits)
+            for radius in range(substring_radius + 1)
+            for bits in combinations(range(SUBSTRING_BITS), radius)
+        ]
+        self._pages = array("Q")
+        self._regions = array("Q")
+        self._fields = array("I")
+        self._digests = bytearray()
+        self._tables: List[Dict[int, array]] = [defaultdict(lambda: array("i")) for _ in range(SUBSTRINGS)]
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._loaded = not db_path
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def load(self):
+        """Open the database and read its fingerprints into memory, if not done yet"""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        if not self._loaded:
+            self._open_db()
+            self._loaded = True
+
+    def _open_db(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        for digest, hashes, fields in self._db.execute("SELECT digest, hashes, fields FROM fingerprints"):
+            values = array("Q", hashes)
+            self._append(digest, ImageFingerprint(values[0], tuple(values[1:])), tuple(array("I", fields)))
+        logger.info(f"Loaded {len(self)} image fingerprints from {self.db_path}")
+
+    def _append(self, digest: str, image: ImageFingerprint, fields: Tuple[int, ...]):
+        row = len(self._pages)
+        self._pages.append(image.page)
+        self._regions.extend(image.regions)
+        self._fields.extend(fields)
+        self._digests += bytes.fromhex(digest)
+        for table, key in zip(self._tables, self._substrings(image.page)):
+            table[key].append(row)
+
+    @staticmethod
+    def _substrings(page: int) -> List[int]:
+        mask = (1 << SUBSTRING_BITS) - 1
+        return [(page >> (SUBSTRING_BITS * i)) & mask for i in range(SUBSTRINGS)]
+
+    def _candidates(self, page: int) -> np.ndarray:
+        """Rows whose page hash is within ``max_distance`` bits of ``page``"""
+        postings = bytearray()
+        for table, key in zip(self._tables, self._substrings(page)):
+            for rows in map(table.get, [key ^ probe for probe in self._probe_masks]):
+                if rows:
+                    postings += rows
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        rows = np.unique(np.frombuffer(postings, dtype=np.int32))
+        pages = np.frombuffer(self._pages, dtype=np.uint64)[rows]
+        return rows[_popcount(pages ^ np.uint64(page)) <= self.max_distance]
+
+    def _record(self, digest: str, image: ImageFingerprint, hashes: Tuple[int, ...]):
+        self._append(digest, image, hashes)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR IGNORE INTO fingerprints (digest, hashes, fields, created_at) VALUES (?, ?, ?, ?)",
+                (digest, array("Q", (image.page,) + image.regions).tobytes(), array("I", hashes).tobytes(), time.time())
+            )
+            self._db.commit()
+
+    def add(self, digest: str, image: ImageFingerprint, fields: Dict):
+        """Record an upload without matching it, e.g. to backfill the index"""
+        with self._lock:
+            self._load()
+            self._record(digest, image, field_hashes(fields))
+
+    def observe(self, digest: str, image: ImageFingerprint, fields: Dict) -> Optional[ImageMatch]:
+        """Match an upload against every fingerprint seen so far, then record it.
+
+        Returns the closest earlier upload whose image matches but whose
+        extracted details differ, or None. An upload whose digest is already
+        indexed is not recorded again.
+        """
+        hashes = field_hashes(fields)
+        with self._lock:
+            self._load()
+            match, seen = self._match(digest, image, hashes)
+            if not seen:
+                self._record(digest, image, hashes)
+        return match
+
+    def _match(self, digest: str, image: ImageFingerprint, hashes: Tuple[int, ...]) -> Tuple[Optional[ImageMatch], bool]:
+        rows = self._candidates(image.page)
+        if len(rows) == 0:
+            return None, False
+        digests = np.frombuffer(self._digests, dtype=np.uint8).reshape(-1, 32)[rows]
+        seen = bool((digests == np.frombuffer(bytes.fromhex(digest), dtype=np.uint8)).all(axis=1).any())
+
+        query = np.array(image.regions, dtype=np.uint64)
+        regions = np.frombuffer(self._regions, dtype=np.uint64).reshape(-1, REGIONS)[rows]
+        compared = (regions != 0) & (query != 0)
+        matching = compared & (_popcount(regions ^ query) <= REGION_MATCH_DISTANCE)
+        compared_count = compared.sum(axis=1)
+        matching_count = matching.sum(axis=1)
+        same_image = (compared_count >= MIN_CONTENT_REGIONS) & (matching_count >= MIN_MATCHING_REGIONS * compared_count)
+
+        query_fields = np.array(hashes, dtype=np.uint32)
+        fields = np.frombuffer(self._fields, dtype=np.uint32).reshape(-1, len(DETAIL_FIELDS))[rows]
+        differing = (fields != query_fields) & (fields != 0) & (query_fields != 0)
+        suspicious = np.flatnonzero(same_image & differing.any(axis=1))
+        if len(suspicious) == 0:
+            return None, seen
+
+        best = suspicious[np.argmax(matching_count[suspicious] / compared_count[suspicious])]
+        page_distance = bin(int(np.frombuffer(self._pages, dtype=np.uint64)[rows[best]]) ^ image.page).count("1")
+        return ImageMatch(
+            digest=digests[best].tobytes().hex(),
+            page_distance=page_distance,
+            matching_regions=int(matching_count[best]),
+            compared_regions=int(compared_count[best]),
+            differing_fields=tuple(field for field, differs in zip(DETAIL_FIELDS, differing[best]) if differs),
+        ), seen
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,297 @@
+import sqlite3
+import threading
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Characters Tesseract commonly confuses, folded onto one representative
+OCR_CONFUSIONS = str.maketrans({
+    "O": "0", "Q": "0",
+    "I": "1", "L": "1", "|": "1", "!": "1",
+    "S": "5",
+    "B": "8",
+    "Z": "2",
+    "G": "6",
+})
+
+GRAM_SIZE = 3
+
+# Upper bound on candidates verified with the full edit distance per query
+MAX_VERIFIED_CANDIDATES = 200
+
+# Bound parameters per SQLite statement
+SQL_BATCH_SIZE = 500
+
+
+def ocr_fold(text: str) -> str:
+    """Fold a value so OCR-confusable characters and separators compare equal"""
+    folded = text.upper().translate(OCR_CONFUSIONS)
+    return "".join(ch for ch in folded if ch.isalnum())
+
+
+def _grams(folded: str) -> Set[str]:
+    padded = f"^{folded}$"
+    if len(padded) <= GRAM_SIZE:
+        return {padded}
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _probe_grams(query_grams: Set[str], min_shared: int, posting_size) -> List[str]:
+    """The rarest grams of a query: any key sharing ``min_shared`` grams with it has one of them"""
+    by_rarity = sorted(query_grams, key=posting_size)
+    return by_rarity[:len(query_grams) - min_shared + 1]
+
+
+def _top_candidates(postings: List[np.ndarray]) -> np.ndarray:
+    """Key ids in the probed posting lists, at most MAX_VERIFIED_CANDIDATES sharing the most grams"""
+    key_ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+    if len(key_ids) > MAX_VERIFIED_CANDIDATES:
+        top = np.argpartition(-shared, MAX_VERIFIED_CANDIDATES)[:MAX_VERIFIED_CANDIDATES]
+        key_ids = key_ids[top]
+    return key_ids
+
+
+def _within_distance(folded: str, query_grams: Set[str], min_shared: int, key: str, max_distance: int) -> Optional[int]:
+    """Edit distance between a query and a candidate key, or None when over ``max_distance``"""
+    if abs(len(key) - len(folded)) > max_distance:
+        return None
+    # Count filter on the full gram sets before paying for edit distance
+    if len(query_grams & _grams(key)) < min_shared:
+        return None
+    distance = edit_distance(folded, key, max_distance)
+    return distance if distance <= max_distance else None
+
+
+class FuzzyIndex:
+    """OCR-tolerant lookup of registry keys such as certificate numbers.
+
+    Values are folded with ``ocr_fold`` first, so a pure character-confusion
+    misread ("RU/CSE/2O24/00l") is a single dict lookup. Anything further off
+    goes through a q-gram inverted index: by the q-gram lemma a string within
+    edit distance ``d`` shares all but ``GRAM_SIZE * d`` of the query's grams,
+    so only the rarest few posting lists need to be probed to find every
+    candidate, which are then verified with the real edit distance.
+
+    Each folded key keeps the first original value it was added with; only
+    keys reached from several originals keep a set of the others. The folded
+    form of a candidate is recomputed when it is verified.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._more: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, array] = defaultdict(lambda: array("i"))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: str):
+        """Index one original value"""
+        folded = ocr_fold(value)
+        if not folded:
+            return
+        with self._lock:
+            key_id = self._ids.get(folded)
+            if key_id is None:
+                self._ids[folded] = len(self._values)
+                for gram in _grams(folded):
+                    self._postings[gram].append(len(self._values))
+                self._values.append(value)
+            elif value != self._values[key_id]:
+                self._more.setdefault(key_id, set()).add(value)
+
+    def add_many(self, values: Iterable[str]):
+        for value in values:
+            self.add(value)
+
+    def _originals(self, key_id: int) -> List[str]:
+        more = self._more.get(key_id)
+        return sorted(more | {self._values[key_id]}) if more else [self._values[key_id]]
+
+    def search(self, value: str, k: int = 5, max_distance: int = 2) -> List[Tuple[str, int]]:
+        """Return up to ``k`` (original value, distance) pairs closest to ``value``"""
+        folded = ocr_fold(value)
+        if not folded:
+            return []
+
+        exact = self._ids.get(folded)
+        if exact is not None:
+            return [(original, 0) for original in self._originals(exact)][:k]
+
+        query_grams = _grams(folded)
+        min_shared = len(query_grams) - GRAM_SIZE * max_distance
+        if min_shared <= 0:
+            return []
+
+        probe = _probe_grams(query_grams, min_shared, lambda gram: len(self._postings.get(gram, ())))
+        with self._lock:
+            lists = [np.array(self._postings[gram], dtype=np.int32) for gram in probe if gram in self._postings]
+        if not lists:
+            return []
+
+        matches = []
+        for key_id in _top_candidates(lists).tolist():
+            distance = _within_distance(folded, query_grams, min_shared, ocr_fold(self._values[key_id]), max_distance)
+            if distance is not None:
+                for original in self._originals(key_id):
+                    matches.append((original, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches[:k]
+
+
+class SQLiteFuzzyIndex:
+    """``FuzzyIndex`` kept in tables of a SQLite database instead of memory.
+
+    Folded keys, their gram postings and per-gram posting counts are stored
+    next to the registry, so opening it costs nothing however large it is
+    and searches read only the probed posting lists. Like ``FuzzyIndex``, a
+    key stores one original value, plus a row per further original for keys
+    that have several. Shares the registry's connection and lock.
+    """
+
+    def __init__(self, db: sqlite3.Connection, lock: threading.Lock, name: str):
+        self._db = db
+        self._lock = lock
+        self._keys = f"fuzzy_{name}_keys"
+        self._more = f"fuzzy_{name}_originals"
+        self._postings = f"fuzzy_{name}_grams"
+        self._counts = f"fuzzy_{name}_gram_counts"
+        with self._lock:
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._keys} ("
+                "id INTEGER PRIMARY KEY, folded TEXT NOT NULL UNIQUE, original TEXT NOT NULL)"
+            )
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._more} ("
+                "key_id INTEGER NOT NULL, original TEXT NOT NULL, PRIMARY KEY (key_id, original)) WITHOUT ROWID"
+            )
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._postings} ("
+                "gram TEXT NOT NULL, key_id INTEGER NOT NULL, PRIMARY KEY (gram, key_id)) WITHOUT ROWID"
+            )
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._counts} (gram TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self._keys}").fetchone()[0]
+
+    def _select_in(self, query: str, values: Sequence) -> List[tuple]:
+        """Run ``query`` with its ``{}`` placeholder filled by a bound IN list, in batches"""
+        rows = []
+        for i in range(0, len(values), SQL_BATCH_SIZE):
+            batch = values[i:i + SQL_BATCH_SIZE]
+            rows.extend(self._db.execute(query.format(", ".join("?" * len(batch))), batch).fetchall())
+        return rows
+
+    def add(self, value: str):
+        """Index one original value"""
+        self.add_many([value])
+
+    def add_many(self, values: Iterable[str]):
+        """Index original values in one transaction"""
+        originals: Dict[str, List[str]] = {}
+        for value in values:
+            folded = ocr_fold(value)
+            if folded and value not in originals.setdefault(folded, []):
+                originals[folded].append(value)
+        if not originals:
+            return
+        with self._lock:
+            folded_keys = list(originals)
+            query = f"SELECT folded, id, original FROM {self._keys} WHERE folded IN ({{}})"
+            stored = {folded: (key_id, original) for folded, key_id, original in self._select_in(query, folded_keys)}
+            new_keys = [folded for folded in folded_keys if folded not in stored]
+            self._db.executemany(
+                f"INSERT INTO {self._keys} (folded, original) VALUES (?, ?)",
+                [(folded, originals[folded][0]) for folded in new_keys]
+            )
+            for folded, key_id, original in self._select_in(query, new_keys):
+                stored[folded] = (key_id, original)
+
+            postings = [(gram, stored[folded][0]) for folded in new_keys for gram in _grams(folded)]
+            self._db.executemany(f"INSERT OR IGNORE INTO {self._postings} (gram, key_id) VALUES (?, ?)", postings)
+            self._db.executemany(
+                f"INSERT INTO {self._counts} (gram, n) VALUES (?, ?) ON CONFLICT (gram) DO UPDATE SET n = n + excluded.n",
+                list(Counter(gram for gram, _ in postings).items())
+            )
+            self._db.executemany(
+                f"INSERT OR IGNORE INTO {self._more} (key_id, original) VALUES (?, ?)",
+                [(stored[folded][0], value) for folded, values in originals.items()
+                 for value in values if value != stored[folded][1]]
+            )
+            self._db.commit()
+
+    def _originals(self, keys: List[Tuple[int, str]]) -> Dict[int, List[str]]:
+        """Every original value of the given (key id, stored original) keys"""
+        found = {key_id: {original} for key_id, original in keys}
+        query = f"SELECT key_id, original FROM {self._more} WHERE key_id IN ({{}})"
+        for key_id, original in self._select_in(query, list(found)):
+            found[key_id].add(original)
+        return {key_id: sorted(values) for key_id, values in found.items()}
+
+    def search(self, value: str, k: int = 5, max_distance: int = 2) -> List[Tuple[str, int]]:
+        """Return up to ``k`` (original value, distance) pairs closest to ``value``"""
+        folded = ocr_fold(value)
+        if not folded:
+            return []
+
+        with self._lock:
+            exact = self._db.execute(f"SELECT id, original FROM {self._keys} WHERE folded = ?", (folded,)).fetchone()
+            if exact is not None:
+                return [(original, 0) for original in self._originals([tuple(exact)])[exact[0]]][:k]
+
+            query_grams = _grams(folded)
+            min_shared = len(query_grams) - GRAM_SIZE * max_distance
+            if min_shared <= 0:
+                return []
+
+            counts = dict(self._select_in(f"SELECT gram, n FROM {self._counts} WHERE gram IN ({{}})", list(query_grams)))
+            probe = [gram for gram in _probe_grams(query_grams, min_shared, lambda gram: counts.get(gram, 0)) if gram in counts]
+            if not probe:
+                return []
+            lists = [
+                np.fromiter((key_id for key_id, in self._db.execute(
+                    f"SELECT key_id FROM {self._postings} WHERE gram = ?", (gram,)
+                )), dtype=np.int64)
+                for gram in probe
+            ]
+            candidates = self._select_in(
+                f"SELECT id, folded, original FROM {self._keys} WHERE id IN ({{}})", _top_candidates(lists).tolist()
+            )
+
+            distances = {}
+            for key_id, key, original in candidates:
+                distance = _within_distance(folded, query_grams, min_shared, key, max_distance)
+                if distance is not None:
+                    distances[key_id] = (distance, original)
+            originals = self._originals([(key_id, original) for key_id, (_, original) in distances.items()])
+
+        matches = [(original, distances[key_id][0]) for key_id, values in originals.items() for original in values]
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches[:k]
@@ -0,0 +1,281 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS institutions (
+    name TEXT PRIMARY KEY,
+    aliases TEXT,
+    established INTEGER,
+    location TEXT,
+    courses TEXT,
+    certificate_format TEXT
+);
+"""
+
+
+class Institution(NamedTuple):
+    """A verified institution with its certificate number validator"""
+    name: str
+    aliases: Tuple[str, ...]
+    established: Optional[int]
+    location: Optional[str]
+    courses: Tuple[str, ...]
+    certificate_format: Optional[Pattern]
+
+    def matches_format(self, certificate_number: str) -> Optional[bool]:
+        """Whether a certificate number follows this institution's format, or None if it has none"""
+        if self.certificate_format is None:
+            return None
+        return self.certificate_format.match(certificate_number) is not None
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase and reduce to space-separated words, padded so matches fall on word boundaries"""
+    return " " + " ".join(re.sub(r"[^a-z0-9&]+", " ", text.lower()).split()) + " "
+
+
+def make_institution(name: str, entry: Dict) -> Institution:
+    """Build an Institution from a VERIFIED_INSTITUTIONS-style entry, compiling its format"""
+    certificate_format = entry.get("certificate_format")
+    return Institution(
+        name=name.strip().lower(),
+        aliases=tuple(alias.strip().lower() for alias in entry.get("aliases") or ()),
+        established=int(entry["established"]) if entry.get("established") else None,
+        location=entry.get("location"),
+        courses=tuple(entry.get("courses") or ()),
+        certificate_format=re.compile(certificate_format) if certificate_format else None,
+    )
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: finds every pattern in one pass over the text"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for pattern in patterns:
+            self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _link(self):
+        """Compute failure links breadth-first, merging outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start index, pattern index) for every occurrence"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in output[state]:
+                yield i - len(self.patterns[pattern_id]) + 1, pattern_id
+
+
+class _Snapshot(NamedTuple):
+    institutions: Dict[str, Institution]
+    automaton: AhoCorasick
+    # Institution for each automaton pattern
+    owners: List[Institution]
+
+
+def build_snapshot(institutions: Iterable[Institution]) -> _Snapshot:
+    by_name: Dict[str, Institution] = {}
+    patterns: Dict[str, Institution] = {}
+    for institution in institutions:
+        by_name[institution.name] = institution
+        for name in (institution.name,) + institution.aliases:
+            key = normalize_name(name)
+            if key.strip():
+                patterns.setdefault(key, institution)
+    return _Snapshot(by_name, AhoCorasick(patterns), list(patterns.values()))
+
+
+def read_institutions(path: str) -> List[Institution]:
+    """Load institutions from a JSON file or a SQLite database"""
+    if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT name, aliases, established, location, courses, certificate_format FROM institutions"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            make_institution(name, {
+                "aliases": json.loads(aliases) if aliases else [],
+                "established": established,
+                "location": location,
+                "courses": json.loads(courses) if courses else [],
+                "certificate_format": certificate_format,
+            })
+            for name, aliases, established, location, courses, certificate_format in rows
+        ]
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    # Either {name: entry} like VERIFIED_INSTITUTIONS or a list of entries with a "name" key
+    if isinstance(data, dict):
+        return [make_institution(name, entry) for name, entry in data.items()]
+    return [make_institution(entry["name"], entry) for entry in data]
+
+
+def write_institutions_db(path: str, institutions: Iterable[Institution]) -> int:
+    """Insert or replace institutions in a SQLite database"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        rows = [
+            (
+                institution.name,
+                json.dumps(list(institution.aliases)),
+                institution.established,
+                institution.location,
+                json.dumps(list(institution.courses)),
+                institution.certificate_format.pattern if institution.certificate_format else None,
+            )
+            for institution in institutions
+        ]
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO institutions VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+    finally:
+        conn.close()
+
+
+class InstitutionRegistry:
+    """Verified institutions, resolved from free text with an Aho-Corasick automaton.
+
+    Name resolution is a single pass over the text whatever the number of
+    institutions. With a ``source`` file, the registry checks its
+    modification time at most every ``reload_seconds`` and swaps in a freshly
+    built snapshot, so readers always see either the old or the new registry
+    in full and running processes pick up changes without a restart.
+    """
+
+    def __init__(self, institutions: Iterable[Institution] = (), source: Optional[str] = None,
+                 reload_seconds: float = 10.0):
+        self.source = source
+        self.reload_seconds = reload_seconds
+        self._reload_lock = threading.Lock()
+        self._source_mtime: Optional[float] = None
+        self._checked_at = time.monotonic()
+        if source:
+            self._source_mtime = self._mtime()
+            institutions = read_institutions(source)
+        self._snapshot = build_snapshot(institutions)
+        logger.info(f"Institution registry loaded with {len(self._snapshot.institutions)} institutions")
+
+    def _mtime(self) -> Optional[float]:
+        # SQLite writes land in the -wal file until checkpointed
+        mtimes = [os.path.getmtime(p) for p in (self.source, f"{self.source}-wal") if os.path.exists(p)]
+        return max(mtimes) if mtimes else None
+
+    def reload(self) -> int:
+        """Rebuild from the source and swap it in; returns the institution count"""
+        if not self.source:
+            return len(self._snapshot.institutions)
+        with self._reload_lock:
+            mtime = self._mtime()
+            snapshot = build_snapshot(read_institutions(self.source))
+            self._snapshot = snapshot
+            self._source_mtime = mtime
+        logger.info(f"Institution registry reloaded with {len(snapshot.institutions)} institutions")
+        return len(snapshot.institutions)
+
+    def maybe_reload(self):
+        """Start a background reload if the source changed, checking at most every ``reload_seconds``"""
+        if not self.source or time.monotonic() - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = time.monotonic()
+        if self._mtime() == self._source_mtime or self._reload_lock.locked():
+            return
+        # Lookups keep using the current snapshot while the new one is built
+        threading.Thread(target=self._reload_quietly, daemon=True).start()
+
+    def _reload_quietly(self):
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep serving the previous snapshot, e.g. while the file is being written
+            logger.error(f"Institution registry reload failed: {str(e)}")
+
+    def resolve(self, text: str) -> Optional[Institution]:
+        """The institution whose name or alias appears in ``text``, preferring the longest match"""
+        self.maybe_reload()
+        snapshot = self._snapshot
+        best = None
+        for start, pattern_id in snapshot.automaton.iter_matches(normalize_name(text)):
+            length = len(snapshot.automaton.patterns[pattern_id])
+            if best is None or length > best[0] or (length == best[0] and start < best[1]):
+                best = (length, start, pattern_id)
+        return snapshot.owners[best[2]] if best else None
+
+    def get(self, name: str) -> Optional[Institution]:
+        return self._snapshot.institutions.get(name.strip().lower())
+
+    def names(self) -> List[str]:
+        return list(self._snapshot.institutions)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.institutions)
+
+
+def open_institutions(source: Optional[str], seed: Dict[str, Dict], reload_seconds: float = 10.0) -> InstitutionRegistry:
+    """Registry from ``source`` if given, otherwise from the built-in seed entries"""
+    if source:
+        logger.info(f"Loading institution registry from {source}")
+        return InstitutionRegistry(source=source, reload_seconds=reload_seconds)
+    return InstitutionRegistry(make_institution(name, entry) for name, entry in seed.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import institution definitions into the institution registry")
+    parser.add_argument("files", nargs="+", help="JSON files of institutions")
+    parser.add_argument("--db", default="institutions.db", help="SQLite institution registry path")
+    args = parser.parse_args()
+
+    for path in args.files:
+        added = write_institutions_db(args.db, read_institutions(path))
+        print(f"Imported {added} institutions from {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Job states. Queued jobs become running when claimed and end up done or
+# failed; failures that may succeed on retry go back to queued.
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    filename TEXT,
+    content_type TEXT,
+    upload_path TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, created_at);
+"""
+
+# Number of completions between sweeps of expired finished jobs
+PRUNE_INTERVAL = 100
+
+
+class Job(NamedTuple):
+    id: str
+    status: str
+    priority: int
+    filename: Optional[str]
+    content_type: Optional[str]
+    upload_path: str
+    attempts: int
+    max_attempts: int
+    not_before: float
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+    def view(self) -> Dict[str, Any]:
+        """Public representation returned by the jobs API"""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "filename": self.filename,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+COLUMNS = ", ".join(Job._fields)
+
+
+def _job(row) -> Job:
+    job = Job(*row)
+    return job._replace(result=json.loads(job.result)) if job.result else job
+
+
+class JobQueue:
+    """Durable priority queue of verification jobs in SQLite.
+
+    Uploads are spooled to files under ``spool_dir`` and only their paths go
+    into the database; a job's upload is deleted once it finishes. Higher
+    ``priority`` jobs are claimed first, oldest first within a priority. A
+    job that fails with a retryable error is queued again after
+    ``retry_backoff_seconds``, doubling per attempt, until it has run
+    ``max_attempts`` times. Finished jobs are removed ``retention_seconds``
+    after they finish. The database is opened on first use.
+
+    A jobs database belongs to one server process: ``recover`` requeues
+    every job left running, which assumes no other process is working on it.
+    """
+
+    def __init__(self, db_path: str, spool_dir: str, max_attempts: int = 3,
+                 retry_backoff_seconds: float = 5.0, retention_seconds: int = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.spool_dir = spool_dir
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._finished_since_prune = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def opened(self) -> bool:
+        """Whether the database has been opened, and so created if it was missing"""
+        return self._conn is not None
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+            self._conn = conn
+            logger.info(f"Job queue stored in {self.db_path}, uploads spooled to {self.spool_dir}")
+        return self._conn
+
+    def submit(self, content: Union[bytes, str], filename: Optional[str], content_type: Optional[str],
+               priority: int = 0) -> Job:
+        """Spool an upload and queue a job for it.
+
+        ``content`` is the upload's bytes, or the path of a file holding it,
+        which is moved into the spool directory.
+        """
+        job_id = uuid.uuid4().hex
+        upload_path = os.path.join(self.spool_dir, job_id)
+        now = time.time()
+        with self._lock:
+            db = self._db
+            # Written before the row exists, so a queued job always has its upload
+            if isinstance(content, bytes):
+                with open(upload_path, "wb") as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                shutil.move(content, upload_path)
+                with open(upload_path, "rb") as f:
+                    os.fsync(f.fileno())
+            db.execute(
+                f"INSERT INTO jobs ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, NULL, NULL, ?, NULL, NULL)",
+                (job_id, QUEUED, priority, filename, content_type, upload_path, self.max_attempts, now, now)
+            )
+            db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def claim(self) -> Optional[Job]:
+        """Mark the next runnable job as running and return it, or None if there is none"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ? "
+                f"WHERE id = (SELECT id FROM jobs WHERE status = ? AND not_before <= ? "
+                f"ORDER BY priority DESC, created_at LIMIT 1) RETURNING {COLUMNS}",
+                (RUNNING, now, QUEUED, now)
+            ).fetchone()
+            self._db.commit()
+        return _job(row) if row else None
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        self._finish(job_id, DONE, result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str, retry: bool = True) -> Job:
+        """Record a failed attempt, queueing the job again if it has attempts left"""
+        job = self.get(job_id)
+        if retry and job.attempts < job.max_attempts:
+            delay = self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+            with self._lock:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, not_before = ? WHERE id = ?",
+                    (QUEUED, error, time.time() + delay, job_id)
+                )
+                self._db.commit()
+            logger.warning(f"Job {job_id} attempt {job.attempts} failed, retrying in {delay:g}s: {error}")
+        else:
+            self._finish(job_id, FAILED, error=error)
+            logger.error(f"Job {job_id} failed after {job.attempts} attempts: {error}")
+        return self.get(job_id)
+
+    def release(self, job_id: str):
+        """Put a running job back in the queue without counting the attempt, e.g. on shutdown"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0) WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING)
+            )
+            self._db.commit()
+
+    def recover(self) -> int:
+        """Retry jobs that were running when the process stopped; returns how many.
+
+        The interrupted run counts as an attempt, so an upload that keeps
+        crashing the server is eventually given up on.
+        """
+        with self._lock:
+            job_ids = [row[0] for row in self._db.execute("SELECT id FROM jobs WHERE status = ?", (RUNNING,))]
+        for job_id in job_ids:
+            self.fail(job_id, "Interrupted by a server restart")
+        return len(job_ids)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? RETURNING upload_path",
+                (status, result, error, time.time(), job_id)
+            ).fetchone()
+            self._finished_since_prune += 1
+            if self._finished_since_prune >= PRUNE_INTERVAL:
+                self._db.execute(
+                    "DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.retention_seconds,)
+                )
+                self._finished_since_prune = 0
+            self._db.commit()
+        if row is not None:
+            try:
+                os.unlink(row[0])
+            except FileNotFoundError:
+                pass
+
+    def next_retry_in(self) -> Optional[float]:
+        """Seconds until the earliest delayed job becomes runnable, or None if none is waiting"""
+        with self._lock:
+            row = self._db.execute("SELECT MIN(not_before) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()
+        return max(0.0, row[0] - time.time()) if row[0] is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
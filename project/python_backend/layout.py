@@ -0,0 +1,191 @@
+import logging
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from preprocessing import estimate_text_height
+
+logger = logging.getLogger(__name__)
+
+
+class TextRegion(NamedTuple):
+    x: int
+    y: int
+    w: int
+    h: int
+
+
+# Tesseract settings per field. Values are OCR'd as single lines (psm 7) with
+# a whitelist limited to the characters that field can contain.
+FIELD_OCR_CONFIGS = {
+    "institution": r'--oem 3 --psm 7 -c "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,&() "',
+    "certificate_number": r'--oem 3 --psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789/-',
+    "roll_number": r'--oem 3 --psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789',
+    "grade": r'--oem 3 --psm 7 -c "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz:+ "',
+}
+
+# Shape of a correctly read value per field. Lines whose first-pass text
+# already matches are kept, so only doubtful fields pay for a second OCR call.
+FIELD_VALUE_PATTERNS = {
+    "institution": re.compile(r'[A-Za-z.,&() ]+'),
+    "certificate_number": re.compile(r'[A-Z]{2,4}/[A-Z]{2,4}/\d{4}/\d{3,4}'),
+    "roll_number": re.compile(r'[A-Z]{2,4}\d{5,10}'),
+    "grade": re.compile(r'[A-Za-z: +]+'),
+}
+
+# Canonical line written back for refined fields, so extract_certificate_data
+# sees the same "Label: value" shape regardless of how the certificate words it
+FIELD_LINE_TEMPLATES = {
+    "certificate_number": "Certificate Number: {}",
+    "roll_number": "Roll Number: {}",
+}
+
+# Fields whose value is the last word of their line, after the label
+VALUE_ONLY_FIELDS = ("certificate_number", "roll_number")
+
+# Fraction of the page height searched for the institution header
+HEADER_REGION = 0.35
+
+# White gap, in character heights, between lines in the stacked OCR image
+STACK_GAP = 1.0
+
+CERTIFICATE_LINE = re.compile(r'certificate\s*(?:no|number|#)|serial\s*(?:no|number)|\b[a-z]{2,4}/[a-z]{2,4}/\d{4}/\d{3,4}\b')
+ROLL_LINE = re.compile(r'\b(?:roll|reg|registration|enrol+ment)\b')
+GRADE_LINE = re.compile(r'\b(?:grade|class|division|cgpa)\b')
+NAME_LINE = re.compile(r'certify that|\bname\b|\bmr\.?\s|\bms\.?\s')
+
+
+def detect_text_lines(binary: np.ndarray) -> Tuple[List[TextRegion], float]:
+    """Find text line boxes on a binarized page (dark text on white).
+
+    Long horizontal and vertical strokes (borders, rules, frames) are removed
+    first, then characters are merged into lines with a wide closing. Returns
+    the line boxes from top to bottom and the estimated character height.
+    """
+    import cv2
+    char_height = estimate_text_height(binary) or 30.0
+    ink = cv2.bitwise_not(binary)
+
+    # Strip decorative rules and borders
+    long_side = max(3, int(char_height * 6))
+    horizontal = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (long_side, 1)))
+    vertical = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, long_side)))
+    text_ink = cv2.subtract(ink, cv2.bitwise_or(horizontal, vertical))
+
+    # Merge characters and words into line blobs
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, int(char_height * 1.2)), max(1, int(char_height * 0.2))))
+    merged = cv2.morphologyEx(text_ink, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    page_height, page_width = binary.shape[:2]
+    pad = max(2, int(char_height * 0.3))
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < char_height * 0.5 or h > char_height * 4 or w < char_height:
+            continue
+        density = cv2.countNonZero(text_ink[y:y + h, x:x + w]) / float(w * h)
+        if density < 0.03 or density > 0.7:
+            continue
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        x1, y1 = min(page_width, x + w + pad), min(page_height, y + h + pad)
+        regions.append(TextRegion(x0, y0, x1 - x0, y1 - y0))
+
+    return merge_line_fragments(regions), char_height
+
+
+def merge_line_fragments(regions: List[TextRegion]) -> List[TextRegion]:
+    """Join boxes that sit side by side on the same line, such as the words of a large header"""
+    merged: List[TextRegion] = []
+    for region in sorted(regions, key=lambda r: (r.x, r.y)):
+        for i, other in enumerate(merged):
+            overlap = min(region.y + region.h, other.y + other.h) - max(region.y, other.y)
+            gap = region.x - (other.x + other.w)
+            if overlap > 0.5 * min(region.h, other.h) and gap < 2 * max(region.h, other.h):
+                x0, y0 = min(region.x, other.x), min(region.y, other.y)
+                x1 = max(region.x + region.w, other.x + other.w)
+                y1 = max(region.y + region.h, other.y + other.h)
+                merged[i] = TextRegion(x0, y0, x1 - x0, y1 - y0)
+                break
+        else:
+            merged.append(region)
+    merged.sort(key=lambda region: (region.y, region.x))
+    return merged
+
+
+def stack_regions(binary: np.ndarray, regions: List[TextRegion], char_height: float) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """Copy line crops into one compact white canvas, one below the other.
+
+    Returns the canvas and each region's vertical span within it.
+    """
+    gap = int(char_height * STACK_GAP)
+    width = max(region.w for region in regions) + 2 * gap
+    height = sum(region.h for region in regions) + gap * (len(regions) + 1)
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+    spans = []
+    y = gap
+    for region in regions:
+        canvas[y:y + region.h, gap:gap + region.w] = binary[region.y:region.y + region.h, region.x:region.x + region.w]
+        spans.append((y, y + region.h))
+        y += region.h + gap
+    return canvas, spans
+
+
+def last_word(binary: np.ndarray, region: TextRegion, char_height: float) -> Optional[TextRegion]:
+    """Box of the rightmost word in a line, i.e. the value after its label"""
+    import cv2
+    crop = cv2.bitwise_not(binary[region.y:region.y + region.h, region.x:region.x + region.w])
+    # Close gaps between letters but not the wider gaps between words
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(2, int(char_height * 0.35)), max(1, int(char_height * 0.5))))
+    words = cv2.morphologyEx(crop, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(words, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = [cv2.boundingRect(c) for c in contours]
+    boxes = [box for box in boxes if box[3] >= char_height * 0.4]
+    if len(boxes) < 2:
+        return None
+    x, _, w, _ = max(boxes, key=lambda box: box[0])
+    pad = max(2, int(char_height * 0.2))
+    x0 = max(0, x - pad)
+    x1 = min(region.w, x + w + pad)
+    return TextRegion(region.x + x0, region.y, x1 - x0, region.h)
+
+
+def classify_lines(regions: List[TextRegion], texts: List[str], page_height: int) -> List[str]:
+    """Label each line as a certificate field, or "other"."""
+    labels = []
+    for text in texts:
+        lowered = text.lower()
+        if CERTIFICATE_LINE.search(lowered):
+            labels.append("certificate_number")
+        elif ROLL_LINE.search(lowered):
+            labels.append("roll_number")
+        elif NAME_LINE.search(lowered):
+            labels.append("name")
+        elif GRADE_LINE.search(lowered):
+            labels.append("grade")
+        else:
+            labels.append("other")
+
+    # The institution is the largest unlabelled line near the top of the page
+    header_candidates = [
+        i for i, region in enumerate(regions)
+        if labels[i] == "other" and region.y < page_height * HEADER_REGION and texts[i].strip()
+    ]
+    if header_candidates:
+        header = max(header_candidates, key=lambda i: regions[i].h)
+        labels[header] = "institution"
+    return labels
+
+
+def needs_refinement(label: str, text: str) -> bool:
+    """Whether a classified line's first-pass text fails its field's value pattern"""
+    pattern = FIELD_VALUE_PATTERNS.get(label)
+    if pattern is None:
+        return False
+    value = text.split()[-1] if label in VALUE_ONLY_FIELDS and text.split() else text
+    return not pattern.fullmatch(value.strip())
+
+
+def crop(binary: np.ndarray, region: TextRegion) -> np.ndarray:
+    return binary[region.y:region.y + region.h, region.x:region.x + region.w]
@@ -1,21 +1,48 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, Header, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import cv2
-import pytesseract
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import numpy as np
-from PIL import Image
+import anyio
+import asyncio
+import bisect
+import gc
+import importlib
 import io
-import re
+import os
 import json
-from typing import Dict, List, Optional
+import mimetypes
+import tempfile
+import threading
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 from pydantic import BaseModel
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
 import logging
 
+import config
+from worker_pool import WorkerPool, PoolSaturatedError
+from result_cache import ResultCache, digest_key
+from registry import CertificateRegistry, InMemoryRegistry, RegistryTable, open_registry
+from fuzzy_index import ocr_fold
+from fingerprint import FingerprintIndex, ImageFingerprint, ImageMatch, fingerprint
+from pdf_ingest import PDFError, iter_pdf_pages, rasterize_pdf_page
+from preprocessing import (
+    DEFAULT_DECODE_MAX_PIXELS, DEFAULT_MAX_IMAGE_PIXELS, DEFAULT_PROFILE,
+    ImageTooLargeError, UnreadableImageError, decode_grayscale, get_profile, preprocess
+)
+from ocr_engine import OCREngine, create_engine
+from field_extraction import DEFAULT_TIME_BUDGET_MS, FieldExtractor
+from institutions import Institution, InstitutionRegistry, open_institutions
+from readiness import Readiness
+from metrics import SIZE_BUCKETS, MetricsRegistry, StageTimings
+from job_queue import FINISHED_STATES, QUEUED, JobQueue
+from uploads import SpooledUpload, UploadTooLargeError, spool
+from layout import (
+    FIELD_LINE_TEMPLATES, FIELD_OCR_CONFIGS, VALUE_ONLY_FIELDS,
+    classify_lines, crop, detect_text_lines, last_word, needs_refinement, stack_regions
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,6 +67,22 @@ async def global_exception_handler(request, exc):
         content={"detail": f"Internal server error: {str(exc)}"}
     )
 
+# Endpoints that take one certificate upload, and the multipart framing allowed on top of its size
+SINGLE_UPLOAD_PATHS = ("/verify-certificate", "/jobs")
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse uploads whose declared size is over the limit before their body is read"""
+    if request.method == "POST" and request.url.path in SINGLE_UPLOAD_PATHS:
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > config.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Upload is larger than the {config.MAX_UPLOAD_BYTES} byte limit"}
+            )
+    return await call_next(request)
+
 class CertificateData(BaseModel):
     student_name: Optional[str] = None
     roll_number: Optional[str] = None
@@ -59,16 +102,39 @@ class VerificationResult(BaseModel):
     institution_verified: bool
     extracted_data: CertificateData
     timestamp: str
+    # Whether a registry record matched on more than 80% of the compared fields
+    exact_match: bool = False
+    # Digest of an earlier upload with the same image but different details, if any
+    near_duplicate_of: Optional[str] = None
+    # Verification tier that produced the result: QUICK_TIER or FULL_TIER
+    decided_by_tier: Optional[int] = None
+    # Milliseconds per pipeline stage, only filled in when the request sends X-Debug-Timings
+    stage_timings: Optional[Dict[str, float]] = None
+
+class CandidateScores(NamedTuple):
+    """Registry candidates for one certificate, with the similarity of its name and course to each"""
+    candidates: List[Dict]
+    name_scores: np.ndarray
+    course_scores: np.ndarray
 
-# Mock database of verified institutions and certificates
+# Version of the OCR + field extraction pipeline. Bump it whenever
+# preprocess_image, the Tesseract configuration or extract_certificate_data
+# change so cached extractions are recomputed. Database and scoring changes
+# do not need a bump: verify_against_database always runs on cached data.
+PIPELINE_VERSION = "5"
+
+# Mock database of verified institutions and certificates. Used to seed the
+# institution registry when INSTITUTIONS_PATH is not set.
 VERIFIED_INSTITUTIONS = {
     "ranchi university": {
+        "aliases": ["ranchi univ"],
         "established": 1960,
         "location": "ranchi, jharkhand",
         "courses": ["bachelor of technology", "bachelor of science", "master of science", "bachelor of arts"],
         "certificate_format": r"RU/[A-Z]{3}/\d{4}/\d{3}"
     },
     "nit jamshedpur": {
+        "aliases": ["national institute of technology jamshedpur", "nit jsr"],
         "established": 1960,
         "location": "jamshedpur, jharkhand",
         "courses": ["bachelor of technology", "master of technology", "phd"],
@@ -104,204 +170,315 @@ VERIFIED_CERTIFICATES = [
     }
 ]
 
+# Tesseract configuration for full-page OCR. The whitelist is quoted because
+# pytesseract shell-splits the config, which would otherwise drop its space.
+TESSERACT_CONFIG = r'--oem 3 --psm 6 -c "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,/:-() "'
+
+# First-pass configuration for stacked text lines of varying size
+REGION_TESSERACT_CONFIG = r'--oem 3 --psm 4 -c "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,/:-() "'
+
+# "page" runs Tesseract over the whole page; "regions" OCRs detected text lines only
+OCR_MODES = ("page", "regions")
+
+# Pages with fewer detected lines than this are OCR'd as a whole
+MIN_TEXT_REGIONS = 3
+
+# Tiered verification: the quick tier reads the page at the "quick" profile,
+# re-reads only these fields and looks them up by exact key; the full tier is
+# the configured pipeline with fuzzy registry matching
+QUICK_TIER = 1
+FULL_TIER = 2
+QUICK_PROFILE = "quick"
+QUICK_REFINE_FIELDS = ("certificate_number", "roll_number")
+
+# A quick-tier result only stands when it matched the registry exactly and
+# these fields were read
+QUICK_REQUIRED_FIELDS = ("student_name", "certificate_number")
+
+# "preload" warms up before forking the OCR workers; "lazy" loads on first use
+STARTUP_MODES = ("preload", "lazy")
+
+# Heavy modules that request handling would otherwise import on first use.
+# Warm-up imports them in the parent so forked workers share them.
+PRELOAD_MODULES = ("cv2", "PIL.Image", "fitz", "scipy.sparse", "sklearn.feature_extraction.text")
+
 class CertificateProcessor:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english')
-        
-    def preprocess_image(self, image_bytes: bytes) -> np.ndarray:
-        """Preprocess image for better OCR results"""
+    def __init__(self, registry: Optional[CertificateRegistry] = None, profile: str = DEFAULT_PROFILE,
+                 ocr_mode: str = "regions", ocr_engine: Optional[OCREngine] = None,
+                 extraction_budget_ms: int = DEFAULT_TIME_BUDGET_MS,
+                 institutions: Optional[InstitutionRegistry] = None,
+                 max_image_pixels: int = DEFAULT_MAX_IMAGE_PIXELS,
+                 decode_max_pixels: int = DEFAULT_DECODE_MAX_PIXELS):
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode: {ocr_mode}. Choose from {', '.join(OCR_MODES)}")
+        self.profile = get_profile(profile)
+        self.quick_profile = get_profile(QUICK_PROFILE)
+        self.ocr_mode = ocr_mode
+        self.field_extractor = FieldExtractor(time_budget_ms=extraction_budget_ms)
+        self.registry = registry or InMemoryRegistry(VERIFIED_CERTIFICATES)
+        self.institutions = institutions or open_institutions(None, VERIFIED_INSTITUTIONS)
+        self.max_image_pixels = max_image_pixels
+        self.decode_max_pixels = decode_max_pixels
+        # The OCR engine and the TF-IDF matcher are built on first use or by warm_up()
+        self._ocr_engine = ocr_engine
+        self._matcher = None
+        self._lazy_lock = threading.Lock()
+    
+    @property
+    def ocr_engine(self) -> OCREngine:
+        if self._ocr_engine is None:
+            with self._lazy_lock:
+                if self._ocr_engine is None:
+                    self._ocr_engine = create_engine(config.OCR_BACKEND, config.TESSDATA_PATH or None)
+        return self._ocr_engine
+    
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            with self._lazy_lock:
+                if self._matcher is None:
+                    from matcher import TextMatcher
+                    matcher = TextMatcher()
+                    matcher.fit_registry(self.registry)
+                    self._matcher = matcher
+        return self._matcher
+    
+    def warm_up(self, readiness: Readiness):
+        """Import OCR dependencies, load the OCR model and fit the matcher ahead of requests"""
+        with readiness.stage_timer("imports"):
+            for module in PRELOAD_MODULES:
+                try:
+                    importlib.import_module(module)
+                except ImportError as e:
+                    logger.warning(f"Warm-up could not import {module}: {str(e)}")
+        with readiness.stage_timer("ocr_engine"):
+            try:
+                self.ocr_engine.warm_up()
+            except ValueError as e:
+                # Raised when the backend can't be imported off the main thread
+                logger.warning(f"OCR engine not preloaded, workers will load it: {str(e)}")
+        with readiness.stage_timer("matcher"):
+            self.matcher
+    
+    def decode_image(self, source: Union[bytes, str]) -> np.ndarray:
+        """Decode uploaded image bytes or a spooled upload file to a grayscale array"""
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to OpenCV format
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
-            
-            # Apply noise reduction
-            denoised = cv2.fastNlMeansDenoising(gray)
-            
-            # Apply adaptive thresholding
-            thresh = cv2.adaptiveThreshold(
-                denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-            )
-            
-            # Morphological operations to clean up
-            kernel = np.ones((1, 1), np.uint8)
-            cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-            
-            return cleaned
+            return decode_grayscale(source, self.max_image_pixels, self.decode_max_pixels)
+        except ImageTooLargeError:
+            raise
         except Exception as e:
+            # Raised in pool workers, so it must survive pickling; HTTPException doesn't
             logger.error(f"Image preprocessing failed: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Image preprocessing failed: {str(e)}")
+            raise UnreadableImageError("Unreadable image")
+    
+    def preprocess_image(self, source: Union[bytes, str]) -> np.ndarray:
+        """Preprocess image for better OCR results"""
+        return self.preprocess_grayscale(self.decode_image(source), overwrite_input=True)
+    
+    def preprocess_grayscale(self, gray: np.ndarray, overwrite_input: bool = False) -> np.ndarray:
+        """Normalize resolution, denoise as needed and binarize a grayscale image for OCR"""
+        return preprocess(gray, self.profile, overwrite_input)
+    
+    def run_tesseract(self, processed_image: np.ndarray, config: str = TESSERACT_CONFIG) -> str:
+        """Run Tesseract on a preprocessed image"""
+        text = self.ocr_engine.image_to_string(processed_image, config)
+        logger.info(f"OCR extracted text length: {len(text)}")
+        return text.strip()
+    
+    def extract_text_by_regions(self, processed_image: np.ndarray, refine_fields: Optional[Sequence[str]] = None) -> str:
+        """OCR only the detected text lines, re-reading key fields (all, or ``refine_fields``) with field-specific settings"""
+        regions, char_height = detect_text_lines(processed_image)
+        if len(regions) < MIN_TEXT_REGIONS:
+            logger.info(f"Only {len(regions)} text regions found, falling back to full-page OCR")
+            return self.run_tesseract(processed_image)
+        
+        # First pass: every line crop in one compact image
+        canvas, spans = stack_regions(processed_image, regions, char_height)
+        words = self.ocr_engine.image_to_data(canvas, REGION_TESSERACT_CONFIG)
+        line_words = [[] for _ in regions]
+        span_starts = [start for start, _ in spans]
+        for text, left, top, height in zip(words["text"], words["left"], words["top"], words["height"]):
+            if not text.strip():
+                continue
+            center = top + height / 2
+            line = max(0, bisect.bisect_right(span_starts, center) - 1)
+            line_words[line].append((left, text))
+        texts = [" ".join(text for _, text in sorted(found)) for found in line_words]
+        
+        # Second pass: re-read doubtful field values with tight page segmentation and whitelists
+        labels = classify_lines(regions, texts, processed_image.shape[0])
+        refined = 0
+        for i, label in enumerate(labels):
+            field_config = FIELD_OCR_CONFIGS.get(label)
+            if field_config is None or not needs_refinement(label, texts[i]):
+                continue
+            if refine_fields is not None and label not in refine_fields:
+                continue
+            target = last_word(processed_image, regions[i], char_height) if label in VALUE_ONLY_FIELDS else regions[i]
+            if target is None:
+                continue
+            value = self.run_tesseract(crop(processed_image, target), config=field_config)
+            refined += 1
+            if value:
+                template = FIELD_LINE_TEMPLATES.get(label)
+                texts[i] = template.format(value) if template else value
+        
+        logger.info(f"Region OCR read {len(regions)} lines, re-read {refined} fields")
+        return "\n".join(text for text in texts if text)
+    
+    def recognize(self, processed_image: np.ndarray) -> str:
+        """OCR a preprocessed image using the configured OCR mode"""
+        if self.ocr_mode == "regions":
+            return self.extract_text_by_regions(processed_image)
+        return self.run_tesseract(processed_image)
     
-    def extract_text_with_ocr(self, image_bytes: bytes) -> str:
-        """Extract text from image using OCR"""
+    def extract_text_from_page(self, gray: np.ndarray, timings: Optional[StageTimings] = None) -> str:
+        """Extract text from a rasterized PDF page using OCR; the page array is reused as a buffer"""
+        timings = timings if timings is not None else StageTimings()
+        try:
+            with timings.stage("preprocess"):
+                processed_image = self.preprocess_grayscale(gray, overwrite_input=True)
+            del gray
+            with timings.stage("ocr"):
+                return self.recognize(processed_image)
+        except Exception as e:
+            logger.error(f"PDF page OCR failed: {str(e)}")
+            raise RuntimeError(f"PDF page OCR failed: {str(e)}")
+    
+    def extract_text_with_ocr(self, source: Union[bytes, str], timings: Optional[StageTimings] = None) -> str:
+        """Extract text from image bytes or an image file using OCR"""
+        return self.read_certificate_image(source, timings)[0]
+    
+    def read_certificate_image(self, source: Union[bytes, str], timings: Optional[StageTimings] = None,
+                               with_fingerprint: bool = False, quick: bool = False) -> Tuple[str, Optional[ImageFingerprint]]:
+        """OCR an image, fingerprinting the decoded page first when ``with_fingerprint`` is set.
+        
+        With ``quick``, the page is read as the quick verification tier does:
+        quick profile, detected lines only and fewer field re-reads. Images
+        that can't be decoded raise ``UnreadableImageError``; OCR failures
+        raise ``RuntimeError``, so no text is returned (or cached) for them.
+        """
+        timings = timings if timings is not None else StageTimings()
+        stage_prefix = "quick_" if quick else ""
         try:
             logger.info("Starting OCR text extraction")
-            processed_image = self.preprocess_image(image_bytes)
-            
-            # Configure Tesseract
-            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,/:-() '
-            
-            # Extract text
-            text = pytesseract.image_to_string(processed_image, config=custom_config)
-            logger.info(f"OCR extracted text length: {len(text)}")
-            return text.strip()
+            with timings.stage("decode"):
+                gray = self.decode_image(source)
+            image_fingerprint = None
+            if with_fingerprint:
+                with timings.stage("fingerprint"):
+                    image_fingerprint = fingerprint(gray)
+            # The decoded page is ours, so preprocessing may reuse its buffer
+            with timings.stage(f"{stage_prefix}preprocess"):
+                processed_image = preprocess(gray, self.quick_profile if quick else self.profile, overwrite_input=True)
+            del gray
+            with timings.stage(f"{stage_prefix}ocr"):
+                if quick:
+                    return self.extract_text_by_regions(processed_image, QUICK_REFINE_FIELDS), image_fingerprint
+                return self.recognize(processed_image), image_fingerprint
+        except (ImageTooLargeError, UnreadableImageError):
+            raise
         except Exception as e:
             logger.error(f"OCR processing failed: {str(e)}")
-            # Return mock extracted text for demo purposes
-            return """
-            RANCHI UNIVERSITY
-            CERTIFICATE OF GRADUATION
-            
-            This is to certify that RAJESH KUMAR SINGH
-            Roll Number: CSE2020001
-            has successfully completed Bachelor of Technology
-            in Computer Science Engineering
-            
-            Certificate Number: RU/CSE/2024/001
-            Grade: First Class with Distinction
-            Year of Graduation: 2024
-            
-            Issued on: 15th June 2024
-            """
+            raise RuntimeError(f"OCR processing failed: {str(e)}")
     
     def extract_certificate_data(self, text: str) -> CertificateData:
         """Extract structured data from OCR text"""
-        data = CertificateData()
-        
-        # Clean and normalize text
-        text = text.lower().strip()
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        # Extract student name (usually after "name" or "student")
-        name_patterns = [
-            r'(?:name|student)[:\s]+([a-zA-Z\s]+?)(?:\n|roll|reg)',
-            r'this is to certify that\s+([a-zA-Z\s]+?)(?:\s+has|,)',
-            r'mr\.?\s+([a-zA-Z\s]+?)(?:\s+has|\s+son)',
-            r'ms\.?\s+([a-zA-Z\s]+?)(?:\s+has|\s+daughter)'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data.student_name = match.group(1).strip().title()
-                break
-        
-        # Extract roll number
-        roll_patterns = [
-            r'(?:roll|reg|registration)[:\s]*(?:no|number)[:\s]*([a-zA-Z0-9]+)',
-            r'(?:roll|reg)[:\s]*([a-zA-Z0-9]+)',
-            r'([a-zA-Z]{2,4}\d{4,8})'
-        ]
-        
-        for pattern in roll_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data.roll_number = match.group(1).upper()
-                break
-        
-        # Extract course/degree
-        course_patterns = [
-            r'(?:degree|course|program)[:\s]+([a-zA-Z\s]+?)(?:\n|in|from)',
-            r'bachelor of ([a-zA-Z\s]+)',
-            r'master of ([a-zA-Z\s]+)',
-            r'b\.?tech\.?\s+in\s+([a-zA-Z\s]+)',
-            r'b\.?sc\.?\s+in\s+([a-zA-Z\s]+)'
-        ]
-        
-        for pattern in course_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                course = match.group(1).strip()
-                if 'bachelor' in pattern:
-                    data.course = f"Bachelor of {course.title()}"
-                elif 'master' in pattern:
-                    data.course = f"Master of {course.title()}"
-                else:
-                    data.course = course.title()
-                break
-        
-        # Extract institution name
-        institution_keywords = ['university', 'college', 'institute', 'nit', 'iit']
-        for line in lines:
-            for keyword in institution_keywords:
-                if keyword in line and len(line.split()) <= 6:
-                    data.institution = line.title()
-                    break
-            if data.institution:
-                break
-        
-        # Extract graduation year
-        year_pattern = r'(?:year|session|batch)[:\s]*(\d{4})'
-        match = re.search(year_pattern, text, re.IGNORECASE)
-        if match:
-            data.graduation_year = int(match.group(1))
-        else:
-            # Look for any 4-digit year between 1950-2030
-            years = re.findall(r'\b(19[5-9]\d|20[0-3]\d)\b', text)
-            if years:
-                data.graduation_year = int(max(years))  # Take the latest year
-        
-        # Extract certificate number
-        cert_patterns = [
-            r'(?:certificate|cert)[:\s]*(?:no|number)[:\s]*([a-zA-Z0-9/\-]+)',
-            r'([a-zA-Z]{2,4}/[a-zA-Z]{2,4}/\d{4}/\d{3,4})',
-            r'(?:serial|ref)[:\s]*(?:no|number)[:\s]*([a-zA-Z0-9/\-]+)'
-        ]
-        
-        for pattern in cert_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data.certificate_number = match.group(1).upper()
-                break
+        return CertificateData(**self.field_extractor.extract(text))
+    
+    def score_candidates(self, data: CertificateData, institution: Optional[Institution],
+                         fuzzy: bool = True) -> CandidateScores:
+        """Fetch candidate certificates from the registry indexes and score names and courses against them"""
+        candidates = self.registry.candidates(
+            certificate_number=data.certificate_number,
+            roll_number=data.roll_number,
+            institution=institution.name if institution else None,
+            graduation_year=data.graduation_year,
+            student_name=data.student_name,
+            fuzzy=fuzzy
+        )
+        # Score names and courses against every candidate in one pass
+        name_scores = self.matcher.score(
+            data.student_name or "", [cert.get("student_name") or "" for cert in candidates]
+        )
+        course_scores = self.matcher.score(
+            data.course or "", [cert.get("course") or "" for cert in candidates]
+        )
+        return CandidateScores(candidates, name_scores, course_scores)
+    
+    def verify_many(self, items: Sequence[CertificateData], table: RegistryTable) -> List[VerificationResult]:
+        """Verify many extractions at once, e.g. to re-score stored ones after registry or rule changes.
         
-        # Extract grade
-        grade_patterns = [
-            r'(?:grade|class|division)[:\s]+([a-zA-Z\s]+?)(?:\n|with)',
-            r'(first class with distinction)',
-            r'(first class)',
-            r'(second class)',
-            r'(third class)',
-            r'([a-zA-Z]\+?)\s*grade'
-        ]
+        Candidates come from joining all of them against ``table`` and the
+        name and course similarities from one batched pass over every
+        (certificate, candidate) pair; each is then scored by
+        verify_against_database as a single upload would be.
+        """
+        resolved = {}
+        for data in items:
+            if data.institution and data.institution not in resolved:
+                resolved[data.institution] = self.institutions.resolve(data.institution)
+        queries = []
+        for data in items:
+            institution = resolved.get(data.institution) if data.institution else None
+            queries.append({
+                "certificate_number": data.certificate_number,
+                "roll_number": data.roll_number,
+                "institution": institution.name if institution else None,
+                "graduation_year": data.graduation_year,
+                "student_name": data.student_name,
+            })
+        candidates = table.candidates_many(queries)
         
-        for pattern in grade_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data.grade = match.group(1).strip().title()
-                break
+        owners = [data for data, found in zip(items, candidates) for _ in found]
+        pairs = [cert for found in candidates for cert in found]
+        name_scores = self.matcher.score_pairs(
+            [data.student_name or "" for data in owners], [cert.get("student_name") or "" for cert in pairs]
+        )
+        course_scores = self.matcher.score_pairs(
+            [data.course or "" for data in owners], [cert.get("course") or "" for cert in pairs]
+        )
         
-        return data
+        results = []
+        end = 0
+        for data, found in zip(items, candidates):
+            start, end = end, end + len(found)
+            scored = CandidateScores(found, name_scores[start:end], course_scores[start:end])
+            results.append(self.verify_against_database(data, scored=scored))
+        return results
     
-    def verify_against_database(self, data: CertificateData) -> VerificationResult:
-        """Verify extracted data against known databases"""
+    def verify_against_database(self, data: CertificateData, image_match: Optional[ImageMatch] = None,
+                                scored: Optional[CandidateScores] = None, fuzzy: bool = True) -> VerificationResult:
+        """Verify extracted data against known databases and, if given, an earlier upload of the same image.
+        
+        ``scored`` supplies precomputed registry candidates, as verify_many
+        does; without ``fuzzy``, candidates come from exact key lookups only.
+        """
         flags = []
         matched_fields = []
         discrepancies = []
         confidence = 0
         institution_verified = False
+        institution = None
         
         # Check institution validity
         if data.institution:
-            institution_key = data.institution.lower()
-            for known_inst in VERIFIED_INSTITUTIONS.keys():
-                if known_inst in institution_key or institution_key in known_inst:
-                    institution_verified = True
-                    matched_fields.append("Institution")
-                    confidence += 20
-                    break
-            
-            if not institution_verified:
+            institution = self.institutions.resolve(data.institution)
+            if institution is not None:
+                institution_verified = True
+                matched_fields.append("Institution")
+                confidence += 20
+            else:
                 flags.append("Institution not found in verified database")
                 discrepancies.append(f"Unknown institution: {data.institution}")
         
-        # Check against verified certificates
+        # Check against candidate certificates from the registry indexes
+        if scored is None:
+            scored = self.score_candidates(data, institution, fuzzy=fuzzy)
+        candidates, name_scores, course_scores = scored
+        
         exact_match = False
-        for cert in VERIFIED_CERTIFICATES:
+        for i, cert in enumerate(candidates):
             matches = 0
             total_fields = 0
             
@@ -310,6 +487,10 @@ class CertificateProcessor:
                 if data.certificate_number.upper() == cert["certificate_number"].upper():
                     matches += 1
                     matched_fields.append("Certificate Number")
+                elif ocr_fold(data.certificate_number) == ocr_fold(cert["certificate_number"]):
+                    # Differs only by OCR-confusable characters such as O/0 or l/1
+                    matches += 1
+                    matched_fields.append("Certificate Number (OCR Corrected)")
                 else:
                     discrepancies.append(f"Certificate number mismatch: {data.certificate_number} vs {cert['certificate_number']}")
             
@@ -320,7 +501,7 @@ class CertificateProcessor:
                     matched_fields.append("Student Name")
                 else:
                     # Check for partial match
-                    similarity = self.calculate_text_similarity(data.student_name.lower(), cert["student_name"].lower())
+                    similarity = name_scores[i]
                     if similarity > 0.8:
                         matches += 0.8
                         matched_fields.append("Student Name (Partial)")
@@ -332,12 +513,15 @@ class CertificateProcessor:
                 if data.roll_number.upper() == cert["roll_number"].upper():
                     matches += 1
                     matched_fields.append("Roll Number")
+                elif ocr_fold(data.roll_number) == ocr_fold(cert["roll_number"]):
+                    matches += 1
+                    matched_fields.append("Roll Number (OCR Corrected)")
                 else:
                     discrepancies.append(f"Roll number mismatch: {data.roll_number} vs {cert['roll_number']}")
             
             if data.course and cert.get("course"):
                 total_fields += 1
-                course_similarity = self.calculate_text_similarity(data.course.lower(), cert["course"].lower())
+                course_similarity = float(course_scores[i])
                 if course_similarity > 0.7:
                     matches += course_similarity
                     matched_fields.append("Course")
@@ -365,18 +549,23 @@ class CertificateProcessor:
                 confidence += 10
         
         # Certificate number format validation
-        if data.certificate_number and institution_verified:
-            institution_key = data.institution.lower()
-            for inst_name, inst_data in VERIFIED_INSTITUTIONS.items():
-                if inst_name in institution_key:
-                    cert_format = inst_data["certificate_format"]
-                    if re.match(cert_format, data.certificate_number):
-                        matched_fields.append("Certificate Format")
-                        confidence += 15
-                    else:
-                        flags.append("Certificate number format doesn't match institution standard")
-                        confidence -= 15
-                    break
+        if data.certificate_number and institution is not None:
+            format_ok = institution.matches_format(data.certificate_number)
+            if format_ok:
+                matched_fields.append("Certificate Format")
+                confidence += 15
+            elif format_ok is False:
+                flags.append("Certificate number format doesn't match institution standard")
+                confidence -= 15
+        
+        # The same scan was uploaded before with other details: an edited copy
+        if image_match is not None:
+            flags.append("Image matches a previously seen certificate with different details")
+            differing = ", ".join(field.replace("_", " ") for field in image_match.differing_fields)
+            discrepancies.append(
+                f"Image matches earlier upload {image_match.digest[:12]} in {image_match.matching_regions} "
+                f"of {image_match.compared_regions} regions but differs in {differing}"
+            )
         
         # Final confidence calculation
         if exact_match:
@@ -404,23 +593,476 @@ class CertificateProcessor:
             discrepancies=discrepancies,
             institution_verified=institution_verified,
             extracted_data=data,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            exact_match=exact_match,
+            near_duplicate_of=image_match.digest if image_match is not None else None
         )
     
+    def settles_quick_tier(self, result: VerificationResult) -> bool:
+        """Whether a quick-tier result is conclusive, so the full pipeline can be skipped"""
+        data = result.extracted_data
+        return result.exact_match and all(getattr(data, field) for field in QUICK_REQUIRED_FIELDS)
+    
     def calculate_text_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity between two text strings"""
+        return self.matcher.similarity(text1, text2)
+
+certificate_registry = open_registry(
+    config.REGISTRY_BACKEND,
+    config.REGISTRY_DB_PATH,
+    seed=VERIFIED_CERTIFICATES,
+    block_limit=config.REGISTRY_BLOCK_LIMIT,
+    fuzzy=config.REGISTRY_FUZZY_INDEX
+)
+processor = CertificateProcessor(
+    registry=certificate_registry,
+    profile=config.PREPROCESS_PROFILE,
+    ocr_mode=config.OCR_MODE,
+    extraction_budget_ms=config.EXTRACTION_TIME_BUDGET_MS,
+    institutions=open_institutions(
+        config.INSTITUTIONS_PATH or None,
+        seed=VERIFIED_INSTITUTIONS,
+        reload_seconds=config.INSTITUTIONS_RELOAD_SECONDS
+    ),
+    max_image_pixels=config.MAX_IMAGE_PIXELS,
+    decode_max_pixels=config.DECODE_MAX_PIXELS
+)
+
+# Cache of OCR text and extracted fields, keyed by upload content
+result_cache = ResultCache(
+    max_entries=config.CACHE_MAX_ENTRIES,
+    ttl_seconds=config.CACHE_TTL_SECONDS,
+    db_path=config.CACHE_DB_PATH or None,
+    db_max_entries=config.CACHE_DB_MAX_ENTRIES
+)
+
+# Fingerprints of every uploaded image, matched to catch edited copies of one scan
+fingerprint_index = FingerprintIndex(
+    db_path=config.FINGERPRINT_DB_PATH or None,
+    max_distance=config.FINGERPRINT_MAX_DISTANCE
+) if config.FINGERPRINT_INDEX else None
+
+# Startup warm-up progress, reported by /ready
+readiness = Readiness()
+
+# Durable queue behind POST /jobs, drained by background job workers
+job_queue = JobQueue(
+    db_path=config.JOBS_DB_PATH,
+    spool_dir=config.JOBS_SPOOL_DIR,
+    max_attempts=config.JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=config.JOB_RETRY_BACKOFF_SECONDS,
+    retention_seconds=config.JOB_RETENTION_SECONDS
+)
+
+# Longest a job worker or event stream sleeps before checking the queue again
+JOB_POLL_SECONDS = 1.0
+
+# Event stream comment sent after this many idle polls, so proxies keep the connection open
+SSE_KEEPALIVE_POLLS = 15
+
+# Prometheus metrics, served by /metrics
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    "certificate_stage_seconds", "Time spent in each verification stage per certificate", ["stage"]
+)
+verification_seconds = metrics.histogram(
+    "certificate_verification_seconds", "End-to-end verification time per certificate", ["source"]
+)
+upload_bytes = metrics.histogram(
+    "certificate_upload_bytes", "Size of uploaded certificates", ["kind"], buckets=SIZE_BUCKETS
+)
+verdicts_total = metrics.counter("certificate_verdicts_total", "Verification verdicts", ["verdict"])
+tiers_total = metrics.counter("certificate_verification_tier_total", "Verifications decided per tier", ["tier"])
+flags_total = metrics.counter("certificate_flags_total", "Fraud flags raised", ["flag"])
+rejections_total = metrics.counter(
+    "ocr_queue_rejections_total", "Uploads rejected because the OCR pool was saturated"
+)
+metrics.gauge_function("ocr_queue_pending", "OCR jobs running or waiting for a worker", lambda: ocr_pool.pending)
+metrics.gauge_function("ocr_queue_capacity", "OCR jobs accepted before uploads are rejected", lambda: ocr_pool.capacity)
+metrics.counter_function(
+    "ocr_pool_restarts_total", "OCR worker pools replaced after a worker process died", lambda: ocr_pool.restarts
+)
+metrics.counter_function("result_cache_hits_total", "Result cache hits", lambda: result_cache.hits)
+metrics.counter_function("result_cache_misses_total", "Result cache misses", lambda: result_cache.misses)
+metrics.gauge_function("result_cache_hit_ratio", "Result cache hits per lookup", lambda: result_cache.stats()["hit_ratio"])
+# Scrapes must not create jobs.db when job processing is off and nothing was submitted
+metrics.gauge_function(
+    "jobs_queued", "Asynchronous jobs waiting to run",
+    lambda: job_queue.stats()[QUEUED] if job_queue.opened else 0
+)
+metrics.gauge_function(
+    "image_fingerprints_indexed", "Uploaded images in the fingerprint index",
+    lambda: len(fingerprint_index) if fingerprint_index is not None else 0
+)
+
+def init_ocr_worker():
+    """Load OCR state when a pool worker starts, before it takes a job.
+
+    Workers forked after warm-up already share the parent's model, so this
+    is a no-op for them.
+    """
+    processor.ocr_engine.warm_up()
+
+# Process pool for the CPU-bound preprocessing + OCR stage
+ocr_pool = WorkerPool(
+    max_workers=config.OCR_WORKERS,
+    queue_size=config.OCR_QUEUE_SIZE,
+    initializer=init_ocr_worker if config.STARTUP_MODE == "preload" else None
+)
+
+def run_ocr_job(source: Union[bytes, str], quick: bool = False,
+                with_fingerprint: bool = True) -> Tuple[str, Optional[ImageFingerprint], Dict[str, float]]:
+    """Run preprocessing and OCR inside a pool worker, returning the text, image fingerprint and stage timings.
+
+    ``source`` is the upload's bytes, or the path of its spooled file for
+    large uploads, so those are never pickled to the worker. ``quick`` reads
+    the image as the quick verification tier. The fingerprint is None when
+    not requested or the fingerprint index is disabled.
+    """
+    timings = StageTimings()
+    text, image_fingerprint = processor.read_certificate_image(
+        source, timings, with_fingerprint=with_fingerprint and fingerprint_index is not None, quick=quick
+    )
+    return text, image_fingerprint, timings.seconds
+
+def run_pdf_page_ocr_job(pdf_path: str, page_number: int, dpi: int) -> Tuple[str, Dict[str, float]]:
+    """Rasterize one PDF page and OCR it inside a pool worker, returning the text and stage timings"""
+    timings = StageTimings()
+    with timings.stage("rasterize"):
+        gray = rasterize_pdf_page(pdf_path, page_number, dpi, processor.decode_max_pixels)
+    text = processor.extract_text_from_page(gray, timings)
+    return text, timings.seconds
+
+async def run_in_pool(fn, *args, wait: bool = False):
+    """Run a job in the OCR pool, rejecting the request when it is saturated"""
+    # Forking while the warm-up thread holds import locks would deadlock the
+    # workers, so jobs arriving during warm-up wait for it to finish
+    warm_up_task = getattr(app.state, "warm_up_task", None)
+    if warm_up_task is not None and not warm_up_task.done():
+        await asyncio.shield(warm_up_task)
+    try:
+        return await ocr_pool.run(fn, *args, wait=wait)
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        rejections_total.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other certificates. Please retry shortly.",
+            headers={"Retry-After": str(config.OCR_RETRY_AFTER_SECONDS)}
+        )
+    except BrokenProcessPool:
+        # The pool has already been replaced; the job itself may be fine
+        raise HTTPException(
+            status_code=503,
+            detail="An OCR worker stopped unexpectedly. Please retry shortly.",
+            headers={"Retry-After": str(config.OCR_RETRY_AFTER_SECONDS)}
+        )
+
+async def extract_text_in_pool(upload: SpooledUpload, timings: StageTimings, wait: bool = False,
+                               quick: bool = False, with_fingerprint: bool = True) -> Tuple[str, Optional[ImageFingerprint]]:
+    """Extract text and the image fingerprint from an image in the OCR pool"""
+    try:
+        with timings.stage("quick_ocr_job" if quick else "ocr_job"):
+            text, image_fingerprint, job_seconds = await run_in_pool(
+                run_ocr_job, upload.source, quick, with_fingerprint, wait=wait
+            )
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnreadableImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    timings.add(job_seconds)
+    return text, image_fingerprint
+
+async def extract_pdf_text(upload: SpooledUpload, timings: StageTimings, wait: bool = False) -> str:
+    """Extract text from every page of a PDF.
+
+    The PDF is parsed and pages with a usable text layer are read in a
+    thread, off the event loop. Image-only pages are
+    rasterized and OCR'd in parallel in the pool, each worker rendering just
+    its own page from the spooled upload, or from a temporary copy of a PDF
+    held in memory. Worker stage timings are summed over pages. When any
+    page fails, the others are cancelled and the error is raised once no
+    worker is reading the file any more.
+    """
+    try:
+        with timings.stage("pdf_text"):
+            # Parsing and text-layer extraction happen as the generator is
+            # consumed, so consuming it in a thread keeps them off the loop
+            pages = await asyncio.to_thread(
+                list, iter_pdf_pages(upload.source, config.PDF_MAX_PAGES, config.PDF_MIN_TEXT_CHARS)
+            )
+    except PDFError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    texts = [text or "" for _, text in pages]
+    scanned_pages = [page_number for page_number, text in pages if text is None]
+    logger.info(f"PDF has {len(pages)} pages, {len(scanned_pages)} need OCR")
+    if not scanned_pages:
+        return "\n".join(texts).strip()
+    
+    pdf_path = upload.path
+    if pdf_path is None:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", dir=config.UPLOAD_SPOOL_DIR or None, delete=False) as pdf_file:
+            pdf_file.write(upload.content)
+        pdf_path = pdf_file.name
+    # The first page honours the caller's backpressure; the rest wait for a slot
+    tasks = [
+        asyncio.create_task(run_in_pool(run_pdf_page_ocr_job, pdf_path, page_number, config.PDF_DPI, wait=wait or i > 0))
+        for i, page_number in enumerate(scanned_pages)
+    ]
+    try:
+        with timings.stage("ocr_job"):
+            ocr_results = await asyncio.gather(*tasks)
+    except BaseException:
+        # One page failed or the request was cancelled: drop the pages still
+        # waiting for a slot and let running ones finish before the PDF goes
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if upload.path is None:
+            os.unlink(pdf_path)
+    
+    for page_number, (text, job_seconds) in zip(scanned_pages, ocr_results):
+        texts[page_number] = text
+        timings.add(job_seconds)
+    return "\n".join(texts).strip()
+
+def is_pdf(content_type: Optional[str], content: bytes) -> bool:
+    """Check whether an upload is a PDF document"""
+    return content_type == 'application/pdf' or content.startswith(b'%PDF-')
+
+def record_metrics(source: str, kind: str, size: int, timings: StageTimings, result: VerificationResult):
+    """Record one verified certificate in the /metrics histograms and counters"""
+    for stage, seconds in timings.seconds.items():
+        if stage != "total":
+            stage_seconds.observe(seconds, stage)
+    verification_seconds.observe(timings.seconds["total"], source)
+    upload_bytes.observe(size, kind)
+    verdicts_total.inc("valid" if result.is_valid else "invalid")
+    if result.decided_by_tier is not None:
+        tiers_total.inc(str(result.decided_by_tier))
+    for flag in result.flags:
+        flags_total.inc(flag)
+
+def cached_extraction(cached: Dict) -> Tuple[CertificateData, Optional[ImageFingerprint]]:
+    """Extracted fields and image fingerprint of a result cache entry"""
+    cached_fingerprint = cached.get("fingerprint")
+    image_fingerprint = (
+        ImageFingerprint(cached_fingerprint[0], tuple(cached_fingerprint[1])) if cached_fingerprint else None
+    )
+    return CertificateData(**cached["data"]), image_fingerprint
+
+async def run_quick_tier(upload: SpooledUpload, timings: StageTimings,
+                         wait: bool = False) -> Tuple[VerificationResult, Optional[ImageFingerprint]]:
+    """Read an image with the quick tier, or take its cached extraction, and verify it by exact registry keys"""
+    cache_key = digest_key(upload.digest, f"{PIPELINE_VERSION}-{QUICK_PROFILE}")
+    cached = await asyncio.to_thread(result_cache.get, cache_key)
+    if cached is not None:
+        certificate_data, image_fingerprint = cached_extraction(cached)
+    else:
+        extracted_text, image_fingerprint = await extract_text_in_pool(upload, timings, wait=wait, quick=True)
+        with timings.stage("quick_extract"):
+            certificate_data = processor.extract_certificate_data(extracted_text)
+        await asyncio.to_thread(result_cache.put, cache_key, {
+            "text": extracted_text, "data": certificate_data.model_dump(), "fingerprint": image_fingerprint
+        })
+    with timings.stage("quick_verify"):
+        result = processor.verify_against_database(certificate_data, fuzzy=False)
+    return result, image_fingerprint
+
+async def verify_upload(upload: SpooledUpload, wait: bool = False, content_type: Optional[str] = None,
+                        debug_timings: bool = False) -> VerificationResult:
+    """Run the full OCR, extraction and verification pipeline on one image or PDF.
+    
+    With TIERED_VERIFICATION, images go through the quick tier first and
+    only reach the configured pipeline and fuzzy matching when its result
+    is not conclusive.
+    """
+    timings = StageTimings()
+    kind = "pdf" if is_pdf(content_type, upload.head) else "image"
+    with timings.stage("total"):
+        cache_key = digest_key(upload.digest, f"{PIPELINE_VERSION}-{processor.profile.name}-{processor.ocr_mode}")
+        # The SQLite tier queries and commits, so the cache is used from a thread
+        cached = await asyncio.to_thread(result_cache.get, cache_key)
+        quick_result = None
+        escalated = False
+        image_fingerprint = None
+        
+        if cached is not None:
+            certificate_data, image_fingerprint = cached_extraction(cached)
+            logger.info("Using cached extraction")
+        elif config.TIERED_VERIFICATION and kind == "image":
+            quick_result, image_fingerprint = await run_quick_tier(upload, timings, wait=wait)
+            if not processor.settles_quick_tier(quick_result):
+                logger.info("Quick tier inconclusive, running the full pipeline")
+                quick_result = None
+                escalated = True
+        
+        if quick_result is not None:
+            certificate_data = quick_result.extracted_data
+        elif cached is None:
+            # Extract text using the PDF text layer or OCR, off the event loop.
+            # PDFs are not fingerprinted.
+            if kind == "pdf":
+                extracted_text = await extract_pdf_text(upload, timings, wait=wait)
+            else:
+                # An escalated upload already passed backpressure with the
+                # quick tier, so it waits for a slot rather than failing now
+                extracted_text, full_fingerprint = await extract_text_in_pool(
+                    upload, timings, wait=wait or escalated, with_fingerprint=image_fingerprint is None
+                )
+                image_fingerprint = image_fingerprint or full_fingerprint
+            logger.info("Text extraction completed")
+            
+            # Extract structured data
+            with timings.stage("extract"):
+                certificate_data = processor.extract_certificate_data(extracted_text)
+            logger.info("Data extraction completed")
+            
+            await asyncio.to_thread(result_cache.put, cache_key, {
+                "text": extracted_text, "data": certificate_data.model_dump(), "fingerprint": image_fingerprint
+            })
+        
+        # Look for an earlier upload of the same image with other details
+        image_match = None
+        if fingerprint_index is not None and image_fingerprint is not None:
+            with timings.stage("image_match"):
+                # Stored uploads are committed to SQLite, so this runs in a thread
+                image_match = await asyncio.to_thread(
+                    fingerprint_index.observe, upload.digest, image_fingerprint, certificate_data.model_dump()
+                )
+        
+        # Verify against database; a conclusive quick-tier result only needs
+        # redoing when the image matched an earlier upload
+        if quick_result is not None and image_match is None:
+            verification_result = quick_result
+        else:
+            with timings.stage("verify"):
+                verification_result = processor.verify_against_database(
+                    certificate_data, image_match, fuzzy=quick_result is None
+                )
+        verification_result.decided_by_tier = QUICK_TIER if quick_result is not None else FULL_TIER
+        logger.info("Database verification completed")
+    
+    record_metrics("cache" if cached is not None else kind, kind, upload.size, timings, verification_result)
+    if debug_timings:
+        verification_result.stage_timings = timings.milliseconds()
+    return verification_result
+
+async def warm_up_and_fork_workers():
+    """Warm up in this process, then fork the OCR workers so they share the loaded state"""
+    try:
+        # Some OCR backends install signal handlers on import, which only works
+        # in the main thread; the rest of warm-up runs off the event loop
+        if threading.current_thread() is threading.main_thread():
+            with readiness.stage_timer("ocr_backend"):
+                processor.ocr_engine
+        await asyncio.to_thread(processor.warm_up, readiness)
+        if fingerprint_index is not None:
+            with readiness.stage_timer("fingerprints"):
+                await asyncio.to_thread(fingerprint_index.load)
+        with readiness.stage_timer("workers"):
+            # Move everything loaded so far out of the collector's reach, so
+            # collections in the workers don't write to the shared pages
+            gc.collect()
+            gc.freeze()
+            pids = await ocr_pool.prefork()
+        logger.info(f"Started {len(pids)} OCR workers after warm-up")
+        readiness.mark_ready()
+    except Exception as e:
+        readiness.mark_failed(str(e))
+
+async def notify_job_update():
+    """Wake job workers and event streams after a job was queued or changed state"""
+    async with app.state.job_updates:
+        app.state.job_updates.notify_all()
+
+async def wait_for_job_update(timeout: float):
+    async with app.state.job_updates:
+        try:
+            await asyncio.wait_for(app.state.job_updates.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_job_worker():
+    """Claim queued jobs and run them through the verification pipeline until cancelled"""
+    # Queue calls commit (and submit fsyncs) under the queue's lock, so they
+    # run in threads to keep the event loop free
+    while True:
+        job = await asyncio.to_thread(job_queue.claim)
+        if job is None:
+            retry_in = await asyncio.to_thread(job_queue.next_retry_in)
+            await wait_for_job_update(min(retry_in, JOB_POLL_SECONDS) if retry_in is not None else JOB_POLL_SECONDS)
+            continue
+        logger.info(f"Running job {job.id} (attempt {job.attempts}/{job.max_attempts})")
+        await notify_job_update()
         try:
-            vectors = self.vectorizer.fit_transform([text1, text2])
-            similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
-            return similarity
-        except:
-            # Fallback to simple character-based similarity
-            return len(set(text1) & set(text2)) / len(set(text1) | set(text2))
+            upload = await asyncio.to_thread(SpooledUpload.from_path, job.upload_path)
+            result = await verify_upload(upload, wait=True, content_type=job.content_type)
+            await asyncio.to_thread(job_queue.complete, job.id, result.model_dump(mode="json"))
+        except asyncio.CancelledError:
+            # Released in place: a second cancellation mustn't skip it
+            job_queue.release(job.id)
+            raise
+        except HTTPException as e:
+            # Unreadable images and invalid PDFs fail the same way on every attempt
+            await asyncio.to_thread(job_queue.fail, job.id, str(e.detail), retry=e.status_code >= 500)
+        except Exception as e:
+            await asyncio.to_thread(job_queue.fail, job.id, f"Verification failed: {str(e)}")
+        await notify_job_update()
+
+@app.on_event("startup")
+async def start_ocr_pool():
+    if config.STARTUP_MODE not in STARTUP_MODES:
+        raise ValueError(f"Unknown startup mode: {config.STARTUP_MODE}. Choose from {', '.join(STARTUP_MODES)}")
+    if config.STARTUP_MODE == "preload":
+        # Serve /health while warming up; /ready turns 200 once done
+        app.state.warm_up_task = asyncio.create_task(warm_up_and_fork_workers())
+    else:
+        ocr_pool.start()
+        readiness.mark_ready()
+
+@app.on_event("startup")
+async def start_job_workers():
+    app.state.job_updates = asyncio.Condition()
+    app.state.job_workers = []
+    if config.JOB_WORKERS > 0:
+        job_queue.recover()
+        app.state.job_workers = [asyncio.create_task(run_job_worker()) for _ in range(config.JOB_WORKERS)]
 
-processor = CertificateProcessor()
+@app.on_event("shutdown")
+async def stop_ocr_pool():
+    # Running jobs go back to the queue and are picked up after the restart
+    for task in app.state.job_workers:
+        task.cancel()
+    await asyncio.gather(*app.state.job_workers, return_exceptions=True)
+    job_queue.close()
+    if fingerprint_index is not None:
+        fingerprint_index.close()
+    ocr_pool.shutdown()
+
+async def spool_upload(file: UploadFile, max_bytes: int = config.MAX_UPLOAD_BYTES) -> SpooledUpload:
+    """Copy an uploaded file into memory, or past UPLOAD_SPOOL_BYTES into a temporary file.
+
+    Starlette already buffers large multipart files in an anonymous
+    temporary file; the named copy is what OCR workers open by path.
+    """
+    try:
+        return await asyncio.to_thread(
+            spool, file.file, max_bytes, config.UPLOAD_SPOOL_BYTES,
+            config.UPLOAD_SPOOL_DIR or None, file.filename or "Upload"
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+def wants_debug_timings(header: Optional[str]) -> bool:
+    """Whether the X-Debug-Timings request header asks for stage timings"""
+    return header is not None and header.strip().lower() in ("1", "true", "yes")
 
 @app.post("/verify-certificate", response_model=VerificationResult)
-async def verify_certificate(file: UploadFile = File(...)):
+async def verify_certificate(file: UploadFile = File(...), x_debug_timings: Optional[str] = Header(None)):
     """Verify uploaded certificate using OCR and ML validation"""
     
     logger.info(f"Received file: {file.filename}, Content-Type: {file.content_type}")
@@ -429,43 +1071,239 @@ async def verify_certificate(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only image files and PDFs are supported")
     
     try:
-        # Read file content
-        file_content = await file.read()
-        logger.info(f"File size: {len(file_content)} bytes")
-        
-        # For PDF files, we'll treat them as images for now
-        # In production, you'd want to convert PDF to images first
-        if file.content_type == 'application/pdf':
-            raise HTTPException(status_code=400, detail="PDF processing not implemented in this demo. Please upload an image.")
-        
-        # Extract text using OCR
-        extracted_text = processor.extract_text_with_ocr(file_content)
-        logger.info("Text extraction completed")
-        
-        # Extract structured data
-        certificate_data = processor.extract_certificate_data(extracted_text)
-        logger.info("Data extraction completed")
-        
-        # Verify against database
-        verification_result = processor.verify_against_database(certificate_data)
-        logger.info("Database verification completed")
-        
-        return verification_result
+        with await spool_upload(file) as upload:
+            logger.info(f"File size: {upload.size} bytes")
+            
+            return await verify_upload(upload, content_type=file.content_type,
+                                       debug_timings=wants_debug_timings(x_debug_timings))
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Verification failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
 
+def is_zip_upload(file: UploadFile) -> bool:
+    """Check whether an upload is a zip archive of certificates"""
+    return (
+        file.content_type in ('application/zip', 'application/x-zip-compressed')
+        or (file.filename or '').lower().endswith('.zip')
+    )
+
+class BatchItem(NamedTuple):
+    """One certificate of a batch request: its upload, or why it could not be read"""
+    filename: str
+    content_type: Optional[str]
+    upload: Optional[SpooledUpload]
+    error: Optional[str] = None
+
+def unpack_zip_archive(archive_name: str, archive: SpooledUpload) -> List[BatchItem]:
+    """Unpack certificate files from a zip archive as batch items.
+
+    Entries are spooled one at a time like uploads, so large ones go to disk;
+    an entry over MAX_UPLOAD_BYTES becomes an item carrying the error.
+    """
+    entries = []
+    total_size = 0
+    try:
+        with zipfile.ZipFile(archive.path or io.BytesIO(archive.content)) as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir() or os.path.basename(info.filename).startswith('.'):
+                    continue
+                total_size += info.file_size
+                if total_size > config.BATCH_MAX_ARCHIVE_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Archive {archive_name} is too large when unpacked")
+                name = f"{archive_name}/{info.filename}"
+                content_type, _ = mimetypes.guess_type(info.filename)
+                try:
+                    with zip_file.open(info) as entry:
+                        upload = spool(entry, config.MAX_UPLOAD_BYTES, config.UPLOAD_SPOOL_BYTES,
+                                       config.UPLOAD_SPOOL_DIR or None, name)
+                except UploadTooLargeError as e:
+                    entries.append(BatchItem(name, content_type, None, str(e)))
+                    continue
+                entries.append(BatchItem(name, content_type, upload))
+    except zipfile.BadZipFile:
+        close_batch_items(entries)
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {archive_name}")
+    except BaseException:
+        close_batch_items(entries)
+        raise
+    return entries
+
+def close_batch_items(items: List[BatchItem]):
+    for item in items:
+        if item.upload is not None:
+            item.upload.close()
+
+def batch_line(index: int, filename: str, result: Optional[VerificationResult] = None, error: Optional[str] = None) -> str:
+    """Serialize one batch entry as an NDJSON line"""
+    entry = {"index": index, "filename": filename}
+    if result is not None:
+        entry["result"] = result.model_dump(mode="json")
+    else:
+        entry["error"] = error
+    return json.dumps(entry) + "\n"
+
+@app.post("/verify-certificates/batch")
+async def verify_certificates_batch(files: List[UploadFile] = File(...), x_debug_timings: Optional[str] = Header(None)):
+    """Verify many certificates, streaming one NDJSON result line per file as it completes"""
+    debug_timings = wants_debug_timings(x_debug_timings)
+    
+    # Collect every certificate up front; zip archives are expanded in place.
+    # A file or archive that can't be read becomes an error line of its own.
+    items: List[BatchItem] = []
+    try:
+        for file in files:
+            try:
+                if is_zip_upload(file):
+                    with await spool_upload(file, max_bytes=config.BATCH_MAX_ARCHIVE_BYTES) as archive:
+                        items.extend(await asyncio.to_thread(unpack_zip_archive, file.filename, archive))
+                else:
+                    items.append(BatchItem(file.filename, file.content_type, await spool_upload(file)))
+            except HTTPException as e:
+                items.append(BatchItem(file.filename, file.content_type, None, str(e.detail)))
+        
+        if len(items) > config.BATCH_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"Batch contains {len(items)} files; the limit is {config.BATCH_MAX_FILES}")
+    except BaseException:
+        close_batch_items(items)
+        raise
+    
+    logger.info(f"Received batch of {len(items)} files")
+    
+    # Keep a single batch from occupying more than one slot per worker
+    batch_slots = asyncio.Semaphore(ocr_pool.max_workers)
+    
+    async def verify_item(index: int, filename: str, content_type: Optional[str], upload: Optional[SpooledUpload],
+                          error: Optional[str]) -> str:
+        if upload is None:
+            return batch_line(index, filename, error=error)
+        try:
+            if not content_type or not (content_type.startswith('image/') or content_type == 'application/pdf'):
+                return batch_line(index, filename, error="Only image files and PDFs are supported")
+            async with batch_slots:
+                result = await verify_upload(upload, wait=True, content_type=content_type,
+                                             debug_timings=debug_timings)
+            return batch_line(index, filename, result=result)
+        except HTTPException as e:
+            return batch_line(index, filename, error=str(e.detail))
+        except Exception as e:
+            logger.error(f"Batch verification failed for {filename}: {str(e)}")
+            return batch_line(index, filename, error=f"Verification failed: {str(e)}")
+        finally:
+            upload.close()
+    
+    async def stream_results():
+        tasks = [asyncio.ensure_future(verify_item(i, *item)) for i, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            # A cancelled task returns once its worker is done with the file.
+            # On disconnect Starlette keeps cancelling this generator, so the
+            # wait is shielded, or the spooled files would be deleted under it
+            with anyio.CancelScope(shield=True):
+                await asyncio.gather(*tasks, return_exceptions=True)
+            # Tasks cancelled before they started never reach their own cleanup
+            close_batch_items(items)
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...), priority: int = Form(0)):
+    """Queue a certificate for verification and return its job id at once.
+
+    Poll GET /jobs/{id} or follow GET /jobs/{id}/events for the result.
+    Jobs with a higher priority run first.
+    """
+    if not file.content_type.startswith('image/') and file.content_type != 'application/pdf':
+        raise HTTPException(status_code=400, detail="Only image files and PDFs are supported")
+    
+    with await spool_upload(file) as upload:
+        job = await asyncio.to_thread(job_queue.submit, upload.source, file.filename, file.content_type, priority)
+    logger.info(f"Queued job {job.id} for {file.filename} ({upload.size} bytes, priority {priority})")
+    await notify_job_update()
+    return JSONResponse(status_code=202, content=job.view(), headers={"Location": f"/jobs/{job.id}"})
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status, with the verification result once it is done"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.view()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-sent events: one event per job state change, ending when the job is done or failed"""
+    if await asyncio.to_thread(job_queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        last_state = None
+        idle_polls = 0
+        while True:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            state = (job.status, job.attempts)
+            if state != last_state:
+                yield f"event: {job.status}\ndata: {json.dumps(job.view())}\n\n"
+                last_state = state
+                idle_polls = 0
+            if job.status in FINISHED_STATES:
+                return
+            idle_polls += 1
+            if idle_polls % SSE_KEEPALIVE_POLLS == 0:
+                yield ": keepalive\n\n"
+            await wait_for_job_update(JOB_POLL_SECONDS)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     logger.info("Health check requested")
-    return {"status": "healthy", "message": "Certificate verification service is running"}
+    broken = ocr_pool.broken
+    return {
+        "status": "degraded" if broken else "healthy",
+        "message": "Certificate verification service is running",
+        "ocr_queue": {"pending": ocr_pool.pending, "capacity": ocr_pool.capacity},
+        "ocr_pool": {"broken": broken, "restarts": ocr_pool.restarts},
+        # Jobs submitted to POST /jobs only run when this is true; clients use /verify-certificate otherwise
+        "jobs": {"enabled": config.JOB_WORKERS > 0, "workers": config.JOB_WORKERS}
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once warm-up is done, 503 until then"""
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.status())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics: stage latencies, queue depth, cache hit ratio, upload sizes and verdicts"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get OCR result cache statistics"""
+    return result_cache.stats()
 
 @app.get("/institutions")
 async def get_verified_institutions():
     """Get list of verified institutions"""
-    return {"institutions": list(VERIFIED_INSTITUTIONS.keys())}
+    return {"institutions": processor.institutions.names()}
+
+@app.post("/institutions/reload")
+async def reload_institutions():
+    """Reload the institution registry from INSTITUTIONS_PATH"""
+    try:
+        count = processor.institutions.reload()
+    except Exception as e:
+        logger.error(f"Institution registry reload failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+    return {"institutions": count}
 
 @app.get("/")
 async def root():
@@ -0,0 +1,180 @@
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+# Registry rows sampled when fitting the vocabulary
+FIT_SAMPLE_SIZE = 200000
+
+# Fraction of new strings, relative to the fitted corpus, that triggers a full refit
+REFIT_GROWTH_RATIO = 0.2
+
+
+class _MatcherState(NamedTuple):
+    vectorizer: TfidfVectorizer
+    analyzer: Callable[[str], List[str]]
+    vocabulary: Dict[str, int]
+    idf: np.ndarray
+    matrix: sp.csr_matrix
+    rows: Dict[str, int]
+    fitted_size: int
+
+
+class TextMatcher:
+    """Character n-gram TF-IDF matcher for student names and courses.
+
+    The vectorizer is fitted once over registry text and every known string
+    keeps a precomputed, L2-normalized row in ``matrix``, so scoring a query
+    against any number of candidates is a single gather over those rows. The
+    query itself is vectorized straight from the fitted vocabulary rather
+    than through ``TfidfVectorizer.transform``, whose per-call overhead would
+    dominate. The fitted state is swapped as a whole on update, which keeps
+    ``score`` lock-free and safe to call from concurrent requests.
+    """
+
+    def __init__(self, ngram_range=(2, 4)):
+        self.ngram_range = ngram_range
+        self._state = None
+        self._update_lock = threading.Lock()
+
+    def _new_vectorizer(self) -> TfidfVectorizer:
+        return TfidfVectorizer(analyzer='char_wb', ngram_range=self.ngram_range, lowercase=True,
+                               sublinear_tf=True, dtype=np.float32)
+
+    def fit(self, texts: Iterable[str]):
+        """Fit the vocabulary and precompute rows for ``texts``"""
+        corpus = sorted({text.lower() for text in texts if text})
+        if not corpus:
+            return
+        vectorizer = self._new_vectorizer()
+        matrix = vectorizer.fit_transform(corpus).tocsr()
+        with self._update_lock:
+            self._state = _MatcherState(
+                vectorizer, vectorizer.build_analyzer(), vectorizer.vocabulary_,
+                vectorizer.idf_.astype(np.float32), matrix,
+                {text: i for i, text in enumerate(corpus)}, len(corpus)
+            )
+        logger.info(f"Text matcher fitted on {len(corpus)} strings")
+
+    def fit_registry(self, registry, sample_size: int = FIT_SAMPLE_SIZE):
+        """Fit on the names and courses of a certificate registry and follow its updates"""
+        records = registry.sample(sample_size)
+        self.fit(self._registry_texts(records))
+        registry.subscribe(lambda added: self.add(self._registry_texts(added)))
+
+    @staticmethod
+    def _registry_texts(records: Iterable[Dict]) -> List[str]:
+        texts = []
+        for record in records:
+            for field in ("student_name", "course"):
+                if record.get(field):
+                    texts.append(record[field])
+        return texts
+
+    def add(self, texts: Iterable[str]):
+        """Add rows for new strings, refitting the vocabulary once it has drifted"""
+        state = self._state
+        if state is None:
+            self.fit(texts)
+            return
+        new_texts = sorted({text.lower() for text in texts if text} - state.rows.keys())
+        if not new_texts:
+            return
+        if len(state.rows) + len(new_texts) - state.fitted_size > state.fitted_size * REFIT_GROWTH_RATIO:
+            self.fit(list(state.rows) + new_texts)
+            return
+        with self._update_lock:
+            state = self._state
+            rows = dict(state.rows)
+            for text in new_texts:
+                rows.setdefault(text, len(rows))
+            added = [text for text in new_texts if rows[text] >= state.matrix.shape[0]]
+            matrix = sp.vstack([state.matrix, state.vectorizer.transform(added)], format='csr')
+            self._state = state._replace(matrix=matrix, rows=rows)
+
+    @staticmethod
+    def _vectorize(state: _MatcherState, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse TF-IDF vector of ``text`` as (column indices, values)"""
+        counts = Counter(state.analyzer(text))
+        columns = []
+        tf = []
+        for ngram, count in counts.items():
+            column = state.vocabulary.get(ngram)
+            if column is not None:
+                columns.append(column)
+                tf.append(count)
+        if not columns:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices = np.asarray(columns, dtype=np.int64)
+        values = (1.0 + np.log(np.asarray(tf, dtype=np.float32))) * state.idf[indices]
+        values /= np.linalg.norm(values)
+        return indices, values
+
+    def score(self, query: str, candidates: Sequence[str]) -> np.ndarray:
+        """Cosine similarity between ``query`` and each candidate"""
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        state = self._state
+        if state is None or not query or not candidates:
+            return scores
+        query_indices, query_values = self._vectorize(state, query.lower())
+        if len(query_indices) == 0:
+            return scores
+        query_vector = np.zeros(state.matrix.shape[1], dtype=np.float32)
+        query_vector[query_indices] = query_values
+
+        texts = [text.lower() if text else "" for text in candidates]
+        positions = []
+        rows = []
+        for position, text in enumerate(texts):
+            row = state.rows.get(text)
+            if row is not None:
+                positions.append(position)
+                rows.append(row)
+            elif text:
+                indices, values = self._vectorize(state, text)
+                scores[position] = query_vector[indices] @ values
+
+        # Gather every precomputed candidate row and reduce per candidate
+        if rows:
+            indptr = state.matrix.indptr
+            starts = indptr[rows]
+            lengths = indptr[np.asarray(rows) + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            products = state.matrix.data[offsets] * query_vector[state.matrix.indices[offsets]]
+            owners = np.repeat(np.arange(len(rows)), lengths)
+            scores[positions] = np.bincount(owners, weights=products, minlength=len(rows))
+        return scores
+
+    def _rows(self, state: _MatcherState, texts: Sequence[str]) -> sp.csr_matrix:
+        """TF-IDF row per text: precomputed rows are reused and the other distinct texts transformed together"""
+        distinct: Dict[str, int] = {}
+        positions = [distinct.setdefault(text.lower() if text else "", len(distinct)) for text in texts]
+        known = [text for text in distinct if text in state.rows]
+        unknown = [text for text in distinct if text not in state.rows]
+        # One transform call for the whole batch amortizes its per-call overhead
+        extra = state.vectorizer.transform(unknown) if unknown else sp.csr_matrix((0, state.matrix.shape[1]), dtype=np.float32)
+        stacked = sp.vstack([state.matrix[[state.rows[text] for text in known]], extra], format='csr')
+        # Row of ``stacked`` holding each distinct text
+        location = np.empty(len(distinct), dtype=np.int64)
+        location[[distinct[text] for text in known + unknown]] = np.arange(len(distinct))
+        return stacked[location[positions]]
+
+    def score_pairs(self, queries: Sequence[str], candidates: Sequence[str]) -> np.ndarray:
+        """Cosine similarity between each query and the candidate at the same position, in one sparse pass"""
+        scores = np.zeros(len(queries), dtype=np.float32)
+        state = self._state
+        if state is None or not len(queries):
+            return scores
+        products = self._rows(state, queries).multiply(self._rows(state, candidates))
+        scores[:] = np.asarray(products.sum(axis=1)).ravel()
+        return scores
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """Cosine similarity between two strings"""
+        return float(self.score(text1, [text2])[0])
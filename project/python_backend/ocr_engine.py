@@ -0,0 +1,192 @@
+import logging
+import shlex
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "auto" uses tesserocr when it is installed and falls back to pytesseract
+OCR_BACKENDS = ("auto", "tesserocr", "pytesseract")
+
+# Word-level fields returned by image_to_data, named as in pytesseract's output
+DATA_FIELDS = ("text", "left", "top", "width", "height", "conf")
+
+
+def parse_config(config: str) -> Tuple[int, int, Dict[str, str]]:
+    """Split a Tesseract command-line config into (psm, oem, variables)"""
+    psm, oem, variables = 3, 3, {}
+    args = shlex.split(config)
+    i = 0
+    while i < len(args):
+        if args[i] == "--psm" and i + 1 < len(args):
+            psm = int(args[i + 1])
+            i += 2
+        elif args[i] == "--oem" and i + 1 < len(args):
+            oem = int(args[i + 1])
+            i += 2
+        elif args[i] == "-c" and i + 1 < len(args):
+            name, _, value = args[i + 1].partition("=")
+            variables[name] = value
+            i += 2
+        else:
+            i += 1
+    return psm, oem, variables
+
+
+class OCREngine:
+    """Runs Tesseract on preprocessed grayscale images"""
+    name = "base"
+
+    def warm_up(self):
+        """Load the OCR backend ahead of the first call"""
+
+    def image_to_string(self, image: np.ndarray, config: str) -> str:
+        raise NotImplementedError
+
+    def image_to_data(self, image: np.ndarray, config: str) -> Dict[str, List]:
+        """Word boxes and text, keyed by the names in ``DATA_FIELDS``"""
+        raise NotImplementedError
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract binary once per call through pytesseract.
+
+    Every call spawns a process, writes the image to a temporary file and
+    loads the language model again.
+    """
+    name = "pytesseract"
+
+    def warm_up(self):
+        import pytesseract  # noqa: F401
+
+    def image_to_string(self, image: np.ndarray, config: str) -> str:
+        import pytesseract
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image: np.ndarray, config: str) -> Dict[str, List]:
+        import pytesseract
+        data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+        return {field: data[field] for field in DATA_FIELDS}
+
+
+class TesserocrEngine(OCREngine):
+    """Keeps an initialized Tesseract API handle in-process, one per thread.
+
+    Images are handed to libtesseract straight from the NumPy buffer, so a
+    call costs only the recognition itself. Page segmentation mode and
+    variables from the config are applied per call and reset afterwards.
+    """
+    name = "tesserocr"
+
+    def __init__(self, tessdata_path: Optional[str] = None, lang: str = "eng"):
+        try:
+            import tesserocr
+        except ImportError:
+            raise RuntimeError("The tesserocr OCR backend requires tesserocr: pip install tesserocr")
+        path, languages = tesserocr.get_languages(tessdata_path) if tessdata_path else tesserocr.get_languages()
+        if lang not in languages:
+            raise RuntimeError(f"Tesseract language data for {lang} not found in {path}")
+        self._tesserocr = tesserocr
+        self.tessdata_path = tessdata_path
+        self.lang = lang
+        self._local = threading.local()
+        # Handles created by warm_up, claimed by the first thread that needs one.
+        # Worker processes forked after warm-up inherit them copy-on-write.
+        self._spare_handles: Dict[int, object] = {}
+        self._spare_lock = threading.Lock()
+
+    def _new_api(self, oem: int):
+        kwargs = {"lang": self.lang, "oem": oem}
+        if self.tessdata_path:
+            kwargs["path"] = self.tessdata_path
+        api = self._tesserocr.PyTessBaseAPI(**kwargs)
+        logger.info(f"Initialized Tesseract API handle (oem {oem}) in thread {threading.get_ident()}")
+        return api
+
+    def warm_up(self, oem: int = 3):
+        """Load the language model now, without running recognition"""
+        with self._spare_lock:
+            if oem not in self._spare_handles:
+                self._spare_handles[oem] = self._new_api(oem)
+
+    def _api(self, oem: int):
+        """This thread's API handle for ``oem``, initialized on first use"""
+        handles = getattr(self._local, "handles", None)
+        if handles is None:
+            handles = self._local.handles = {}
+        api = handles.get(oem)
+        if api is None:
+            with self._spare_lock:
+                api = self._spare_handles.pop(oem, None)
+            if api is None:
+                api = self._new_api(oem)
+            handles[oem] = api
+        return api
+
+    def _prepare(self, image: np.ndarray, config: str):
+        psm, oem, variables = parse_config(config)
+        api = self._api(oem)
+        defaults = {name: api.GetVariableAsString(name) for name in variables}
+        for name, value in variables.items():
+            api.SetVariable(name, value)
+        api.SetPageSegMode(psm)
+
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+        return api, defaults
+
+    def _reset(self, api, defaults: Dict[str, str]):
+        api.Clear()
+        for name, value in defaults.items():
+            api.SetVariable(name, value or "")
+
+    def image_to_string(self, image: np.ndarray, config: str) -> str:
+        api, defaults = self._prepare(image, config)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            self._reset(api, defaults)
+
+    def image_to_data(self, image: np.ndarray, config: str) -> Dict[str, List]:
+        api, defaults = self._prepare(image, config)
+        data = {field: [] for field in DATA_FIELDS}
+        try:
+            api.Recognize()
+            iterator = api.GetIterator()
+            if iterator is None:
+                return data
+            level = self._tesserocr.RIL.WORD
+            for word in self._tesserocr.iterate_level(iterator, level):
+                text = word.GetUTF8Text(level)
+                box = word.BoundingBox(level)
+                if text is None or box is None:
+                    continue
+                left, top, right, bottom = box
+                data["text"].append(text)
+                data["left"].append(left)
+                data["top"].append(top)
+                data["width"].append(right - left)
+                data["height"].append(bottom - top)
+                data["conf"].append(word.Confidence(level))
+            return data
+        finally:
+            self._reset(api, defaults)
+
+
+def create_engine(backend: str = "auto", tessdata_path: Optional[str] = None) -> OCREngine:
+    """Build the OCR engine for ``backend``"""
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {backend}. Choose from {', '.join(OCR_BACKENDS)}")
+    if backend == "pytesseract":
+        return PytesseractEngine()
+    try:
+        return TesserocrEngine(tessdata_path=tessdata_path)
+    except RuntimeError as e:
+        if backend == "tesserocr":
+            raise
+        logger.info(f"{str(e)}; using pytesseract")
+        return PytesseractEngine()
@@ -0,0 +1,58 @@
+import logging
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PDFError(Exception):
+    """Raised when an uploaded PDF cannot be read"""
+
+
+def iter_pdf_pages(source: Union[bytes, str], max_pages: int, min_text_chars: int) -> Iterator[Tuple[int, Optional[str]]]:
+    """Yield (page number, text layer) for each page of PDF bytes or a PDF file, one page at a time.
+
+    The text layer is None for pages that carry too little embedded text to
+    be trusted, meaning the page is a scanned image and needs OCR.
+    """
+    import fitz  # PyMuPDF, imported on first use to keep startup light
+    try:
+        if isinstance(source, bytes):
+            document = fitz.open(stream=source, filetype="pdf")
+        else:
+            document = fitz.open(source, filetype="pdf")
+    except Exception as e:
+        raise PDFError(f"Unable to open PDF: {str(e)}")
+
+    with document:
+        if document.needs_pass:
+            raise PDFError("Encrypted PDFs are not supported")
+        if document.page_count > max_pages:
+            raise PDFError(f"PDF has {document.page_count} pages; the limit is {max_pages}")
+        for page_number in range(document.page_count):
+            text = document.load_page(page_number).get_text("text")
+            if len(text.strip()) >= min_text_chars:
+                yield page_number, text
+            else:
+                yield page_number, None
+
+
+def rasterize_pdf_page(pdf_path: str, page_number: int, dpi: int, max_pixels: int = 0) -> np.ndarray:
+    """Render a single PDF page to a grayscale array at ``dpi``.
+
+    Oversized pages are rendered at a lower resolution so the result has at
+    most ``max_pixels`` pixels, when set.
+    """
+    import fitz
+    with fitz.open(pdf_path) as document:
+        page = document.load_page(page_number)
+        pixels = page.rect.width * page.rect.height * (dpi / 72) ** 2
+        if max_pixels and pixels > max_pixels:
+            reduced_dpi = max(1, int(dpi * (max_pixels / pixels) ** 0.5))
+            logger.info(f"Rendering {page.rect.width:.0f}x{page.rect.height:.0f}pt page {page_number} "
+                        f"at {reduced_dpi} dpi instead of {dpi}")
+            dpi = reduced_dpi
+        pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        gray = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.stride)
+        return gray[:, :pixmap.width].copy()
@@ -0,0 +1,215 @@
+import io
+import logging
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# OpenCV is imported inside the functions that use it, so the API process can
+# load profiles without paying for it; only OCR workers ever import it.
+
+
+class PreprocessProfile(NamedTuple):
+    """Tuning knobs for one preprocessing profile"""
+    name: str
+    # Median character height, in pixels, that pages are rescaled to
+    target_text_height: int
+    # Estimated noise sigma above which a 3x3 median filter is applied
+    median_above: float
+    # Estimated noise sigma above which a 5x5 median filter is applied instead
+    strong_median_above: float
+    # Estimated noise sigma above which NL-means denoising is applied instead
+    nlmeans_above: float
+
+
+NEVER = float("inf")
+
+PROFILES = {
+    # Skip denoising on all but noisy scans, and then only a 3x3 median
+    "fast": PreprocessProfile("fast", target_text_height=28, median_above=6.0,
+                              strong_median_above=NEVER, nlmeans_above=NEVER),
+    # Median filters for typical scan noise, NL-means only for very heavy noise
+    "balanced": PreprocessProfile("balanced", target_text_height=32, median_above=3.0,
+                                  strong_median_above=8.0, nlmeans_above=25.0),
+    # Always run NL-means, as the original pipeline did
+    "max-quality": PreprocessProfile("max-quality", target_text_height=36, median_above=0.0,
+                                     strong_median_above=0.0, nlmeans_above=0.0),
+    # Quick first pass of tiered verification: fast's denoising at a lower
+    # resolution, enough to read certificate numbers and names on clean scans
+    "quick": PreprocessProfile("quick", target_text_height=20, median_above=6.0,
+                               strong_median_above=NEVER, nlmeans_above=NEVER),
+}
+
+DEFAULT_PROFILE = "balanced"
+
+# Bounds on how far resolution normalization may rescale a page
+MIN_SCALE = 0.2
+MAX_SCALE = 3.0
+
+# Rescaling within this ratio of the target is skipped
+SCALE_TOLERANCE = 0.15
+
+# Side length of the crop used for noise estimation
+NOISE_SAMPLE_SIZE = 512
+
+# Noise sigma above which NL-means uses its stronger filter strength
+NLMEANS_STRONG_ABOVE = 6.0
+
+# Images with more pixels than this are rejected before decoding
+DEFAULT_MAX_IMAGE_PIXELS = 100_000_000
+
+# Images with more pixels than this are downscaled while decoding
+DEFAULT_DECODE_MAX_PIXELS = 16_000_000
+
+# Largest downscaling factor applied while decoding; JPEG can decode at 1/2, 1/4 or 1/8 scale
+MAX_DECODE_REDUCTION = 8
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an image has more pixels than the configured limit"""
+
+
+class UnreadableImageError(ValueError):
+    """Raised when uploaded data cannot be decoded as an image"""
+
+
+def get_profile(name: str) -> PreprocessProfile:
+    """Look up a preprocessing profile by name"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown preprocessing profile: {name}. Choose from {', '.join(PROFILES)}")
+
+
+def decode_reduction(pixels: int, decode_max_pixels: int) -> int:
+    """Power-of-two factor to shrink each side by so ``pixels`` fits within ``decode_max_pixels``"""
+    factor = 1
+    while factor < MAX_DECODE_REDUCTION and pixels / factor ** 2 > decode_max_pixels:
+        factor *= 2
+    return factor
+
+
+def decode_grayscale(source: Union[bytes, str], max_pixels: int = DEFAULT_MAX_IMAGE_PIXELS,
+                     decode_max_pixels: int = DEFAULT_DECODE_MAX_PIXELS) -> np.ndarray:
+    """Decode image bytes or an image file straight to a grayscale array.
+
+    The size check reads only the header, so images over ``max_pixels`` are
+    rejected before any pixel data is decoded. OpenCV then decodes to
+    grayscale as it reads, and images over ``decode_max_pixels`` at 1/2, 1/4
+    or 1/8 size: JPEGs are scaled down by the decoder itself, other formats
+    right after decoding. A full-size color copy is never made. Formats
+    OpenCV cannot read go through Pillow instead.
+    """
+    import cv2
+    from PIL import Image
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            width, height = image.size
+            image_format = image.format
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e))
+
+    pixels = width * height
+    if max_pixels and pixels > max_pixels:
+        raise ImageTooLargeError(
+            f"Image is {width}x{height} ({pixels / 1e6:.0f} MP); the limit is {max_pixels / 1e6:.0f} MP"
+        )
+    factor = decode_reduction(pixels, decode_max_pixels) if decode_max_pixels else 1
+    flags = {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+             4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}[factor]
+    if isinstance(source, bytes):
+        gray = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), flags)
+    else:
+        gray = cv2.imread(source, flags)
+    if gray is None:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            converted = image.convert("L")
+            gray = np.array(converted.reduce(factor) if factor > 1 else converted)
+    if factor > 1:
+        logger.info(f"Decoded {width}x{height} {image_format} image at 1/{factor} size")
+    return gray
+
+
+def estimate_text_height(gray: np.ndarray) -> Optional[float]:
+    """Estimate the median character height in pixels from connected components"""
+    import cv2
+    height, width = gray.shape[:2]
+    # Work on a reduced copy; component heights scale back linearly
+    scale = min(1.0, 1200.0 / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    if count <= 1:
+        return None
+
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    # Keep glyph-like components: not specks, not rules, borders or photos
+    glyphs = (heights >= 3) & (heights <= small.shape[0] * 0.1) & (widths <= heights * 4)
+    if glyphs.sum() < 10:
+        return None
+    return float(np.median(heights[glyphs])) / scale
+
+
+def normalize_resolution(gray: np.ndarray, target_text_height: int) -> np.ndarray:
+    """Rescale so the median character height is close to ``target_text_height``"""
+    import cv2
+    text_height = estimate_text_height(gray)
+    if not text_height:
+        return gray
+    scale = min(MAX_SCALE, max(MIN_SCALE, target_text_height / text_height))
+    if abs(scale - 1.0) <= SCALE_TOLERANCE:
+        return gray
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def estimate_noise(gray: np.ndarray) -> float:
+    """Estimate the noise standard deviation (Immerkaer's method) on a central crop"""
+    import cv2
+    height, width = gray.shape[:2]
+    top = max(0, (height - NOISE_SAMPLE_SIZE) // 2)
+    left = max(0, (width - NOISE_SAMPLE_SIZE) // 2)
+    sample = gray[top:top + NOISE_SAMPLE_SIZE, left:left + NOISE_SAMPLE_SIZE]
+    if sample.shape[0] < 3 or sample.shape[1] < 3:
+        return 0.0
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = cv2.filter2D(sample.astype(np.float32), -1, kernel)[1:-1, 1:-1]
+    return float(np.sqrt(np.pi / 2.0) * np.abs(response).mean() / 6.0)
+
+
+def preprocess(gray: np.ndarray, profile: PreprocessProfile, overwrite_input: bool = False) -> np.ndarray:
+    """Normalize, denoise and binarize a grayscale page for OCR.
+
+    The median filter and threshold write into the page buffer they read
+    from whenever that buffer is not the caller's, or when
+    ``overwrite_input`` allows reusing the caller's ``gray``, so a page
+    needs at most one extra full-size array.
+    """
+    import cv2
+    # Measure noise before rescaling, which would smooth some of it away
+    sigma = estimate_noise(gray)
+    normalized = normalize_resolution(gray, profile.target_text_height)
+    owned = overwrite_input or normalized is not gray
+    del gray
+
+    if sigma > profile.nlmeans_above:
+        denoised = cv2.fastNlMeansDenoising(normalized, h=10.0 if sigma > NLMEANS_STRONG_ABOVE else 3.0)
+        owned = True
+    elif sigma > profile.strong_median_above:
+        denoised = cv2.medianBlur(normalized, 5, dst=normalized if owned else None)
+        owned = True
+    elif sigma > profile.median_above:
+        denoised = cv2.medianBlur(normalized, 3, dst=normalized if owned else None)
+        owned = True
+    else:
+        denoised = normalized
+    del normalized
+
+    # Threshold window spans roughly one character at the normalized size
+    block_size = profile.target_text_height | 1
+    return cv2.adaptiveThreshold(
+        denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block_size, 10,
+        dst=denoised if owned else None
+    )
@@ -0,0 +1,53 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Tracks startup warm-up so a readiness probe can report when it is done.
+
+    Liveness (``/health``) only says the process is serving; readiness says
+    the heavy state has been loaded and requests will not pay for it.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready = False
+        self.stage = "starting"
+        self.error: Optional[str] = None
+        self.stage_seconds: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+
+    @contextmanager
+    def stage_timer(self, name: str):
+        """Record a named warm-up stage and how long it took"""
+        self.stage = name
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = round(time.monotonic() - start, 3)
+            logger.info(f"Warm-up stage {name} took {self.stage_seconds[name]}s")
+
+    def mark_ready(self):
+        self.ready = True
+        self.stage = "ready"
+        self.ready_after = round(time.monotonic() - self.started_at, 3)
+        logger.info(f"Ready {self.ready_after}s after startup")
+
+    def mark_failed(self, error: str):
+        self.stage = "failed"
+        self.error = error
+        logger.error(f"Warm-up failed: {error}")
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "stage": self.stage,
+            "ready_after_seconds": self.ready_after,
+            "stage_seconds": self.stage_seconds,
+            "error": self.error,
+        }
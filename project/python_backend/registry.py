@@ -0,0 +1,513 @@
+import argparse
+import csv
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuzzy_index import FuzzyIndex, SQLiteFuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+# Columns of a registry record, matching the VERIFIED_CERTIFICATES entries
+REGISTRY_FIELDS = (
+    "certificate_number",
+    "student_name",
+    "roll_number",
+    "course",
+    "institution",
+    "graduation_year",
+    "grade",
+)
+
+# Fields with an OCR-tolerant fuzzy index
+FUZZY_FIELDS = ("certificate_number", "roll_number", "student_name")
+
+# Rows inserted per transaction by the bulk loader
+LOAD_CHUNK_SIZE = 10000
+
+
+def normalize_record(record: Dict) -> Dict:
+    """Normalize a raw registry row so index keys compare consistently"""
+    normalized = {}
+    for field in REGISTRY_FIELDS:
+        value = record.get(field)
+        if value is None or (isinstance(value, str) and value.strip() == ""):
+            normalized[field] = None
+        elif field in ("certificate_number", "roll_number"):
+            normalized[field] = str(value).strip().upper()
+        elif field == "graduation_year":
+            normalized[field] = int(value)
+        else:
+            normalized[field] = str(value).strip().lower()
+    return normalized
+
+
+class CertificateRegistry:
+    """Lookup interface over issued certificates.
+
+    Backends keep exact indexes on certificate number, roll number and
+    student name plus a blocking index on (institution, graduation_year), so
+    verification only compares an upload against a handful of candidate rows.
+    With ``fuzzy`` enabled, OCR-garbled keys are resolved through fuzzy
+    indexes, created per field by ``_new_fuzzy_index``, before falling back
+    to the block.
+    """
+
+    def __init__(self, block_limit: int = 50, fuzzy: bool = True, fuzzy_k: int = 5):
+        self.block_limit = block_limit
+        self.fuzzy_k = fuzzy_k
+        self.fuzzy_indexes: Dict[str, FuzzyIndex] = (
+            {field: self._new_fuzzy_index(field) for field in FUZZY_FIELDS} if fuzzy else {}
+        )
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+
+    def subscribe(self, listener: Callable[[List[Dict]], None]):
+        """Call ``listener`` with each batch of newly added records"""
+        self._listeners.append(listener)
+
+    def _new_fuzzy_index(self, field: str) -> FuzzyIndex:
+        return FuzzyIndex()
+
+    def _notify(self, records: List[Dict]):
+        self._index_fuzzy(records)
+        for listener in self._listeners:
+            listener(records)
+
+    def _index_fuzzy(self, records: Iterable[Dict]):
+        if not self.fuzzy_indexes:
+            return
+        records = list(records)
+        for field, index in self.fuzzy_indexes.items():
+            index.add_many(record[field] for record in records if record.get(field))
+
+    def find_by(self, field: str, value: str) -> List[Dict]:
+        """Exact lookup on one of the indexed key fields"""
+        if field == "certificate_number":
+            return self.find_by_certificate_number(value)
+        if field == "roll_number":
+            return self.find_by_roll_number(value)
+        if field == "student_name":
+            return self.find_by_student_name(value)
+        raise ValueError(f"No index on field: {field}")
+
+    def find_fuzzy(self, field: str, value: str) -> List[Dict]:
+        """Rows whose ``field`` is within a few OCR edits of ``value``"""
+        index = self.fuzzy_indexes.get(field)
+        if index is None:
+            return []
+        found = []
+        for original, _ in index.search(value, k=self.fuzzy_k):
+            found.extend(self.find_by(field, original))
+        return found
+
+    def find_by_certificate_number(self, certificate_number: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def find_by_roll_number(self, roll_number: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def find_by_student_name(self, student_name: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def find_by_block(self, institution: str, graduation_year: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def add_many(self, records: Iterable[Dict]) -> int:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def sample(self, limit: int) -> List[Dict]:
+        """Return up to ``limit`` records, used to fit text matchers"""
+        raise NotImplementedError
+
+    def records(self) -> Iterator[Dict]:
+        """Stream every record in insertion order"""
+        raise NotImplementedError
+
+    def candidates(self, certificate_number: Optional[str] = None, roll_number: Optional[str] = None,
+                   institution: Optional[str] = None, graduation_year: Optional[int] = None,
+                   student_name: Optional[str] = None, fuzzy: bool = True) -> List[Dict]:
+        """Collect candidate rows for an extracted certificate.
+
+        Exact key hits come first, then, unless ``fuzzy`` is off, fuzzy hits on
+        certificate number, roll number and student name. The (institution,
+        graduation_year) block is only consulted when none of those matched
+        anything.
+        """
+        found = []
+        if certificate_number:
+            found.extend(self.find_by_certificate_number(certificate_number.strip().upper()))
+        if roll_number:
+            found.extend(self.find_by_roll_number(roll_number.strip().upper()))
+        if not found and fuzzy:
+            for field, value in (("certificate_number", certificate_number),
+                                 ("roll_number", roll_number),
+                                 ("student_name", student_name)):
+                if value:
+                    found.extend(self.find_fuzzy(field, value))
+        if not found and institution and graduation_year:
+            found.extend(self.find_by_block(institution.strip().lower(), graduation_year))
+
+        unique = []
+        seen = set()
+        for record in found:
+            key = tuple(record.get(field) for field in REGISTRY_FIELDS)
+            if key not in seen:
+                seen.add(key)
+                unique.append(record)
+        return unique
+
+
+class InMemoryRegistry(CertificateRegistry):
+    """Registry held in dict indexes, used for the built-in mock data"""
+
+    def __init__(self, records: Iterable[Dict] = (), block_limit: int = 50, fuzzy: bool = True):
+        super().__init__(block_limit, fuzzy=fuzzy)
+        self._records: List[Dict] = []
+        self._by_certificate_number: Dict[str, List[Dict]] = defaultdict(list)
+        self._by_roll_number: Dict[str, List[Dict]] = defaultdict(list)
+        self._by_student_name: Dict[str, List[Dict]] = defaultdict(list)
+        self._by_block: Dict[tuple, List[Dict]] = defaultdict(list)
+        self.add_many(records)
+
+    def find_by_certificate_number(self, certificate_number: str) -> List[Dict]:
+        return list(self._by_certificate_number.get(certificate_number, ()))
+
+    def find_by_roll_number(self, roll_number: str) -> List[Dict]:
+        return list(self._by_roll_number.get(roll_number, ()))
+
+    def find_by_student_name(self, student_name: str) -> List[Dict]:
+        return list(self._by_student_name.get(student_name.strip().lower(), ()))
+
+    def find_by_block(self, institution: str, graduation_year: int) -> List[Dict]:
+        return self._by_block.get((institution, graduation_year), [])[:self.block_limit]
+
+    def add_many(self, records: Iterable[Dict]) -> int:
+        added = []
+        for raw in records:
+            record = normalize_record(raw)
+            self._records.append(record)
+            if record["certificate_number"]:
+                self._by_certificate_number[record["certificate_number"]].append(record)
+            if record["roll_number"]:
+                self._by_roll_number[record["roll_number"]].append(record)
+            if record["student_name"]:
+                self._by_student_name[record["student_name"]].append(record)
+            if record["institution"] and record["graduation_year"]:
+                self._by_block[(record["institution"], record["graduation_year"])].append(record)
+            added.append(record)
+        self._notify(added)
+        return len(added)
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def sample(self, limit: int) -> List[Dict]:
+        return self._records[:limit]
+
+    def records(self) -> Iterator[Dict]:
+        return iter(self._records)
+
+
+class SQLiteRegistry(CertificateRegistry):
+    """Registry stored in a local SQLite database with indexed lookup keys.
+
+    Fuzzy indexes live in the same database as ``SQLiteFuzzyIndex`` tables and
+    are kept up to date as records are added. A registry imported without
+    them is indexed offline with ``python registry.py --fuzzy-index``; opening
+    it never rebuilds anything.
+    """
+
+    def __init__(self, db_path: str, block_limit: int = 50, fuzzy: bool = True):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._fuzzy_lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS certificates ("
+            "id INTEGER PRIMARY KEY, "
+            "certificate_number TEXT, student_name TEXT, roll_number TEXT, course TEXT, "
+            "institution TEXT, graduation_year INTEGER, grade TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS certificates_number ON certificates (certificate_number)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS certificates_roll ON certificates (roll_number)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS certificates_name ON certificates (student_name)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS certificates_block ON certificates (institution, graduation_year)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fuzzy_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._db.commit()
+        super().__init__(block_limit, fuzzy=fuzzy)
+        if self.fuzzy_indexes:
+            behind = self._fuzzy_backlog()
+            if behind:
+                logger.warning(
+                    f"Fuzzy indexes are missing {behind} records; build them with "
+                    f"python registry.py --db {db_path} --fuzzy-index"
+                )
+
+    def _new_fuzzy_index(self, field: str) -> SQLiteFuzzyIndex:
+        return SQLiteFuzzyIndex(self._db, self._lock, field)
+
+    def _indexed_through(self) -> int:
+        """Highest record id in the fuzzy indexes; callers hold ``_lock``"""
+        row = self._db.execute("SELECT value FROM fuzzy_meta WHERE key = 'indexed_through'").fetchone()
+        return row[0] if row else 0
+
+    def _fuzzy_backlog(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM certificates WHERE id > ?", (self._indexed_through(),)
+            ).fetchone()[0]
+
+    def _index_fuzzy(self, records: Iterable[Dict]):
+        # Rows are already committed: index everything past the stored mark
+        if self.fuzzy_indexes:
+            self.update_fuzzy_indexes()
+
+    def update_fuzzy_indexes(self) -> int:
+        """Add every record not yet in the fuzzy indexes, returning how many were indexed"""
+        indexed = 0
+        with self._fuzzy_lock:
+            with self._lock:
+                last_id = self._indexed_through()
+            while True:
+                with self._lock:
+                    cursor = self._db.cursor()
+                    cursor.row_factory = None
+                    rows = cursor.execute(
+                        f"SELECT id, {', '.join(FUZZY_FIELDS)} FROM certificates WHERE id > ? ORDER BY id LIMIT ?",
+                        (last_id, LOAD_CHUNK_SIZE)
+                    ).fetchall()
+                if not rows:
+                    return indexed
+                for column, field in enumerate(FUZZY_FIELDS, 1):
+                    self.fuzzy_indexes[field].add_many(row[column] for row in rows if row[column])
+                last_id = rows[-1][0]
+                with self._lock:
+                    self._db.execute(
+                        "INSERT INTO fuzzy_meta (key, value) VALUES ('indexed_through', ?) "
+                        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                        (last_id,)
+                    )
+                    self._db.commit()
+                indexed += len(rows)
+
+    def _select(self, where: str, params: tuple, limit: Optional[int] = None) -> List[Dict]:
+        query = f"SELECT {', '.join(REGISTRY_FIELDS)} FROM certificates WHERE {where}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_by_certificate_number(self, certificate_number: str) -> List[Dict]:
+        return self._select("certificate_number = ?", (certificate_number,))
+
+    def find_by_roll_number(self, roll_number: str) -> List[Dict]:
+        return self._select("roll_number = ?", (roll_number,))
+
+    def find_by_student_name(self, student_name: str) -> List[Dict]:
+        return self._select("student_name = ?", (student_name.strip().lower(),))
+
+    def find_by_block(self, institution: str, graduation_year: int) -> List[Dict]:
+        return self._select(
+            "institution = ? AND graduation_year = ?", (institution, graduation_year), self.block_limit
+        )
+
+    def add_many(self, records: Iterable[Dict]) -> int:
+        insert = (
+            f"INSERT INTO certificates ({', '.join(REGISTRY_FIELDS)}) "
+            f"VALUES ({', '.join('?' for _ in REGISTRY_FIELDS)})"
+        )
+        added = 0
+        chunk = []
+        for raw in records:
+            chunk.append(normalize_record(raw))
+            if len(chunk) >= LOAD_CHUNK_SIZE:
+                added += self._insert_chunk(insert, chunk)
+                chunk = []
+        if chunk:
+            added += self._insert_chunk(insert, chunk)
+        return added
+
+    def _insert_chunk(self, insert: str, chunk: List[Dict]) -> int:
+        with self._lock:
+            self._db.executemany(insert, [tuple(record[field] for field in REGISTRY_FIELDS) for record in chunk])
+            self._db.commit()
+        self._notify(chunk)
+        return len(chunk)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM certificates").fetchone()[0]
+
+    def sample(self, limit: int) -> List[Dict]:
+        return self._select("1", (), limit)
+
+    def records(self) -> Iterator[Dict]:
+        last_id = 0
+        while True:
+            with self._lock:
+                # Plain tuples: sqlite3.Row costs more than the query itself on full scans
+                cursor = self._db.cursor()
+                cursor.row_factory = None
+                rows = cursor.execute(
+                    f"SELECT id, {', '.join(REGISTRY_FIELDS)} FROM certificates WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, LOAD_CHUNK_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for row in rows:
+                yield dict(zip(REGISTRY_FIELDS, row[1:]))
+
+
+class RegistryTable:
+    """Column snapshot of a registry for verifying many certificates at once.
+
+    Each exact key column is kept sorted, stably so rows with equal keys stay
+    in registry order, and a whole batch of extracted keys is joined against
+    it with two ``searchsorted`` calls instead of one index lookup per
+    certificate. ``candidates_many`` returns what ``candidates`` returns for
+    each query, in the same order. Fuzzy lookups go through the registry's
+    fuzzy indexes and are only made for queries without an exact hit. The
+    snapshot never touches the registry database after it is built, so it
+    can be shared with forked worker processes.
+    """
+
+    def __init__(self, registry: CertificateRegistry):
+        self.registry = registry
+        values = {field: [] for field in REGISTRY_FIELDS}
+        for record in registry.records():
+            for field in REGISTRY_FIELDS:
+                values[field].append(record[field])
+        self.columns = {field: np.array(column, dtype=object) for field, column in values.items()}
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for field in FUZZY_FIELDS:
+            keys = [value or "" for value in values[field]]
+            # Python's sort is stable and several times faster than argsort on object arrays
+            order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+            self._sorted[field] = (np.array(keys, dtype=object)[order], order)
+        self._blocks: Dict[tuple, List[int]] = defaultdict(list)
+        for row, block in enumerate(zip(values["institution"], values["graduation_year"])):
+            if block[0] and block[1] and len(self._blocks[block]) < registry.block_limit:
+                self._blocks[block].append(row)
+        logger.info(f"Registry table built over {len(self)} records")
+
+    def __len__(self) -> int:
+        return len(self.columns["certificate_number"])
+
+    def join(self, field: str, keys: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows whose ``field`` equals each key, as (key positions, rows) ordered by position then row"""
+        sorted_keys, order = self._sorted[field]
+        queries = np.array([key or "" for key in keys], dtype=object)
+        starts = np.searchsorted(sorted_keys, queries, side="left")
+        counts = np.searchsorted(sorted_keys, queries, side="right") - starts
+        counts[queries == ""] = 0
+        positions = np.repeat(np.arange(len(queries)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return positions, order[np.repeat(starts, counts) + offsets]
+
+    def _fuzzy_rows(self, field: str, value: str) -> List[int]:
+        index = self.registry.fuzzy_indexes.get(field)
+        if index is None:
+            return []
+        originals = [original for original, _ in index.search(value, k=self.registry.fuzzy_k)]
+        key = str.lower if field == "student_name" else str
+        return self.join(field, [key(original) for original in originals])[1].tolist()
+
+    def record(self, row: int) -> Dict:
+        return {field: self.columns[field][row] for field in REGISTRY_FIELDS}
+
+    def candidates_many(self, queries: Sequence[Dict]) -> List[List[Dict]]:
+        """``CertificateRegistry.candidates`` for each dict of its keyword arguments"""
+        found: List[List[int]] = [[] for _ in queries]
+        for field in ("certificate_number", "roll_number"):
+            keys = [query[field].strip().upper() if query.get(field) else None for query in queries]
+            positions, rows = self.join(field, keys)
+            for position, row in zip(positions.tolist(), rows.tolist()):
+                found[position].append(row)
+
+        results = []
+        for query, rows in zip(queries, found):
+            if not rows:
+                for field in FUZZY_FIELDS:
+                    if query.get(field):
+                        rows.extend(self._fuzzy_rows(field, query[field]))
+            if not rows and query.get("institution") and query.get("graduation_year"):
+                rows = self._blocks.get((query["institution"].strip().lower(), query["graduation_year"]), [])
+            unique = []
+            seen = set()
+            for row in rows:
+                record = self.record(row)
+                key = tuple(record.values())
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(record)
+            results.append(unique)
+        return results
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Stream registry rows from a CSV or Parquet university data dump"""
+    if path.lower().endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet import requires pyarrow: pip install pyarrow")
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=LOAD_CHUNK_SIZE):
+            yield from batch.to_pylist()
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def open_registry(backend: str, db_path: str, seed: Iterable[Dict] = (), block_limit: int = 50,
+                  fuzzy: bool = True) -> CertificateRegistry:
+    """Create the configured registry backend"""
+    if backend == "sqlite":
+        logger.info(f"Using SQLite certificate registry at {db_path}")
+        return SQLiteRegistry(db_path, block_limit=block_limit, fuzzy=fuzzy)
+    if backend == "memory":
+        return InMemoryRegistry(seed, block_limit=block_limit, fuzzy=fuzzy)
+    raise ValueError(f"Unknown registry backend: {backend}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import university data dumps into the certificate registry")
+    parser.add_argument("files", nargs="*", help="CSV or Parquet files with registry columns")
+    parser.add_argument("--db", default="registry.db", help="SQLite registry database path")
+    parser.add_argument("--fuzzy-index", action="store_true",
+                        help="Build or update the fuzzy key indexes used with REGISTRY_FUZZY_INDEX=1")
+    args = parser.parse_args()
+
+    registry = SQLiteRegistry(args.db, fuzzy=args.fuzzy_index)
+    for path in args.files:
+        added = registry.add_many(read_records(path))
+        print(f"Imported {added} records from {path}")
+    if args.fuzzy_index:
+        print(f"Fuzzy-indexed {registry.update_fuzzy_indexes()} further records")
+    print(f"Registry now holds {registry.count()} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of writes between size/TTL sweeps of the SQLite tier
+PRUNE_INTERVAL = 100
+
+
+def content_key(content: bytes, pipeline_version: str) -> str:
+    """Build a cache key from the uploaded bytes and the pipeline version"""
+    return digest_key(hashlib.sha256(content).hexdigest(), pipeline_version)
+
+
+def digest_key(digest: str, pipeline_version: str) -> str:
+    """Build a cache key from the SHA-256 hex digest of an upload and the pipeline version"""
+    return f"{pipeline_version}:{digest}"
+
+
+class ResultCache:
+    """Two-tier cache of OCR results keyed by content hash.
+
+    Values are JSON-serializable dicts. The in-memory tier is an LRU bounded
+    by ``max_entries``; the optional SQLite tier at ``db_path`` survives
+    restarts and is bounded by ``db_max_entries``. Entries older than
+    ``ttl_seconds`` are treated as misses in both tiers.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, db_path: Optional[str] = None,
+                 db_max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.db_max_entries = db_max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._open_db()
+
+    def _open_db(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+        self._db.commit()
+        logger.info(f"Result cache persisted to {self.db_path}")
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, value: Dict[str, Any], created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for ``key``, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store ``value`` under ``key`` in every tier"""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, value, created_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), created_at)
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= PRUNE_INTERVAL:
+                    self._prune_db()
+                    self._writes_since_prune = 0
+                self._db.commit()
+
+    def _prune_db(self):
+        if self.ttl_seconds > 0:
+            self._db.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        overflow = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.db_max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY created_at LIMIT ?)", (overflow,)
+            )
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "persistent": self._db is not None,
+        }
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Re-verify stored extractions in bulk, e.g. after registry or scoring rule changes.
+
+Reads JSONL or Parquet records and runs them through verify_against_database
+again without OCR, using the server's configuration (REGISTRY_BACKEND,
+INSTITUTIONS_PATH, ...). Each record may be:
+
+- a verification result, as returned by the API, or a batch or job output
+  line wrapping one in "result": its extracted_data is re-verified and its
+  is_valid is the previous decision
+- a cached extraction ({"text": ..., "data": {...}})
+- bare CertificateData fields, optionally with "text", "is_valid" and "id"
+- OCR text alone ({"text": ...}), which is extracted again; with
+  --reextract, text is re-extracted whenever present
+
+Usage (from python_backend/):
+    python reverify.py results.jsonl --output verdicts.jsonl --diff changed.jsonl
+    python reverify.py archive.parquet --output verdicts.jsonl --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Records per task handed to a worker process
+CHUNK_SIZE = 5000
+
+# Rows read from a Parquet file at a time
+PARQUET_BATCH_SIZE = 10000
+
+
+class StoredRecord(NamedTuple):
+    id: Any
+    data: Optional[Dict]
+    text: Optional[str]
+    previous: Optional[Dict]
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    """Stream records from a JSONL or Parquet file"""
+    if path.lower().endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet input requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_SIZE):
+            yield from batch.to_pylist()
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_record(row: Dict, number: int, fields: Tuple[str, ...]) -> Optional[StoredRecord]:
+    """Find the extraction, OCR text and previous decision in a stored row; None if it has neither"""
+    result = row.get("result") if isinstance(row.get("result"), dict) else None
+    source = result or row
+    data = source.get("extracted_data") or row.get("data")
+    if data is None and any(field in row for field in fields):
+        data = row
+    text = row.get("text")
+    if data is None and not text:
+        return None
+    previous = None
+    if source.get("is_valid") is not None:
+        previous = {"is_valid": source["is_valid"], "confidence": source.get("confidence")}
+    record_id = row.get("id", row.get("filename", number))
+    return StoredRecord(record_id, data, text, previous)
+
+
+def read_records(path: str, fields: Tuple[str, ...]) -> Iterator[Tuple[int, Optional[StoredRecord]]]:
+    for number, row in enumerate(read_rows(path), start=1):
+        yield number, parse_record(row, number, fields)
+
+
+def reverify_chunk(records: List[StoredRecord], reextract: bool) -> Tuple[List[str], List[str], Counter]:
+    """Verify a chunk of records; returns verdict lines, diff lines and decision counts"""
+    from main import CertificateData, processor
+    items = []
+    for record in records:
+        if record.text and (reextract or record.data is None):
+            items.append(processor.extract_certificate_data(record.text))
+        else:
+            items.append(CertificateData(**{field: record.data.get(field) for field in CertificateData.model_fields}))
+
+    verdicts, changes = [], []
+    counts = Counter()
+    for record, result in zip(records, processor.verify_many(items, _table)):
+        verdict = result.model_dump()
+        verdicts.append(json.dumps({"id": record.id, "result": verdict}))
+        if record.previous is None:
+            counts["no_previous"] += 1
+        elif record.previous["is_valid"] == result.is_valid:
+            counts["unchanged"] += 1
+        else:
+            counts["now_valid" if result.is_valid else "now_invalid"] += 1
+            changes.append(json.dumps({
+                "id": record.id,
+                "before": record.previous,
+                "after": {"is_valid": result.is_valid, "confidence": result.confidence, "flags": result.flags},
+            }))
+    return verdicts, changes, counts
+
+
+def chunks(records: Iterator[Tuple[int, Optional[StoredRecord]]], size: int,
+           skipped: Counter) -> Iterator[List[StoredRecord]]:
+    chunk = []
+    for number, record in records:
+        if record is None:
+            skipped["skipped"] += 1
+            logger.warning(f"Record {number} has no extracted data or OCR text, skipping")
+            continue
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Registry snapshot built before the workers fork, shared with them copy-on-write
+_table = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or Parquet file of stored records")
+    parser.add_argument("--output", required=True, help="JSONL file to write {id, result} verdicts to")
+    parser.add_argument("--diff", help="JSONL file to write records whose is_valid decision changed to")
+    parser.add_argument("--reextract", action="store_true", help="Re-extract fields from stored OCR text")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    global _table
+    from main import CertificateData, processor
+    from registry import RegistryTable
+    # Per-certificate verification logs would dominate the run time
+    logging.getLogger("main").setLevel(logging.WARNING)
+
+    start = time.perf_counter()
+    _table = RegistryTable(processor.registry)
+    processor.matcher
+    logger.info(f"Loaded {len(_table)} registry records in {time.perf_counter() - start:.1f}s")
+
+    fields = tuple(CertificateData.model_fields)
+    counts = Counter()
+    start = time.perf_counter()
+    pending = deque()
+    executor = None
+    if args.workers > 1:
+        # Forked so workers share the registry snapshot and fitted matcher
+        executor = ProcessPoolExecutor(args.workers, mp_context=get_context("fork"))
+    diff_file = open(args.diff, "w", encoding="utf-8") if args.diff else None
+    try:
+        with open(args.output, "w", encoding="utf-8") as output:
+            def write(verdicts: List[str], changes: List[str], chunk_counts: Counter):
+                output.write("".join(line + "\n" for line in verdicts))
+                if diff_file is not None:
+                    diff_file.write("".join(line + "\n" for line in changes))
+                counts.update(chunk_counts)
+                counts["records"] += len(verdicts)
+
+            for chunk in chunks(read_records(args.input, fields), args.chunk_size, counts):
+                if executor is None:
+                    write(*reverify_chunk(chunk, args.reextract))
+                    continue
+                pending.append(executor.submit(reverify_chunk, chunk, args.reextract))
+                # Results are written in input order, with a bounded number of chunks in flight
+                while len(pending) >= args.workers * 2:
+                    write(*pending.popleft().result())
+            while pending:
+                write(*pending.popleft().result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if diff_file is not None:
+            diff_file.close()
+
+    seconds = time.perf_counter() - start
+    print(f"Re-verified {counts['records']} records in {seconds:.1f}s "
+          f"({counts['records'] / max(seconds, 1e-9):.0f}/s), skipped {counts['skipped']}")
+    print(f"Decisions: {counts['unchanged']} unchanged, {counts['now_valid']} now valid, "
+          f"{counts['now_invalid']} now invalid, {counts['no_previous']} without a previous decision")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import argparse
 import subprocess
 import sys
 import os
@@ -13,36 +14,41 @@ def install_requirements():
         return False
     return True
 
-def start_server():
+def start_server(host: str, port: int, reload: bool):
     """Start the FastAPI server"""
     try:
         print("🚀 Starting Certificate Verification API server...")
-        print("📍 Server will be available at: http://localhost:8000")
-        print("📖 API documentation at: http://localhost:8000/docs")
-        print("🔍 Health check at: http://localhost:8000/health")
+        print(f"📍 Server will be available at: http://localhost:{port}")
+        print(f"📖 API documentation at: http://localhost:{port}/docs")
+        print(f"🔍 Health check at: http://localhost:{port}/health")
+        print(f"⏱️  Readiness check at: http://localhost:{port}/ready")
         print("\n" + "="*50)
-        
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "main:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000", 
-            "--reload"
-        ])
+
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port)]
+        # The reloader re-imports the app on every change; keep it for development
+        if reload:
+            command.append("--reload")
+        subprocess.run(command)
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
     except Exception as e:
         print(f"❌ Failed to start server: {e}")
 
 if __name__ == "__main__":
-    print("🔧 Setting up Certificate Verification API...")
-    
+    parser = argparse.ArgumentParser(description="Start the Certificate Verification API")
+    parser.add_argument("--install", action="store_true", help="Install requirements before starting")
+    parser.add_argument("--reload", action="store_true", help="Restart the server when code changes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
     # Change to the python_backend directory
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Install requirements
-    if install_requirements():
-        # Start the server
-        start_server()
-    else:
-        print("❌ Setup failed. Please check the error messages above.")
\ No newline at end of file
+
+    if args.install:
+        print("🔧 Setting up Certificate Verification API...")
+        if not install_requirements():
+            print("❌ Setup failed. Please check the error messages above.")
+            sys.exit(1)
+
+    start_server(args.host, args.port, args.reload)
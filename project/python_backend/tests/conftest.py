@@ -0,0 +1,32 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The backend modules are imported as top-level modules, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+INSTITUTIONS = ["ranchi university", "nit jamshedpur", "jharkhand university"]
+DEPARTMENTS = ["CSE", "ECE", "MEC", "CIV", "PHY", "CHE"]
+
+
+@pytest.fixture
+def registry_records():
+    """Seeded registry rows with unique certificate and roll numbers"""
+    rng = random.Random(7)
+    records = []
+    for i in range(500):
+        dept = DEPARTMENTS[i % len(DEPARTMENTS)]
+        year = 1980 + (i // 7) % 45
+        records.append({
+            "certificate_number": f"X{i % 97:02d}/{dept}/{year}/{i:08d}",
+            "student_name": f"student {rng.randrange(10 ** 6)} {i}",
+            "roll_number": f"{dept}{year}{i:08d}",
+            "course": "bachelor of technology",
+            "institution": INSTITUTIONS[i % len(INSTITUTIONS)],
+            "graduation_year": year,
+            "grade": "first class",
+        })
+    return records
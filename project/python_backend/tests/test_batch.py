@@ -0,0 +1,96 @@
+import asyncio
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from main import CertificateData, processor
+
+
+async def fake_verify_upload(upload, wait=False, content_type=None, debug_timings=False):
+    """Verify the certificate number an upload holds, slower for earlier files so lines arrive out of order"""
+    number = upload.read().decode()
+    if number == "unreadable":
+        raise HTTPException(status_code=400, detail="Unreadable image")
+    await asyncio.sleep(0.05 if number.startswith("RU/") else 0)
+    return processor.verify_against_database(CertificateData(certificate_number=number))
+
+
+def zip_archive(entries):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, content in entries.items():
+            zf.writestr(name, content)
+    return archive.getvalue()
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "verify_upload", fake_verify_upload)
+    # Spool every file to disk, to check the batch deletes them
+    monkeypatch.setattr(main.config, "UPLOAD_SPOOL_BYTES", 0)
+    monkeypatch.setattr(main.config, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    return TestClient(main.app)
+
+
+def post_batch(client, files):
+    response = client.post("/verify-certificates/batch", files=[("files", file) for file in files])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_streams_one_line_per_file(client, tmp_path):
+    archive = zip_archive({
+        "a.png": "NIT/CS/2024/0156",
+        "nested/b.png": "unreadable",
+        ".hidden.png": "skipped",
+        "notes.txt": "text",
+    })
+    lines = post_batch(client, [
+        ("first.png", b"RU/CSE/2024/001", "image/png"),
+        ("certs.zip", archive, "application/zip"),
+        ("broken.zip", b"PK not a zip", "application/zip"),
+        ("doc.docx", b"NIT/CS/2024/0156", "application/msword"),
+    ])
+
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == list(range(6))
+    assert [line["filename"] for _, line in sorted(by_index.items())] == [
+        "first.png", "certs.zip/a.png", "certs.zip/nested/b.png", "certs.zip/notes.txt", "broken.zip", "doc.docx"
+    ]
+    assert by_index[0]["result"]["is_valid"] and by_index[1]["result"]["is_valid"]
+    assert by_index[2]["error"] == "Unreadable image"
+    assert by_index[3]["error"] == "Only image files and PDFs are supported"
+    assert by_index[4]["error"] == "Invalid zip archive: broken.zip"
+    assert by_index[5]["error"] == "Only image files and PDFs are supported"
+    # Lines stream as items finish: files that could not be read don't wait for the slow first one
+    assert lines.index(by_index[0]) > lines.index(by_index[4])
+    assert os.listdir(tmp_path) == []
+
+
+def test_batch_reports_oversized_archive_entries(client, monkeypatch):
+    monkeypatch.setattr(main.config, "MAX_UPLOAD_BYTES", 20)
+    archive = zip_archive({"small.png": "RU/CSE/2024/001", "large.png": "x" * 21})
+
+    lines = sorted(post_batch(client, [("certs.zip", archive, "application/zip")]), key=lambda line: line["index"])
+
+    assert lines[0]["result"]["is_valid"]
+    assert lines[1] == {"index": 1, "filename": "certs.zip/large.png",
+                        "error": "certs.zip/large.png is larger than the 20 byte limit"}
+
+
+def test_batch_file_limit(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main.config, "BATCH_MAX_FILES", 2)
+
+    response = client.post("/verify-certificates/batch", files=[
+        ("files", (f"{i}.png", b"RU/CSE/2024/001", "image/png")) for i in range(3)
+    ])
+
+    assert response.status_code == 413
+    assert os.listdir(tmp_path) == []
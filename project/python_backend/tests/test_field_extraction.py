@@ -0,0 +1,93 @@
+import pytest
+
+from field_extraction import FieldExtractor
+
+# The mock OCR text the service shipped with
+MOCK_CERTIFICATE = """
+            RANCHI UNIVERSITY
+            CERTIFICATE OF GRADUATION
+
+            This is to certify that RAJESH KUMAR SINGH
+            Roll Number: CSE2020001
+            has successfully completed Bachelor of Technology
+            in Computer Science Engineering
+
+            Certificate Number: RU/CSE/2024/001
+            Grade: First Class with Distinction
+            Year of Graduation: 2024
+
+            Issued on: 15th June 2024
+            """
+
+VARIANT_CERTIFICATE = """NATIONAL INSTITUTE OF TECHNOLOGY JAMSHEDPUR
+Student Name: Priya Sharma
+Reg No: CS20B1001
+Degree: B.Tech in Computer Science
+Serial No: NIT/CS/2024/0156
+Division: Second Class
+Session 2020 2024"""
+
+ALTERNATE_CERTIFICATE = """Birla Institute Of Technology
+completed B.Sc in Mathematics
+Registration Number: BIT20191234
+Ref No: SXC-2019-778
+Batch: 2022
+Passed with A+ grade"""
+
+
+def extract(text):
+    # A generous budget keeps slow test machines from cutting extraction short
+    return FieldExtractor(time_budget_ms=10_000).extract(text)
+
+
+def test_mock_certificate():
+    assert extract(MOCK_CERTIFICATE) == {
+        "certificate_number": "RU/CSE/2024/001",
+        "roll_number": "CSE2020001",
+        "student_name": "Rajesh Kumar Singh",
+        "institution": "Ranchi University",
+        "graduation_year": 2024,
+        "course": "Bachelor of Technology in Computer Science Engineering",
+        "grade": "First Class",
+    }
+
+
+def test_variant_labels():
+    assert extract(VARIANT_CERTIFICATE) == {
+        "certificate_number": "NIT/CS/2024/0156",
+        "roll_number": "CS20B1001",
+        "student_name": "Priya Sharma",
+        "institution": "National Institute Of Technology Jamshedpur",
+        "graduation_year": 2020,
+        "course": "Computer Science",
+        "grade": "Second Class",
+    }
+
+
+def test_alternate_labels():
+    assert extract(ALTERNATE_CERTIFICATE) == {
+        "certificate_number": "SXC-2019-778",
+        "roll_number": "BIT20191234",
+        "institution": "Birla Institute Of Technology",
+        "graduation_year": 2022,
+        "course": "Mathematics",
+        "grade": "A+",
+    }
+
+
+@pytest.mark.parametrize("line, name", [
+    ("This is to certify that Mr. Amit Kumar has been awarded", "Amit Kumar"),
+    ("This is to certify that Ms Priya Sharma has completed", "Priya Sharma"),
+    ("This is to certify that Dr. Rahul Verma, son of R. Verma", "Rahul Verma"),
+    ("This is to certify that MRS. SUNITA DEVI", "Sunita Devi"),
+    ("Name: Mrs. Kavita Rani", "Kavita Rani"),
+    # Names that merely start like a title keep every letter
+    ("This is to certify that MRINAL SEN", "Mrinal Sen"),
+    ("Name: Drishti Rao", "Drishti Rao"),
+])
+def test_student_name_without_honorific(line, name):
+    assert extract(line)["student_name"] == name
+
+
+def test_missing_fields_are_left_out():
+    assert extract("no certificate text here") == {}
@@ -0,0 +1,69 @@
+import numpy as np
+
+from benchmarks.synthetic import make_records, render_certificate
+from fingerprint import FingerprintIndex, fingerprint
+
+
+def digest(n):
+    return f"{n:02x}" * 32
+
+
+def test_observe_flags_edited_copy():
+    records = make_records(3, seed=5)
+    original = records[0]
+    edited = dict(original, student_name=records[1]["student_name"],
+                  certificate_number=records[1]["certificate_number"])
+    index = FingerprintIndex()
+
+    page = render_certificate(original, dpi=150, noise_sigma=4, seed=1)
+    assert index.observe(digest(1), fingerprint(page), original) is None
+
+    # The same scan with a few lines rewritten
+    tampered = render_certificate(edited, dpi=150, noise_sigma=4, seed=1)
+    match = index.observe(digest(2), fingerprint(tampered), edited)
+
+    assert match is not None
+    assert match.digest == digest(1)
+    assert set(match.differing_fields) == {"student_name", "certificate_number"}
+    assert match.matching_regions >= 0.75 * match.compared_regions
+
+
+def test_observe_ignores_resubmissions_and_other_certificates():
+    records = make_records(3, seed=5)
+    index = FingerprintIndex()
+    page = fingerprint(render_certificate(records[0], dpi=150, noise_sigma=4, seed=1))
+
+    assert index.observe(digest(1), page, records[0]) is None
+    # Same upload again, and the same image with the same details
+    assert index.observe(digest(1), page, records[0]) is None
+    assert index.observe(digest(2), page, records[0]) is None
+    assert len(index) == 2
+
+    # Another certificate from the same template, scanned separately
+    other = render_certificate(records[2], dpi=150, noise_sigma=4, seed=11, skew_degrees=0.3)
+    assert index.observe(digest(3), fingerprint(other), records[2]) is None
+
+    blank = fingerprint(np.full((1100, 850), 255, dtype=np.uint8))
+    assert index.observe(digest(4), blank, records[1]) is None
+
+
+def test_stored_fingerprints_load_on_first_use(tmp_path):
+    records = make_records(2, seed=5)
+    db_path = str(tmp_path / "fingerprints.db")
+    page = fingerprint(render_certificate(records[0], dpi=150, noise_sigma=4, seed=1))
+    index = FingerprintIndex(db_path=db_path)
+    index.observe(digest(1), page, records[0])
+    index.close()
+
+    # Opening an index reads nothing until it is loaded or first used
+    restarted = FingerprintIndex(db_path=db_path)
+    assert len(restarted) == 0
+    restarted.load()
+    assert len(restarted) == 1
+    restarted.close()
+
+    edited = dict(records[0], student_name=records[1]["student_name"])
+    lazy = FingerprintIndex(db_path=db_path)
+    match = lazy.observe(digest(2), fingerprint(render_certificate(edited, dpi=150, noise_sigma=4, seed=1)), edited)
+    assert match is not None and match.digest == digest(1)
+    lazy.close()
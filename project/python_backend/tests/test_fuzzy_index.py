@@ -0,0 +1,88 @@
+import random
+import sqlite3
+import threading
+
+import pytest
+
+from fuzzy_index import FuzzyIndex, SQLiteFuzzyIndex, edit_distance, ocr_fold
+
+ALPHABET = "ABCDEFGHJKMNPRTUVWXY0123456789"
+
+
+def make_values(count, seed=3):
+    rng = random.Random(seed)
+    values = [
+        f"RU/{rng.choice(['CSE', 'ECE', 'MEC'])}/20{rng.randint(15, 24)}/{rng.randint(0, 99999):05d}"
+        for _ in range(count)
+    ]
+    # Originals that fold onto a key already present
+    return values + [value.replace("0", "O") for value in values[:20]]
+
+
+def garble(value, rng):
+    chars = list(value)
+    for _ in range(rng.randint(0, 2)):
+        operation = rng.choice(["replace", "delete", "insert"])
+        position = rng.randrange(len(chars))
+        if operation == "replace":
+            chars[position] = rng.choice(ALPHABET)
+        elif operation == "delete":
+            del chars[position]
+        else:
+            chars.insert(position, rng.choice(ALPHABET))
+    return "".join(chars)
+
+
+def brute_force(values, query, k=5, max_distance=2):
+    folded = ocr_fold(query)
+    matches = {}
+    for value in set(values):
+        distance = edit_distance(folded, ocr_fold(value), max_distance)
+        if distance <= max_distance:
+            matches[value] = distance
+    if 0 in matches.values():
+        return sorted((value, 0) for value, distance in matches.items() if distance == 0)[:k]
+    return sorted(matches.items(), key=lambda match: (match[1], match[0]))[:k]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_index(request):
+    def make():
+        if request.param == "sqlite":
+            db = sqlite3.connect(":memory:", check_same_thread=False)
+            return SQLiteFuzzyIndex(db, threading.Lock(), "certificate_number")
+        return FuzzyIndex()
+    return make
+
+
+def test_search_matches_brute_force(make_index):
+    # Small enough that no query has more candidates than are verified
+    values = make_values(150)
+    index = make_index()
+    index.add_many(values)
+    rng = random.Random(5)
+
+    for _ in range(200):
+        query = garble(rng.choice(values), rng)
+        assert index.search(query) == brute_force(values, query), query
+
+
+def test_search_folds_ocr_confusions(make_index):
+    index = make_index()
+    index.add_many(["RU/CSE/2024/001", "RU/CSE/2024/101", "NIT/CS/2024/0156"])
+
+    assert index.search("ru cse 2O24 OOl") == [("RU/CSE/2024/001", 0)]
+    assert index.search("NIT/CS/2024/056") == [("NIT/CS/2024/0156", 1)]
+    assert index.search("XYZ") == []
+
+
+def test_add_many_is_idempotent(make_index):
+    values = make_values(50)
+    index = make_index()
+    index.add_many(values)
+    index.add_many(values[:30])
+    for value in values[:5]:
+        index.add(value)
+
+    assert len(index) == len({ocr_fold(value) for value in values})
+    assert [original for original, _ in index.search(values[0])] == sorted({values[0], values[0].replace("0", "O")})
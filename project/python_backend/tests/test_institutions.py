@@ -0,0 +1,101 @@
+import json
+import os
+import random
+import time
+
+import pytest
+
+from institutions import AhoCorasick, InstitutionRegistry, make_institution, write_institutions_db
+
+SEED = {
+    "ranchi university": {"aliases": ["ru ranchi"], "certificate_format": r"^RU/[A-Z]{2,4}/\d{4}/\d{3}$"},
+    "nit jamshedpur": {"aliases": ["national institute of technology jamshedpur"]},
+    "national institute of technology": {},
+}
+
+
+def brute_force_matches(patterns, text):
+    return sorted(
+        (start, pattern_id)
+        for pattern_id, pattern in enumerate(patterns)
+        for start in range(len(text) - len(pattern) + 1)
+        if text.startswith(pattern, start)
+    )
+
+
+def test_aho_corasick_finds_every_occurrence():
+    rng = random.Random(3)
+    for _ in range(200):
+        patterns = list({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(6)})
+        text = "".join(rng.choice("abcd") for _ in range(40))
+
+        assert sorted(AhoCorasick(patterns).iter_matches(text)) == brute_force_matches(patterns, text)
+
+
+def test_resolve_prefers_longest_whole_word_match():
+    registry = InstitutionRegistry(make_institution(name, entry) for name, entry in SEED.items())
+
+    assert registry.resolve("RANCHI UNIVERSITY, Ranchi").name == "ranchi university"
+    assert registry.resolve("issued by RU-Ranchi").name == "ranchi university"
+    assert registry.resolve("National Institute of Technology, Jamshedpur").name == "nit jamshedpur"
+    assert registry.resolve("National Institute of Technology Patna").name == "national institute of technology"
+    assert registry.resolve("Summit Jamshedpur Academy") is None
+    assert registry.resolve("") is None
+
+
+def test_certificate_format():
+    ranchi = make_institution("Ranchi University", SEED["ranchi university"])
+
+    assert ranchi.matches_format("RU/CSE/2024/001")
+    assert not ranchi.matches_format("RU-CSE-2024-001")
+    assert make_institution("nit jamshedpur", {}).matches_format("anything") is None
+
+
+def write_later(path, content, seconds=10):
+    """Rewrite a file with a modification time ``seconds`` later than its current one"""
+    mtime = os.path.getmtime(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.utime(path, (mtime + seconds, mtime + seconds))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_hot_reload_from_json(tmp_path):
+    path = str(tmp_path / "institutions.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"ranchi university": {}}, f)
+    registry = InstitutionRegistry(source=path, reload_seconds=0)
+    assert registry.resolve("Vinoba Bhave University") is None
+
+    write_later(path, json.dumps([{"name": "Vinoba Bhave University", "aliases": ["vbu"]}]))
+    registry.maybe_reload()
+    wait_for(lambda: len(registry.names()) == 1 and registry.get("vinoba bhave university") is not None)
+    assert registry.resolve("VBU Hazaribag").name == "vinoba bhave university"
+    assert registry.get("ranchi university") is None
+
+    # A file that can't be read leaves the previous registry in place
+    write_later(path, "{not json", seconds=20)
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.names() == ["vinoba bhave university"]
+
+
+def test_reload_from_sqlite(tmp_path):
+    path = str(tmp_path / "institutions.db")
+    write_institutions_db(path, [make_institution("ranchi university", SEED["ranchi university"])])
+    registry = InstitutionRegistry(source=path, reload_seconds=3600)
+    assert registry.get("ranchi university").matches_format("RU/CSE/2024/001")
+
+    write_institutions_db(path, [make_institution("nit jamshedpur", SEED["nit jamshedpur"])])
+    # Within reload_seconds no check is made; an explicit reload always rebuilds
+    registry.maybe_reload()
+    assert len(registry) == 1
+    assert registry.reload() == 2
+    assert registry.resolve("national institute of technology jamshedpur").name == "nit jamshedpur"
+
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue
+from main import CertificateData, processor
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), str(tmp_path / "uploads"), max_attempts=2, retry_backoff_seconds=0)
+    yield queue
+    queue.close()
+
+
+def test_claims_highest_priority_first(queue):
+    low = queue.submit(b"low", "low.png", "image/png")
+    high = queue.submit(b"high", "high.png", "image/png", priority=5)
+    later = queue.submit(b"later", "later.png", "image/png")
+
+    assert [queue.claim().id for _ in range(3)] == [high.id, low.id, later.id]
+    assert queue.claim() is None
+    assert queue.stats() == {QUEUED: 0, RUNNING: 3, DONE: 0, FAILED: 0}
+
+
+def test_opens_database_on_first_use(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), str(tmp_path / "uploads"))
+    assert not queue.opened and not os.path.exists(tmp_path / "jobs.db")
+
+    queue.stats()
+    assert queue.opened and os.path.exists(tmp_path / "jobs.db")
+    queue.close()
+
+
+def test_retries_until_attempts_run_out(queue):
+    job = queue.submit(b"scan", "scan.png", "image/png")
+
+    queue.claim()
+    assert queue.fail(job.id, "worker busy").status == QUEUED
+    assert queue.claim().attempts == 2
+    failed = queue.fail(job.id, "worker busy")
+
+    assert (failed.status, failed.attempts, failed.error) == (FAILED, 2, "worker busy")
+    assert not os.path.exists(job.upload_path)
+
+
+def test_retry_waits_for_backoff(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), str(tmp_path / "uploads"), retry_backoff_seconds=60)
+    job = queue.submit(b"scan", "scan.png", "image/png")
+    queue.claim()
+    queue.fail(job.id, "worker busy")
+
+    assert queue.claim() is None
+    assert 59 < queue.next_retry_in() <= 60
+    queue.close()
+
+
+def test_recover_requeues_interrupted_jobs(queue, tmp_path):
+    spooled = tmp_path / "spooled-upload"
+    spooled.write_bytes(b"scan")
+    job = queue.submit(str(spooled), "scan.png", "image/png")
+    assert not spooled.exists()
+    queue.claim()
+    queue.close()
+
+    restarted = JobQueue(queue.db_path, queue.spool_dir, max_attempts=2, retry_backoff_seconds=0)
+    assert restarted.recover() == 1
+    claimed = restarted.claim()
+    # The interrupted run counted as an attempt
+    assert (claimed.id, claimed.attempts) == (job.id, 2)
+    with open(claimed.upload_path, "rb") as f:
+        assert f.read() == b"scan"
+
+    restarted.complete(job.id, {"is_valid": True})
+    assert restarted.get(job.id).result == {"is_valid": True}
+    assert restarted.recover() == 0
+    restarted.close()
+
+
+def test_release_does_not_count_the_attempt(queue):
+    job = queue.submit(b"scan", "scan.png", "image/png")
+    queue.claim()
+    queue.release(job.id)
+
+    released = queue.get(job.id)
+    assert (released.status, released.attempts) == (QUEUED, 0)
+
+
+def read_events(lines):
+    """Parse server-sent events into (event, data) pairs, skipping comments"""
+    event = None
+    for line in lines:
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+
+def test_job_events_follow_state_changes(monkeypatch, queue):
+    release = threading.Event()
+    get = queue.get
+
+    def get_and_release(job_id):
+        # The test client buffers the whole stream, so the job finishes once the stream has seen it running
+        job = get(job_id)
+        if job is not None and job.status == RUNNING:
+            release.set()
+        return job
+
+    async def fake_verify_upload(upload, wait=False, content_type=None, debug_timings=False):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return processor.verify_against_database(CertificateData(certificate_number=upload.read().decode()))
+
+    monkeypatch.setattr(queue, "get", get_and_release)
+    monkeypatch.setattr(main, "job_queue", queue)
+    monkeypatch.setattr(main, "verify_upload", fake_verify_upload)
+    monkeypatch.setattr(main.config, "JOB_WORKERS", 1)
+    monkeypatch.setattr(main.config, "STARTUP_MODE", "lazy")
+
+    with TestClient(main.app) as client:
+        submitted = client.post("/jobs", files={"file": ("scan.png", b"RU/CSE/2024/001", "image/png")},
+                                data={"priority": "3"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+        assert submitted.headers["Location"] == f"/jobs/{job_id}"
+
+        statuses = []
+        with client.stream("GET", f"/jobs/{job_id}/events") as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            for event, job in read_events(response.iter_lines()):
+                assert event == job["status"]
+                statuses.append(event)
+        done = client.get(f"/jobs/{job_id}").json()
+        assert client.get("/jobs/unknown/events").status_code == 404
+
+    assert statuses[-2:] == [RUNNING, DONE]
+    assert (done["status"], done["priority"], done["attempts"]) == (DONE, 3, 1)
+    assert done["result"]["is_valid"]
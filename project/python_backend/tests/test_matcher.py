@@ -0,0 +1,49 @@
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from matcher import TextMatcher
+
+CORPUS = [
+    "rajesh kumar singh", "priya sharma", "amit kumar", "sunita devi", "rahul verma",
+    "bachelor of technology", "bachelor of science", "master of computer applications",
+]
+
+
+def reference_scores(matcher, queries, candidates):
+    """Cosine similarity of the fitted vectorizer's own TF-IDF rows"""
+    vectorizer = matcher._state.vectorizer
+    return cosine_similarity(
+        vectorizer.transform([text.lower() for text in queries]),
+        vectorizer.transform([text.lower() for text in candidates])
+    )
+
+
+def test_score_matches_cosine_similarity():
+    matcher = TextMatcher()
+    matcher.fit(CORPUS)
+    # Known strings use precomputed rows, the rest are vectorized per query
+    candidates = CORPUS + ["Rajesh Kumar Sinha", "priya sharrna", "zzzz", ""]
+    queries = ["RAJESH KUMAR SINGH", "rajes kumar", "bachelor of technolgy", "priya"]
+
+    expected = reference_scores(matcher, queries, candidates)
+    for query, row in zip(queries, expected):
+        np.testing.assert_allclose(matcher.score(query, candidates), row, atol=1e-5)
+
+
+def test_score_pairs_matches_cosine_similarity():
+    matcher = TextMatcher()
+    matcher.fit(CORPUS)
+    queries = ["Rajesh Kumar Singh", "priya sharrna", "amit", "bachelor of science", "sunita devi"]
+    candidates = ["rajesh kumar singh", "priya sharma", "amit kumar", "Bachelor of Sciences", "rahul verma"]
+
+    expected = np.diag(reference_scores(matcher, queries, candidates))
+    np.testing.assert_allclose(matcher.score_pairs(queries, candidates), expected, atol=1e-5)
+
+
+def test_added_strings_score_like_fitted_ones():
+    matcher = TextMatcher()
+    matcher.fit(CORPUS)
+    matcher.add(["kavita rani"])
+
+    expected = reference_scores(matcher, ["kavita rani"], ["kavita rani", "kavita"])[0]
+    np.testing.assert_allclose(matcher.score("kavita rani", ["kavita rani", "kavita"]), expected, atol=1e-5)
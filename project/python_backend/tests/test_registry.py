@@ -0,0 +1,75 @@
+import pytest
+
+from registry import InMemoryRegistry, RegistryTable, SQLiteRegistry
+
+
+def make_queries(records):
+    """Extracted fields as OCR would return them: exact, garbled, blocked and unknown"""
+    first, second, third, fourth = records[0], records[1], records[2], records[3]
+    return [
+        {"certificate_number": first["certificate_number"]},
+        {"certificate_number": first["certificate_number"].lower(), "roll_number": second["roll_number"]},
+        {"roll_number": f" {third['roll_number'].lower()} "},
+        {"certificate_number": first["certificate_number"].replace("0", "O").replace("1", "l")},
+        {"certificate_number": second["certificate_number"][:-1]},
+        {"roll_number": "Z" + third["roll_number"][1:]},
+        {"student_name": fourth["student_name"].upper()},
+        {"certificate_number": "NOPE/0000", "institution": fourth["institution"].title(),
+         "graduation_year": fourth["graduation_year"]},
+        {"institution": "Unknown University", "graduation_year": 1999},
+        {},
+    ]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def registry(request, tmp_path, registry_records):
+    records = list(registry_records)
+    # Duplicate keys must come back once per distinct row, in registry order
+    records.append(dict(records[0], grade="second class"))
+    if request.param == "sqlite":
+        registry = SQLiteRegistry(str(tmp_path / "registry.db"), block_limit=5)
+        registry.add_many(records)
+    else:
+        registry = InMemoryRegistry(records, block_limit=5)
+    return registry
+
+
+def test_candidates_many_matches_candidates(registry):
+    records = list(registry.records())
+    queries = make_queries(records)
+    table = RegistryTable(registry)
+
+    assert table.candidates_many(queries) == [registry.candidates(**query) for query in queries]
+
+
+def test_candidates_many_finds_garbled_keys(registry):
+    records = list(registry.records())
+    queries = make_queries(records)
+
+    found = RegistryTable(registry).candidates_many(queries)
+
+    assert [record["grade"] for record in found[0]] == ["first class", "second class"]
+    assert records[0] in found[3]
+    assert records[1] in found[4]
+    assert records[2] in found[5]
+    assert records[3] in found[6]
+    assert found[8] == [] and found[9] == []
+
+
+def test_sqlite_fuzzy_indexes_catch_up(registry_records, tmp_path):
+    db_path = str(tmp_path / "registry.db")
+    first, second = registry_records[:250], registry_records[250:]
+    SQLiteRegistry(db_path, fuzzy=False).add_many(first)
+    garbled = first[0]["certificate_number"].replace("0", "O")
+
+    # Records imported without fuzzy indexes are only found by exact keys until indexed
+    registry = SQLiteRegistry(db_path)
+    assert registry.candidates(certificate_number=garbled) == []
+    assert registry.update_fuzzy_indexes() == len(first)
+    assert first[0] in registry.candidates(certificate_number=garbled)
+
+    # Later imports index their own records, and reopening rebuilds nothing
+    registry.add_many(second)
+    reopened = SQLiteRegistry(db_path)
+    assert reopened.update_fuzzy_indexes() == 0
+    assert second[0] in reopened.candidates(certificate_number=second[0]["certificate_number"].replace("0", "O"))
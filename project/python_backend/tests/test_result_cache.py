@@ -0,0 +1,78 @@
+import hashlib
+import itertools
+
+import pytest
+
+import result_cache
+from result_cache import ResultCache, content_key, digest_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake time.time for the cache, advanced by assigning clock.now"""
+    class Clock:
+        now = 1000.0
+
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, "time", lambda: clock.now)
+    return clock
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", {"text": "a"})
+    cache.put("b", {"text": "b"})
+    cache.get("a")
+    cache.put("c", {"text": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"text": "a"} and cache.get("c") == {"text": "c"}
+    assert cache.stats() == {"hits": 3, "disk_hits": 0, "misses": 1, "hit_ratio": 0.75,
+                             "memory_entries": 2, "persistent": False}
+
+
+def test_entries_expire_after_ttl(clock, tmp_path):
+    cache = ResultCache(max_entries=10, ttl_seconds=60, db_path=str(tmp_path / "cache.db"))
+    cache.put("a", {"text": "a"})
+
+    clock.now += 59
+    assert cache.get("a") == {"text": "a"}
+    clock.now += 2
+    assert cache.get("a") is None
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = ResultCache(max_entries=1, ttl_seconds=0, db_path=db_path)
+    cache.put("a", {"text": "a", "data": {"roll_number": "CSE2020001"}})
+    cache.put("b", {"text": "b"})
+    # Evicted from memory, still on disk
+    assert cache.get("a") == {"text": "a", "data": {"roll_number": "CSE2020001"}}
+    assert cache.disk_hits == 1
+
+    restarted = ResultCache(max_entries=10, ttl_seconds=0, db_path=db_path)
+    assert restarted.get("b") == {"text": "b"}
+    assert restarted.stats()["persistent"]
+
+
+def test_sqlite_tier_keeps_newest_entries(clock, monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, "PRUNE_INTERVAL", 1)
+    cache = ResultCache(max_entries=1, ttl_seconds=0, db_path=str(tmp_path / "cache.db"), db_max_entries=2)
+    for key, now in zip("abc", itertools.count(clock.now)):
+        clock.now = now
+        cache.put(key, {"text": key})
+
+    assert cache.get("a") is None
+    assert cache.get("b") == {"text": "b"} and cache.get("c") == {"text": "c"}
+
+
+def test_keys_change_with_pipeline_version(tmp_path):
+    content = b"certificate scan"
+    assert content_key(content, "v1") == digest_key(hashlib.sha256(content).hexdigest(), "v1")
+    assert content_key(content, "v1") != content_key(content, "v2")
+
+    cache = ResultCache(max_entries=10, ttl_seconds=0, db_path=str(tmp_path / "cache.db"))
+    cache.put(content_key(content, "v1"), {"text": "read by v1"})
+
+    assert cache.get(content_key(content, "v2")) is None
+    assert cache.get(content_key(content, "v1")) == {"text": "read by v1"}
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+import reverify
+from main import VERIFIED_CERTIFICATES, CertificateData, processor
+from registry import RegistryTable
+
+FIELDS = tuple(CertificateData.model_fields)
+
+STORED_RESULT = {
+    "is_valid": False,
+    "confidence": 40.0,
+    "extracted_data": {"certificate_number": "RU/CSE/2024/001", "student_name": "rajesh kumar singh"},
+}
+
+
+def verdict(result):
+    """A verification result without its timestamp; batched scores differ from single ones by rounding"""
+    fields = {key: value for key, value in result.model_dump().items() if key != "timestamp"}
+    fields["confidence"] = round(fields["confidence"], 3)
+    return fields
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = RegistryTable(processor.registry)
+    monkeypatch.setattr(reverify, "_table", table)
+    return table
+
+
+def test_verify_many_matches_single_verification(table):
+    genuine = [CertificateData(**record) for record in VERIFIED_CERTIFICATES]
+    items = genuine + [
+        genuine[0].model_copy(update={"certificate_number": "RU/CSE/2O24/0O1"}),
+        genuine[1].model_copy(update={"student_name": "priya sharrna", "roll_number": None}),
+        CertificateData(student_name="nobody", institution="Unknown University", graduation_year=2031),
+        CertificateData(),
+    ]
+
+    results = processor.verify_many(items, table)
+
+    assert [verdict(result) for result in results] == [
+        verdict(processor.verify_against_database(data)) for data in items
+    ]
+    assert results[0].is_valid and results[1].is_valid
+
+
+def test_parse_record_formats():
+    assert reverify.parse_record(STORED_RESULT, 1, FIELDS) == reverify.StoredRecord(
+        1, STORED_RESULT["extracted_data"], None, {"is_valid": False, "confidence": 40.0}
+    )
+    batch_line = {"index": 0, "filename": "scan.png", "result": STORED_RESULT}
+    assert reverify.parse_record(batch_line, 2, FIELDS).id == "scan.png"
+
+    cached = reverify.parse_record({"text": "ocr text", "data": {"grade": "first class"}}, 3, FIELDS)
+    assert (cached.data, cached.text, cached.previous) == ({"grade": "first class"}, "ocr text", None)
+
+    bare = {"id": "a1", "roll_number": "CSE2020001", "is_valid": True}
+    assert reverify.parse_record(bare, 4, FIELDS) == reverify.StoredRecord(
+        "a1", bare, None, {"is_valid": True, "confidence": None}
+    )
+    assert reverify.parse_record({"text": "ocr text"}, 5, FIELDS).data is None
+    assert reverify.parse_record({"note": "nothing to verify"}, 6, FIELDS) is None
+
+
+def test_reverify_chunk_reports_changed_decisions(table):
+    records = [
+        reverify.parse_record(dict(STORED_RESULT, id="changed"), 1, FIELDS),
+        reverify.parse_record(dict(VERIFIED_CERTIFICATES[1], id="same", is_valid=True), 2, FIELDS),
+        reverify.parse_record({"id": "text", "text": "This is to certify that PRIYA SHARMA\nRoll Number: CS20B1001"},
+                              3, FIELDS),
+    ]
+
+    verdicts, changes, counts = reverify.reverify_chunk(records, reextract=False)
+
+    assert [json.loads(line)["id"] for line in verdicts] == ["changed", "same", "text"]
+    assert json.loads(verdicts[2])["result"]["extracted_data"]["roll_number"] == "CS20B1001"
+    assert [json.loads(line)["id"] for line in changes] == ["changed"]
+    assert json.loads(changes[0])["after"]["is_valid"] is True
+    assert counts == {"now_valid": 1, "unchanged": 1, "no_previous": 1}
+
+
+def test_chunks_skip_records_without_data():
+    records = [(1, reverify.StoredRecord(1, {}, None, None)), (2, None), (3, reverify.StoredRecord(3, {}, None, None))]
+    skipped = reverify.Counter()
+
+    assert [[record.id for record in chunk] for chunk in reverify.chunks(iter(records), 1, skipped)] == [[1], [3]]
+    assert skipped["skipped"] == 1
@@ -0,0 +1,88 @@
+import hashlib
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from preprocessing import ImageTooLargeError, decode_grayscale
+from uploads import CHUNK_SIZE, SpooledUpload, UploadTooLargeError, spool
+
+
+class CountingStream(io.BytesIO):
+    """A stream that records how many bytes were read from it"""
+
+    def __init__(self, content):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_small_upload_stays_in_memory(tmp_path):
+    content = b"certificate" * 10
+
+    upload = spool(io.BytesIO(content), max_bytes=1000, spool_bytes=1000, spool_dir=str(tmp_path))
+
+    assert upload.in_memory and upload.source == content
+    assert (upload.size, upload.digest, upload.head) == (len(content), hashlib.sha256(content).hexdigest(), content[:8])
+    assert os.listdir(tmp_path) == []
+
+
+def test_large_upload_is_spooled_to_disk(tmp_path):
+    content = os.urandom(3 * CHUNK_SIZE + 5)
+
+    with spool(io.BytesIO(content), max_bytes=0, spool_bytes=CHUNK_SIZE, spool_dir=str(tmp_path)) as upload:
+        assert not upload.in_memory and upload.source == upload.path
+        assert os.path.dirname(upload.path) == str(tmp_path)
+        assert upload.read() == content
+        assert (upload.digest, upload.head) == (hashlib.sha256(content).hexdigest(), content[:8])
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_upload_is_rejected_early(tmp_path):
+    stream = CountingStream(b"x" * (10 * CHUNK_SIZE))
+
+    with pytest.raises(UploadTooLargeError, match="scan.png is larger than the 2097152 byte limit"):
+        spool(stream, max_bytes=2 * CHUNK_SIZE, spool_bytes=0, spool_dir=str(tmp_path), name="scan.png")
+
+    # Reading stops at the first chunk over the limit, and the partial file is removed
+    assert stream.bytes_read == 3 * CHUNK_SIZE
+    assert os.listdir(tmp_path) == []
+
+
+def test_upload_at_the_limit_is_accepted():
+    upload = spool(io.BytesIO(b"x" * 100), max_bytes=100, spool_bytes=1000)
+    assert upload.size == 100
+
+
+def test_file_upload_is_never_deleted(tmp_path):
+    path = tmp_path / "scan.png"
+    path.write_bytes(b"scan")
+
+    with SpooledUpload.from_path(str(path)) as upload:
+        assert upload.digest == hashlib.sha256(b"scan").hexdigest()
+    assert path.exists()
+
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.fromarray(np.full((height, width), 200, dtype=np.uint8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_decode_rejects_images_over_the_pixel_limit():
+    with pytest.raises(ImageTooLargeError):
+        decode_grayscale(png(2000, 1000), max_pixels=1_000_000)
+
+
+def test_decode_reduces_large_images():
+    content = png(2000, 1000)
+
+    assert decode_grayscale(content, decode_max_pixels=0).shape == (1000, 2000)
+    assert decode_grayscale(content, decode_max_pixels=500_000).shape == (500, 1000)
+    assert decode_grayscale(content, decode_max_pixels=150_000).shape == (250, 500)
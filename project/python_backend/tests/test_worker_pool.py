@@ -0,0 +1,68 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.synthetic import encode_png, make_records, render_certificate
+from worker_pool import PoolSaturatedError, WorkerPool
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def die():
+    os._exit(1)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=1, queue_size=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_saturated_pool_rejects_or_waits(pool):
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(nap, 0.5)) for _ in range(pool.capacity)]
+        await asyncio.sleep(0.1)
+        assert pool.saturated
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(nap, 0)
+        # A waiting job gets the first slot that frees up
+        waited = await pool.run(nap, 0, wait=True)
+        await asyncio.gather(*running)
+        return waited
+
+    assert asyncio.run(scenario()) > 0
+    assert pool.pending == 0
+
+
+def test_pool_restarts_after_worker_dies(pool):
+    async def scenario():
+        first = await pool.run(nap, 0)
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(die)
+        return first, await pool.run(nap, 0)
+
+    first, after = asyncio.run(scenario())
+    assert after != first
+    assert pool.restarts == 1
+    assert not pool.broken and pool.pending == 0
+
+
+def test_saturated_pool_answers_503(monkeypatch):
+    saturated = WorkerPool(max_workers=1, queue_size=0)
+    saturated._pending = saturated.capacity
+    monkeypatch.setattr(main, "ocr_pool", saturated)
+    image = encode_png(render_certificate(make_records(1, seed=5)[0], dpi=100))
+
+    response = TestClient(main.app).post("/verify-certificate", files={"file": ("scan.png", image, "image/png")})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(main.config.OCR_RETRY_AFTER_SECONDS)
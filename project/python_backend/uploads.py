@@ -0,0 +1,123 @@
+import hashlib
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied from an upload at a time while spooling
+CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes kept in memory to sniff the file type
+HEAD_SIZE = 8
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class SpooledUpload:
+    """An uploaded file, held in memory when small and in a temporary file otherwise.
+
+    ``source`` is what the OCR workers get: the bytes, or the path of the
+    spooled file, which they read themselves instead of receiving a pickled
+    copy. ``digest`` is the SHA-256 of the content, computed while spooling.
+    ``close`` deletes a spooled file this upload owns.
+    """
+
+    def __init__(self, content: Optional[bytes], path: Optional[str], size: int, digest: str,
+                 head: bytes, owned: bool = True):
+        self.content = content
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self.head = head
+        self.owned = owned
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "SpooledUpload":
+        return cls(content, None, len(content), hashlib.sha256(content).hexdigest(), content[:HEAD_SIZE])
+
+    @classmethod
+    def from_path(cls, path: str) -> "SpooledUpload":
+        """Wrap a file that is already on disk; it is read in chunks to hash it and never deleted"""
+        hasher = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+            f.seek(0)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                size += len(chunk)
+        return cls(None, path, size, hasher.hexdigest(), head, owned=False)
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.content if self.content is not None else self.path
+
+    @property
+    def in_memory(self) -> bool:
+        return self.content is not None
+
+    def read(self) -> bytes:
+        if self.content is not None:
+            return self.content
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        if self.path and self.owned:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        self.content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def spool(stream: BinaryIO, max_bytes: int, spool_bytes: int, spool_dir: Optional[str] = None,
+          name: str = "Upload") -> SpooledUpload:
+    """Copy a file object chunk by chunk, moving it to a temporary file once it passes ``spool_bytes``.
+
+    At most ``spool_bytes`` plus one chunk is held in memory, however large
+    the upload. Raises UploadTooLargeError as soon as more than ``max_bytes``
+    have been read, when set.
+    """
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    head = b""
+    size = 0
+    spooled = None
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLargeError(f"{name} is larger than the {max_bytes} byte limit")
+            hasher.update(chunk)
+            if spooled is not None:
+                spooled.write(chunk)
+                continue
+            buffer += chunk
+            if len(buffer) > spool_bytes:
+                spooled = tempfile.NamedTemporaryFile(prefix="upload-", dir=spool_dir or None, delete=False)
+                spooled.write(buffer)
+                head = bytes(buffer[:HEAD_SIZE])
+                buffer = bytearray()
+    except BaseException:
+        if spooled is not None:
+            spooled.close()
+            os.unlink(spooled.name)
+        raise
+
+    if spooled is None:
+        content = bytes(buffer)
+        return SpooledUpload(content, None, size, hasher.hexdigest(), content[:HEAD_SIZE])
+    spooled.close()
+    logger.info(f"{name} spooled to {spooled.name} ({size} bytes)")
+    return SpooledUpload(None, spooled.name, size, hasher.hexdigest(), head)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the worker pool has no free slot for a new job"""
+
+
+class WorkerPool:
+    """Bounded process pool for CPU-bound OCR work.
+
+    At most ``max_workers`` jobs run at once and up to ``queue_size`` more may
+    wait for a free worker. Anything beyond that is rejected immediately with
+    ``PoolSaturatedError`` so callers can apply backpressure instead of
+    queueing unbounded work.
+
+    When a worker process dies, the executor fails every job it holds with
+    ``BrokenProcessPool`` and refuses new ones; the pool then replaces it, so
+    only those jobs fail.
+    """
+
+    def __init__(self, max_workers: int, queue_size: int, initializer: Optional[Callable[[], Any]] = None):
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self.initializer = initializer
+        self.capacity = self.max_workers + self.queue_size
+        self.restarts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._slot_freed: Optional[asyncio.Condition] = None
+
+    def start(self):
+        """Start the worker processes"""
+        if self._executor is None:
+            logger.info(f"Starting worker pool: {self.max_workers} workers, queue size {self.queue_size}")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+
+    async def prefork(self) -> List[int]:
+        """Start the worker processes now rather than on the first job.
+
+        Called after the parent has loaded its heavy state, so forked workers
+        share it copy-on-write. Returns the pids of the workers that answered.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, os.getpid) for _ in range(self.max_workers)
+        ))
+        return sorted(set(pids))
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a broken executor with a new one, unless that was already done"""
+        if self._executor is not broken:
+            return
+        logger.error("An OCR worker process died; restarting the worker pool")
+        self._executor = None
+        self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def shutdown(self):
+        """Stop the worker processes, waiting for running jobs"""
+        if self._executor is not None:
+            logger.info("Shutting down worker pool")
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs running or waiting for a worker"""
+        return self._pending
+
+    @property
+    def broken(self) -> bool:
+        """Whether a worker died and the pool has not been restarted yet"""
+        # The executor's management thread sets this as soon as it sees a dead worker
+        return self._executor is not None and bool(getattr(self._executor, "_broken", False))
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.capacity
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise PoolSaturatedError(
+                    f"Worker pool saturated ({self._pending}/{self.capacity} jobs pending)"
+                )
+            self._pending += 1
+
+    async def _acquire_wait(self):
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Condition()
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self._pending < self.capacity)
+            self._acquire()
+
+    async def _release(self):
+        with self._lock:
+            self._pending -= 1
+        if self._slot_freed is not None:
+            async with self._slot_freed:
+                self._slot_freed.notify()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, wait: bool = False) -> Any:
+        """Run ``fn(*args)`` in a worker process without blocking the event loop.
+
+        By default a saturated pool raises ``PoolSaturatedError`` right away;
+        with ``wait=True`` the call waits for a free slot instead. Cancelling
+        the call drops a job that has not started yet and otherwise returns
+        once the worker has finished it. A job whose executor broke raises
+        ``BrokenProcessPool``; the next one runs in a new executor.
+        """
+        self.start()
+        if wait:
+            await self._acquire_wait()
+        else:
+            self._acquire()
+        try:
+            if self.broken:
+                self._restart(self._executor)
+            executor = self._executor
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._restart(executor)
+                executor = self._executor
+                future = executor.submit(fn, *args)
+            try:
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                self._restart(executor)
+                raise
+            except asyncio.CancelledError:
+                # A job already running in a worker can't be stopped: keep its
+                # slot, and the caller waiting, until the worker is done with it
+                if not future.cancel():
+                    await asyncio.wait([asyncio.wrap_future(future)])
+                raise
+        finally:
+            await self._release()
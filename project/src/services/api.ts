@@ -28,6 +28,81 @@ export interface PythonVerificationResult {
   timestamp: string;
 }
 
+export interface PythonJob {
+  id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  attempts: number;
+  max_attempts: number;
+  result: PythonVerificationResult | null;
+  error: string | null;
+}
+
+export interface PythonHealth {
+  status: string;
+  jobs?: {
+    enabled: boolean;
+    workers: number;
+  };
+}
+
+// Verification runs as a background job; poll it instead of holding one long request open
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_TIMEOUT_MS = 10 * 60 * 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function waitForJob(jobId: string): Promise<PythonVerificationResult> {
+  const deadline = Date.now() + JOB_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const { data: job } = await api.get<PythonJob>(`/jobs/${jobId}`);
+    if (job.status === 'done' && job.result) {
+      return job.result;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Verification failed');
+    }
+    await sleep(JOB_POLL_INTERVAL_MS);
+  }
+  throw new Error('Verification is taking too long. Please try again later.');
+}
+
+// Queued jobs never run on a backend without job workers, so ask once whether it has any
+let jobsEnabled: Promise<boolean> | null = null;
+
+function jobProcessingEnabled(): Promise<boolean> {
+  if (!jobsEnabled) {
+    jobsEnabled = api
+      .get<PythonHealth>('/health')
+      .then(({ data }) => Boolean(data.jobs?.enabled))
+      .catch(() => {
+        // Ask again next time; the synchronous request reports the connection error
+        jobsEnabled = null;
+        return false;
+      });
+  }
+  return jobsEnabled;
+}
+
+async function verifyAsJob(formData: FormData): Promise<PythonVerificationResult> {
+  console.log('Submitting verification job to Python backend...');
+  const response = await api.post<PythonJob>('/jobs', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+  return waitForJob(response.data.id);
+}
+
+async function verifyNow(formData: FormData): Promise<PythonVerificationResult> {
+  console.log('Sending request to Python backend...');
+  const response = await api.post<PythonVerificationResult>('/verify-certificate', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+  return response.data;
+}
+
 export const certificateAPI = {
   async verifyWithPython(file: File): Promise<VerificationResult> {
     console.log('Starting Python verification for file:', file.name);
@@ -35,16 +110,12 @@ export const certificateAPI = {
     formData.append('file', file);
 
     try {
-      console.log('Sending request to Python backend...');
-      const response = await api.post<PythonVerificationResult>('/verify-certificate', formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-      });
+      const pythonResult = (await jobProcessingEnabled())
+        ? await verifyAsJob(formData)
+        : await verifyNow(formData);
 
       // Transform Python response to match our TypeScript types
-      console.log('Received response from Python backend:', response.data);
-      const pythonResult = response.data;
+      console.log('Received result from Python backend:', pythonResult);
       
       return {
         isValid: pythonResult.is_valid,
@@ -73,7 +144,8 @@ export const certificateAPI = {
   async checkHealth(): Promise<boolean> {
     try {
       console.log('Checking Python service health...');
-      await api.get('/health');
+      const { data } = await api.get<PythonHealth>('/health');
+      jobsEnabled = Promise.resolve(Boolean(data.jobs?.enabled));
       console.log('Python service is healthy');
       return true;
     } catch (error) {